@@ -0,0 +1,77 @@
+"""
+Compare the BarAggregator against per-tick dict bookkeeping, as strategies
+typically write it in `on_ticks`, for 1s, 1m and 5m bars over many tokens.
+
+    python -m benchmarks.bench_bars
+"""
+
+import random
+import time
+
+from easeapi.bars import BarAggregator
+
+
+def dict_bars(ticks, intervals):
+    """Baseline: a dict of bars per interval, with a boundary check per tick and interval."""
+    bars = {interval: {} for interval in intervals}
+    closed = 0
+    for token, price, timestamp in ticks:
+        for interval in intervals:
+            start = timestamp // interval * interval
+            bar = bars[interval].get(token)
+            if bar is None or bar["start"] != start:
+                if bar is not None:
+                    closed += 1
+                bars[interval][token] = {"start": start, "open": price, "high": price, "low": price, "close": price, "ticks": 1}
+            else:
+                bar["high"] = max(bar["high"], price)
+                bar["low"] = min(bar["low"], price)
+                bar["close"] = price
+                bar["ticks"] += 1
+    return closed
+
+
+def aggregator_bars(ticks, intervals):
+    closed = [0]
+    aggregator = BarAggregator(intervals, on_bars=lambda interval, bars: closed.__setitem__(0, closed[0] + len(bars)))
+    add = aggregator.add
+    for token, price, timestamp in ticks:
+        add("nfo", token, price, timestamp=timestamp)
+    return closed[0]
+
+
+def aggregator_batches(ticks, intervals, batch=50):
+    """The aggregator fed one batch per websocket message, as `on_ticks` does with tick lists."""
+    closed = [0]
+    aggregator = BarAggregator(intervals, on_bars=lambda interval, bars: closed.__setitem__(0, closed[0] + len(bars)))
+    add_many = aggregator.add_many
+    rows = [("nfo", token, price, None, timestamp) for token, price, timestamp in ticks]
+    for i in range(0, len(rows), batch):
+        add_many(rows[i:i + batch])
+    return closed[0]
+
+
+def main(tokens=5000, count=500000, seconds=600, repeat=3):
+    rng = random.Random(7)
+    start = 1735702500.0
+    ticks = [
+        (str(35000 + rng.randrange(tokens)), 100.0 + rng.random(), start + i * seconds / count)
+        for i in range(count)
+    ]
+    intervals = (1, 60, 300)
+    print("{} ticks over {} tokens and {}s, intervals {}".format(count, tokens, seconds, intervals))
+    runs = (("dict per tick", dict_bars), ("add() per tick", aggregator_bars), ("add_many() x50", aggregator_batches))
+    for label, run in runs:
+        # Best of `repeat` runs
+        elapsed = None
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            closed = run(ticks, intervals)
+            elapsed = min(elapsed or float("inf"), time.perf_counter() - begin)
+        print("{:<16} {:>10.0f} ticks/s, {} bars closed".format(label, count / elapsed, closed))
+
+
+if __name__ == "__main__":
+    main()
+    # Busier tokens: fewer bars to close per tick
+    main(tokens=200)
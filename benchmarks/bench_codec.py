@@ -0,0 +1,46 @@
+"""
+Compare the installed JSON codecs on tick and orderbook payloads.
+
+Ticks are decoded one websocket message at a time, as `EaseApiTicker` does,
+and orderbooks are decoded and pretty-printed as the gateway does outside
+native mode.
+
+    python -m benchmarks.bench_codec
+"""
+
+from easeapi.codec import CODECS
+
+from benchmarks.bench_native_response import bench, make_orderbook
+
+
+def make_ticks(count=1000):
+    return [
+        {
+            "token": str(2885 + i % 500),
+            "exchange": "nse",
+            "ltp": 1224.05 + (i % 97) / 20.0,
+            "volume": 100000 + i,
+            "timestamp": 1735702500000 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def main(ticks=1000, rows=200, iterations=200):
+    tick_messages = [CODECS["json"]().dumps(tick) for tick in make_ticks(ticks)]
+    orderbook = make_orderbook(rows)
+    orderbook_bytes = CODECS["json"]().dumpb(orderbook)
+
+    print("{} tick messages, orderbook with {} rows, {} iterations".format(ticks, rows, iterations))
+    print("installed codecs: {}".format(", ".join(CODECS)))
+    for name, codec_class in CODECS.items():
+        codec = codec_class()
+        print("-- {}".format(name))
+        bench("ticks loads", lambda: [codec.loads(m) for m in tick_messages], iterations)
+        bench("orderbook loads", lambda: codec.loads(orderbook_bytes), iterations)
+        bench("orderbook dumpb", lambda: codec.dumpb(orderbook), iterations)
+        bench("orderbook dumps_pretty", lambda: codec.dumps_pretty(orderbook), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Compare the memory held by the list-of-dicts instrument master
+against the array-backed InstrumentColumns.
+
+    python -m benchmarks.bench_instrument_memory
+"""
+
+import gc
+import time
+import tracemalloc
+
+from easeapi import EaseApiGateway, InstrumentColumns
+from benchmarks.common import make_instruments_csv
+
+
+def measure(label, build, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        "{:<16} retained {:>8.1f} MiB ({:>6.1f} B/row) peak {:>8.1f} MiB build {:>6.2f}s".format(
+            label, retained / 2 ** 20, retained / rows, peak / 2 ** 20, elapsed
+        )
+    )
+    return result, retained
+
+
+def main(underlyings=200):
+    data = make_instruments_csv(underlyings=underlyings)
+    gateway = EaseApiGateway(app_key="bench")
+    rows = data.count(b"\n") - 1
+    print("{} instruments, {:.1f} MiB of CSV".format(rows, len(data) / 2 ** 20))
+
+    records, dict_bytes = measure("list of dicts", lambda: gateway._parse_instruments(data), rows)
+    del records
+    columns, column_bytes = measure("columnar", lambda: InstrumentColumns.from_csv(data), rows)
+    print("columnar uses {:.1f}x less memory".format(dict_bytes / column_bytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Track instrument master parse throughput in rows/s.
+
+    python -m benchmarks.bench_instrument_parse
+"""
+
+import csv
+import time
+from datetime import datetime
+from io import StringIO
+
+from easeapi import EaseApiGateway, InstrumentColumns
+from benchmarks.common import make_instruments_csv
+
+
+def legacy_parse(data):
+    """The original DictReader + strptime row conversion, kept as the baseline."""
+    records = []
+    for row in csv.DictReader(StringIO(data.decode("utf-8").strip())):
+        row["exchange_token"] = int(row["exchange_token"])
+        row["last_price"] = float(row["last_price"])
+        row["tick_size"] = float(row["tick_size"])
+        row["lot_size"] = int(row["lot_size"])
+        if len(row["expiry"]) == 10:
+            row["expiry"] = datetime.strptime(row["expiry"], "%d/%m/%Y").date()
+        records.append(row)
+    return records
+
+
+def bench(label, parse, data, rows, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(data)
+        best = min(best, time.perf_counter() - start)
+    print("{:<24} {:>12,.0f} rows/s {:>8.3f}s".format(label, rows / best, best))
+
+
+def main(underlyings=100):
+    data = make_instruments_csv(underlyings=underlyings)
+    rows = data.count(b"\n") - 1
+    gateway = EaseApiGateway(app_key="bench")
+    print("{} instruments".format(rows))
+
+    bench("legacy (strptime)", legacy_parse, data, rows)
+    bench("list of dicts", gateway._parse_instruments, data, rows)
+    bench("columnar", InstrumentColumns.from_csv, data, rows)
+
+
+if __name__ == "__main__":
+    main()
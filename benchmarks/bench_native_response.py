@@ -0,0 +1,81 @@
+"""
+Benchmark the cost of the legacy JSON string responses against native mode.
+
+The HTTP layer is replaced by a canned in-memory response so only the
+client-side decode/re-serialize work is measured.
+
+    python -m benchmarks.bench_native_response
+"""
+
+import json
+import time
+
+from easeapi import EaseApiGateway
+
+
+def make_orderbook(rows=200):
+    return {
+        "status": "success",
+        "data": [
+            {
+                "order_no": str(250000000 + i),
+                "instrument_id": 2885,
+                "trading_symbol": "RELIANCE-EQ",
+                "exchange": "NSE",
+                "transaction_type": "B" if i % 2 else "S",
+                "order_type": "LMT",
+                "quantity": 10 + i,
+                "price": 1224.05 + i / 20.0,
+                "status": "OPEN",
+                "order_time": "2025-01-01 09:15:00",
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+class CannedResponse:
+    status_code = 200
+    headers = {"content-type": "application/json"}
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def bench(label, fn, iterations):
+    fn()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    cpu = (time.process_time() - cpu_start) / iterations * 1e6
+    wall = (time.perf_counter() - wall_start) / iterations * 1e6
+    print("{:<32} {:>10.1f} us cpu {:>10.1f} us wall".format(label, cpu, wall))
+    return wall
+
+
+def main(rows=200, iterations=2000):
+    response = CannedResponse(make_orderbook(rows))
+    gateway = EaseApiGateway(app_key="bench")
+    gateway.reqsession.request = lambda *args, **kwargs: response
+
+    print("orderbook with {} rows, {} iterations".format(rows, iterations))
+    legacy = bench(
+        "json string + json.loads",
+        lambda: json.loads(gateway.get_orderbook()),
+        iterations,
+    )
+    native = bench(
+        "native=True",
+        lambda: gateway.get_orderbook(native=True),
+        iterations,
+    )
+    print("saved {:.1f} us per call ({:.1f}x)".format(legacy - native, legacy / native))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure the client work between deciding to trade and handing the order to
+the HTTP layer, in microseconds: building and encoding the payload per call,
+against patching a pre-encoded `OrderTemplate`.
+
+    python -m benchmarks.bench_order_template
+"""
+
+from easeapi import EaseApiGateway
+from easeapi.templates import OrderTemplate
+from benchmarks.bench_native_response import CannedResponse
+from benchmarks.bench_request_overhead import bench
+
+PAYLOAD = {
+    "instrument_id": 2885,
+    "exchange": "NSE",
+    "segment": "E",
+    "transaction_type": "B",
+    "order_type": "LMT",
+    "quantity": 1,
+    "price": 1224.05,
+    "trigger_price": 0.0,
+    "product": "I",
+    "validity": "DAY",
+    "disclosed_quantity": 0,
+    "off_market_flag": 0,
+}
+
+
+def build_payload(price, quantity):
+    """The per-call payload a strategy builds without a template."""
+    return {
+        "instrument_id": 2885,
+        "exchange": "NSE",
+        "segment": "E",
+        "transaction_type": "B",
+        "order_type": "LMT",
+        "quantity": quantity,
+        "price": round(round(price / 0.05) * 0.05, 2),
+        "trigger_price": 0.0,
+        "product": "I",
+        "validity": "DAY",
+        "disclosed_quantity": 0,
+        "off_market_flag": 0,
+    }
+
+
+def main(iterations=200000):
+    for codec in ("json", "orjson"):
+        try:
+            gateway = EaseApiGateway(app_key="bench", native=True, codec=codec)
+        except ValueError:
+            continue
+        gateway.set_client_id("AA0000")
+        gateway.set_auth_token("x" * 900)
+        response = CannedResponse({"status": "success", "order_no": "250000001"})
+        gateway.reqsession.request = lambda *args, **kwargs: response
+        template = OrderTemplate(gateway, "place_intraday_order", PAYLOAD, tick_size=0.05, lot_size=1)
+
+        print(codec)
+        bench("  payload: dict + encode", lambda: gateway.codec.dumpb(build_payload(1224.07, 1)), iterations)
+        bench("  payload: template.encode", lambda: template.encode(price=1224.07, quantity=1), iterations)
+        bench(
+            "  order, canned response (dict)",
+            lambda: gateway.place_intraday_order(build_payload(1224.07, 1)),
+            iterations // 10,
+        )
+        bench("  order, canned response (template)", lambda: template.fire(price=1224.07, quantity=1), iterations // 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare recording ticks as JSON lines from `on_ticks` against the binary
+TickRecorder, and measure replay speed.
+
+    python -m benchmarks.bench_recorder
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from easeapi.recorder import ReplayTicker, TickRecorder
+from benchmarks.bench_tick_model import make_messages
+
+
+def main(count=200000):
+    messages = make_messages(count)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        with open(os.path.join(directory, "ticks.jsonl"), "w") as f:
+            for message in messages:
+                tick = json.loads(message)
+                tick["received"] = time.time_ns()
+                f.write(json.dumps(tick) + "\n")
+        jsonl = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recorder = TickRecorder(directory)
+        for message in messages:
+            recorder.write(message)
+        recorder.close()
+        binary = time.perf_counter() - start
+
+        print("{} messages".format(count))
+        print("json lines      {:>10.0f} msgs/s".format(count / jsonl))
+        print("TickRecorder    {:>10.0f} msgs/s ({:.1f}x)".format(count / binary, jsonl / binary))
+
+        replay = ReplayTicker(recorder.path)
+        replay.on_ticks = lambda ticker, data: None
+        start = time.perf_counter()
+        replay.run()
+        print("replay          {:>10.0f} msgs/s".format(count / (time.perf_counter() - start)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure the per-call client overhead of a gateway request, in microseconds.
+
+The HTTP layer is replaced by a canned in-memory response, so the numbers
+are the work done by the client around the network call.
+
+    python -m benchmarks.bench_request_overhead
+"""
+
+import time
+from urllib.parse import urljoin
+
+from easeapi import EaseApiGateway
+from benchmarks.bench_native_response import CannedResponse
+
+
+def legacy_prepare(gateway, route, url_args=None, headers=None, is_complete_url=True):
+    """The original per-call URL and header construction, kept as the baseline."""
+    if url_args:
+        uri = gateway._routes[route].format(**url_args)
+    else:
+        uri = gateway._routes[route]
+
+    if not is_complete_url:
+        url = urljoin(gateway.root, uri)
+    else:
+        url = uri
+
+    default_headers = {"User-Agent": "EaseApi-python/1.0.0", "X-EaseApi-Version": "1"}
+    if gateway.app_key:
+        default_headers["x-app-key"] = gateway.app_key
+    if gateway.client_id:
+        default_headers["x-client-id"] = gateway.client_id
+    if gateway.auth_token:
+        default_headers["Authorization"] = "Bearer {}".format(gateway.auth_token)
+    if headers:
+        default_headers.update(headers)
+    return url, default_headers
+
+
+def prepared(gateway, route, headers=None):
+    return gateway._request_url(route), gateway._request_headers(headers)
+
+
+def bench(label, fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+    print("{:<36} {:>8.2f} us/call".format(label, elapsed))
+
+
+def main(iterations=200000):
+    gateway = EaseApiGateway(app_key="bench", native=True)
+    gateway.set_client_id("AA0000")
+    gateway.set_auth_token("x" * 900)
+    response = CannedResponse({"status": "success", "order_no": "250000001"})
+    gateway.reqsession.request = lambda *args, **kwargs: response
+
+    bench("url + headers (legacy)", lambda: legacy_prepare(gateway, "place_delivery_order"), iterations)
+    bench("url + headers (prepared)", lambda: prepared(gateway, "place_delivery_order"), iterations)
+    bench(
+        "url + headers + extra (legacy)",
+        lambda: legacy_prepare(gateway, "place_delivery_order", headers={"x-mac-address": "00"}),
+        iterations,
+    )
+    bench(
+        "url + headers + extra (prepared)",
+        lambda: prepared(gateway, "place_delivery_order", headers={"x-mac-address": "00"}),
+        iterations,
+    )
+    bench(
+        "full _request, canned response",
+        lambda: gateway._post("place_delivery_order", params={"quantity": 1}, is_json=True),
+        iterations // 10,
+    )
+
+
+if __name__ == "__main__":
+    main()
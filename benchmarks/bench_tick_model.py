@@ -0,0 +1,78 @@
+"""
+Compare the tick models of EaseApiTicker on decode time, garbage collector
+activity and the memory held by the ticks a strategy keeps.
+
+Ticks are fed through `_on_message` as if received from the websocket, and
+the callback keeps every tick, as a strategy buffering a window would.
+
+    python -m benchmarks.bench_tick_model
+"""
+
+import gc
+import time
+import tracemalloc
+
+from easeapi import EaseApiTicker
+from easeapi.codec import get_codec
+from easeapi.ticks import numpy
+
+
+def make_messages(count, tokens=2000):
+    codec = get_codec()
+    return [
+        codec.dumps({"token": str(1000 + i % tokens), "ltp": 100.0 + (i % 97) / 20.0, "timestamp": 1735702500 + i})
+        for i in range(count)
+    ]
+
+
+def collections():
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def run(messages, flush_every=None, **kwargs):
+    ticker = EaseApiTicker("bench", "bench", "bench", **kwargs)
+    ticker.subscriptions = {"nse": {str(1000 + i) for i in range(2000)}}
+    # As subscribe() records them
+    ticker._token_exchanges = dict.fromkeys(ticker.subscriptions["nse"], "nse")
+    kept = []
+    ticker.on_ticks = lambda ticker, data: kept.append(data)
+    for i, message in enumerate(messages, 1):
+        ticker._on_message(None, message)
+        if flush_every and i % flush_every == 0:
+            ticker.flush_ticks()
+    return kept
+
+
+def measure(label, messages, **kwargs):
+    gc.collect()
+    before = collections()
+    start = time.perf_counter()
+    kept = run(messages, **kwargs)
+    elapsed = time.perf_counter() - start
+    gc_runs = collections() - before
+    del kept
+
+    gc.collect()
+    tracemalloc.start()
+    kept = run(messages, **kwargs)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    print("{:<28} {:>8.0f} ticks/s {:>6} gc runs {:>8.1f} MiB kept".format(
+        label, len(messages) / elapsed, gc_runs, retained / 2 ** 20
+    ))
+
+
+def main(count=200000):
+    messages = make_messages(count)
+    print("{} tick messages".format(count))
+    measure("dict", messages)
+    measure("dict, conflated x1000", messages, conflate=True, flush_every=1000)
+    if numpy is not None:
+        measure("numpy, batches of 1000", messages, tick_model="numpy", batch_size=1000)
+        measure("numpy, conflated x1000", messages, conflate=True, flush_every=1000, tick_model="numpy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic payloads shared by the benchmarks."""
+
+import random
+from datetime import date, timedelta
+
+INSTRUMENT_FIELDS = [
+    "exchange_token",
+    "trading_symbol",
+    "name",
+    "last_price",
+    "expiry",
+    "strike",
+    "tick_size",
+    "lot_size",
+    "instrument",
+    "segment",
+    "exchange",
+]
+
+
+def make_instruments_csv(underlyings=500, expiries=12, strikes=40, seed=7):
+    """
+    Build an instruments CSV shaped like the F&O universe.
+
+    Every underlying gets an NSE and a BSE equity line, three futures and
+    `expiries` x `strikes` x (CE, PE) options. Returns bytes, like the API.
+    """
+    rnd = random.Random(seed)
+    first_expiry = date(2025, 1, 30)
+    expiry_dates = [first_expiry + timedelta(days=7 * i) for i in range(expiries)]
+
+    lines = [",".join(INSTRUMENT_FIELDS)]
+    token = 1000
+    for u in range(underlyings):
+        name = "SYM{}".format(u)
+        for exchange in ("NSE", "BSE"):
+            token += 1
+            lines.append(
+                "{},{}-EQ,{},{:.2f},,0,0.05,1,EQ,E,{}".format(
+                    token, name, name, rnd.uniform(10, 3000), exchange
+                )
+            )
+        for expiry in expiry_dates[:3]:
+            token += 1
+            lines.append(
+                "{},{}{:%y%b}FUT,{},{:.2f},{:%d/%m/%Y},0,0.05,250,FUT,D,NFO".format(
+                    token, name, expiry, name, rnd.uniform(10, 3000), expiry
+                )
+            )
+        for expiry in expiry_dates:
+            for k in range(strikes):
+                strike = 1000 + k * 10
+                for option_type in ("CE", "PE"):
+                    token += 1
+                    lines.append(
+                        "{},{}{:%y%b%d}{}{},{},{:.2f},{:%d/%m/%Y},{},0.05,250,{},D,NFO".format(
+                            token, name, expiry, strike, option_type, name,
+                            rnd.uniform(0, 100), expiry, strike, option_type
+                        )
+                    )
+    return ("\n".join(lines) + "\n").encode("utf-8")
@@ -26,7 +26,28 @@ for the complete list of APIs, supported parameters and values, and response for
 from __future__ import unicode_literals, absolute_import
 
 from easeapi import exceptions
-from easeapi.easeapigateway import EaseApiGateway
+from easeapi.easeapigateway import EaseApiGateway, OrderResult
+from easeapi.asyncgateway import AsyncEaseApiGateway
 from easeapi.easeapiticker import EaseApiTicker
-
-__all__ = ["EaseApiGateway", "EaseApiTicker", "exceptions"]
+from easeapi.asyncticker import AsyncEaseApiTicker
+from easeapi.dispatch import TickDispatcher
+from easeapi.shardedticker import ShardedTicker
+from easeapi.quotetable import SharedQuoteTable
+from easeapi.ticks import Tick
+from easeapi.recorder import ReplayTicker, TickRecorder, TickRecording
+from easeapi.bars import Bar, BarAggregator
+from easeapi.orders import OrderStateCache
+from easeapi.positions import PositionBook
+from easeapi.templates import OrderTemplate
+from easeapi.instruments import InstrumentColumns, InstrumentMaster
+from easeapi.snapshot import InstrumentSnapshot
+from easeapi.ratelimit import RateLimiter, TokenBucket
+from easeapi.retry import RetryBudget, RetryEngine, RetryPolicy
+
+__all__ = ["EaseApiGateway", "AsyncEaseApiGateway", "EaseApiTicker", "AsyncEaseApiTicker",
+           "InstrumentMaster", "InstrumentColumns", "InstrumentSnapshot", "RateLimiter",
+           "TokenBucket", "RetryEngine", "RetryPolicy", "RetryBudget", "TickDispatcher",
+           "ShardedTicker", "SharedQuoteTable", "Tick", "TickRecorder",
+           "TickRecording", "ReplayTicker", "Bar", "BarAggregator", "OrderStateCache",
+           "PositionBook", "OrderResult",
+           "OrderTemplate", "exceptions"]
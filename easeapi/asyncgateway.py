@@ -0,0 +1,419 @@
+import asyncio
+import logging
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+import easeapi.exceptions as ex
+from easeapi.easeapigateway import EaseApiGateway, OrderResult
+from easeapi.instruments import InstrumentColumns, InstrumentMaster, aiter_csv_instruments
+from easeapi.snapshot import InstrumentSnapshot
+from easeapi.templates import OrderTemplate, instrument_sizes
+
+log = logging.getLogger(__name__)
+
+
+class AsyncEaseApiGateway(EaseApiGateway):
+    """
+    The asyncio flavour of the EaseApiGateway API wrapper class.
+
+    Shares routes, headers and error mapping with `EaseApiGateway`, but every
+    API method is a coroutine. Requests are multiplexed over a bounded pool of
+    keep-alive connections, so many calls can be in flight at once without a
+    thread per request. Requires `aiohttp` (`pip install ventura-easeapi[async]`).
+
+    Use it as an async context manager, or call `close()` when done:
+
+        async with AsyncEaseApiGateway(app_key) as easeapi:
+            orders = await easeapi.get_orderbook(native=True)
+    """
+
+    _default_keepalive_timeout = 30  # In seconds
+
+    def __init__(
+        self,
+        app_key,
+        root=None,
+        debug=False,
+        timeout=None,
+        disable_ssl=False,
+        native=False,
+        rate_limiter=None,
+        retry=None,
+        codec=None,
+        pool_maxsize=None,
+        pool_maxsize_per_host=0,
+        keepalive_timeout=None,
+    ):
+        """
+        Initialise a new asyncio EaseApi client instance.
+
+        Accepts the same arguments as `EaseApiGateway`, plus:
+
+        - `pool_maxsize` is the maximum number of simultaneous connections
+        in the pool. Defaults to 10.
+        - `pool_maxsize_per_host` caps connections to a single host, 0 means no
+        limit other than `pool_maxsize`.
+        - `keepalive_timeout` is the time (seconds) an idle connection is kept
+        open for reuse. Defaults to 30 seconds.
+
+        aiohttp already sets TCP_NODELAY on its sockets.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncEaseApiGateway requires aiohttp, install it with `pip install ventura-easeapi[async]`"
+            )
+
+        super(AsyncEaseApiGateway, self).__init__(
+            app_key,
+            root=root,
+            debug=debug,
+            timeout=timeout,
+            disable_ssl=disable_ssl,
+            native=native,
+            rate_limiter=rate_limiter,
+            retry=retry,
+            codec=codec,
+        )
+
+        self.pool_maxsize = pool_maxsize or self._default_pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self.keepalive_timeout = keepalive_timeout or self._default_keepalive_timeout
+
+        # The aiohttp session is bound to the running event loop,
+        # so it is created lazily on the first request.
+        self.reqsession.close()
+        self.reqsession = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the connection pool."""
+        if self.reqsession is not None:
+            await self.reqsession.close()
+            self.reqsession = None
+
+    async def warm_up(self, connections=None):
+        """Pre-open pooled connections to the API host, see `EaseApiGateway.warm_up`."""
+        connections = connections or self.pool_maxsize
+        url = self._warm_up_url()
+        kwargs = {"ssl": False} if self.disable_ssl else {}
+
+        async def touch():
+            try:
+                async with self._session().head(url, **kwargs):
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log.debug("Warm-up request to {url} failed: {error}".format(url=url, error=e))
+                return False
+
+        return sum(await asyncio.gather(*[touch() for _ in range(connections)]))
+
+    async def generate_auth_token(self, request_token, secret_key):
+        return await super(AsyncEaseApiGateway, self).generate_auth_token(request_token, secret_key)
+
+    async def generate_auth_token_with_otpt(self, client_id, password, totp, secret_key):
+        return await super(AsyncEaseApiGateway, self).generate_auth_token_with_otpt(
+            client_id, password, totp, secret_key
+        )
+
+    async def get_instruments(self, columnar=False):
+        data = await self._get("get_instruments")
+        if columnar:
+            if not isinstance(data, bytes):
+                raise ex.DataException(
+                    "Couldn't download the instrument master: {}".format(self._error_message(data))
+                )
+            return InstrumentColumns.from_csv(data)
+        return self._parse_instruments(data)
+
+    def iter_instruments(self, predicate=None, **filters):
+        """
+        Stream the instrument master, see `EaseApiGateway.iter_instruments`.
+
+        Returns an async iterator, rows are parsed as the download arrives:
+
+            async for row in easeapi.iter_instruments(exchange="NFO"):
+                ...
+        """
+        return aiter_csv_instruments(self._iter_instrument_batches(), predicate=predicate, **filters)
+
+    async def _iter_instrument_batches(self, chunk_size=1 << 16):
+        """Yield the lines of the instruments CSV as they arrive, as lists of complete lines."""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(self._route_group("get_instruments"), "get_instruments")
+
+        kwargs = {"ssl": False} if self.disable_ssl else {}
+        async with self._session().get(
+            self._request_url("get_instruments"), headers=self._request_headers(), allow_redirects=True, **kwargs
+        ) as r:
+            content_type = r.headers.get("content-type", "")
+            if r.status != 200 or "csv" not in content_type:
+                # Raises the mapped exception for API errors, e.g. an expired session
+                data = self._parse_response(r.status, content_type, await r.read())
+                raise ex.DataException(
+                    "Couldn't download the instrument master: HTTP {code} {message}".format(
+                        code=r.status, message=self._error_message(data)
+                    )
+                )
+
+            # Cut at the last newline, so no line or UTF-8 sequence is split
+            tail = b""
+            async for chunk in r.content.iter_chunked(chunk_size):
+                block = tail + chunk
+                end = block.rfind(b"\n") + 1
+                tail = block[end:]
+                if end:
+                    yield block[:end].decode("utf-8").splitlines()
+            if tail:
+                yield tail.decode("utf-8").splitlines()
+
+    async def get_instrument_snapshot(self, cache_dir, revalidate=True):
+        """Return the instrument master backed by an on-disk snapshot, see `EaseApiGateway.get_instrument_snapshot`."""
+        return await InstrumentSnapshot(cache_dir).load_async(self, revalidate=revalidate)
+
+    async def get_instrument_master(self, refresh=False):
+        """Return the indexed `InstrumentMaster`, see `EaseApiGateway.get_instrument_master`."""
+        if refresh or self.instrument_master is None:
+            self.instrument_master = InstrumentMaster(await self.get_instruments() or [])
+        return self.instrument_master
+
+    async def get_l1_market_quotes(self, payload, native=None):
+        return self._format(await self._post("get_l1_market_quotes", params=payload, is_json=True), native)
+
+    async def get_l1_market_quotes_bulk(self, instruments, chunk_size=None, max_workers=4):
+        """Fetch L1 quotes for many instruments, see `EaseApiGateway.get_l1_market_quotes_bulk`."""
+        payloads = self._l1_quote_payloads(instruments, chunk_size)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(payload):
+            async with semaphore:
+                return await self._post("get_l1_market_quotes", params=payload, is_json=True)
+
+        responses = await asyncio.gather(*[fetch(payload) for payload in payloads])
+        return self._merge_l1_quotes(payloads, responses)
+
+    async def get_user_profile(self, native=None):
+        return self._format(await self._get("get_user_profile"), native)
+
+    async def get_fund_details(self, native=None):
+        return self._format(await self._get("get_fund_details"), native)
+
+    async def place_delivery_order(self, payload, native=None):
+        return self._format(await self._post("place_delivery_order", params=payload, is_json=True), native)
+
+    async def place_intraday_order(self, payload, native=None):
+        return self._format(await self._post("place_intraday_order", params=payload, is_json=True), native)
+
+    async def modify_order(self, payload, native=None):
+        return self._format(await self._post("modify_order", params=payload, is_json=True), native)
+
+    async def cancel_order(self, payload, native=None):
+        return self._format(await self._post("cancel_order", params=payload, is_json=True), native)
+
+    async def submit_orders(self, legs, max_workers=None, native=None):
+        """Send many order requests concurrently, see `EaseApiGateway.submit_orders`."""
+        legs = self._order_legs(legs)
+        semaphore = asyncio.Semaphore(max_workers or self.pool_maxsize)
+
+        async def submit(route, payload):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = self._format(await self._post(route, params=payload, is_json=True), native)
+                except Exception as e:
+                    return OrderResult(route, payload, None, e, time.perf_counter() - started)
+                return OrderResult(route, payload, response, None, time.perf_counter() - started)
+
+        return list(await asyncio.gather(*[submit(route, payload) for route, payload in legs]))
+
+    async def place_orders(self, payloads, intraday=False, max_workers=None, native=None):
+        route = "place_intraday_order" if intraday else "place_delivery_order"
+        return await self.submit_orders([(route, payload) for payload in payloads], max_workers, native)
+
+    async def modify_orders(self, payloads, max_workers=None, native=None):
+        return await self.submit_orders([("modify_order", payload) for payload in payloads], max_workers, native)
+
+    async def cancel_orders(self, orders, max_workers=None, native=None):
+        return await self.submit_orders(self._cancel_legs(orders), max_workers, native)
+
+    async def cancel_all_orders(self, exchange=None, trading_symbol=None, instrument_id=None, orders=None,
+                                max_workers=None, native=None):
+        """Cancel every open order matching the filters, see `EaseApiGateway.cancel_all_orders`."""
+        if orders is None:
+            orders = self._response_records(await self.get_orderbook(native=True))
+        open_orders = self._open_orders(orders, exchange, trading_symbol, instrument_id)
+        return await self.cancel_orders(open_orders, max_workers, native)
+
+    async def order_template(self, payload, intraday=False, tick_size=None, lot_size=None):
+        """
+        Validate and encode an order ahead of time, see `EaseApiGateway.order_template`.
+        Fire it with `await template.fire_async()`.
+        """
+        if tick_size is None or lot_size is None:
+            master = await self.get_instrument_master()
+            sizes = instrument_sizes(
+                master, payload.get("instrument_id"), payload.get("exchange"), payload.get("segment")
+            )
+            tick_size = tick_size if tick_size is not None else sizes[0]
+            lot_size = lot_size if lot_size is not None else sizes[1]
+        route = "place_intraday_order" if intraday else "place_delivery_order"
+        return OrderTemplate(self, route, payload, tick_size, lot_size)
+
+    async def get_orderbook(self, native=None):
+        return self._format(await self._get("get_orderbook", is_json=False), native)
+
+    async def get_tradebook(self, native=None):
+        return self._format(await self._get("get_tradebook"), native)
+
+    async def get_holdings(self, native=None):
+        return self._format(await self._get("get_holdings"), native)
+
+    async def get_positions(self, native=None):
+        return self._format(await self._get("get_positions"), native)
+
+    async def logout(self, native=None):
+        payload = {
+            "refresh_token": self.refresh_token,
+        }
+        return self._format(await self._post("logout", params=payload, is_json=True), native)
+
+    def _session(self):
+        """Return the pooled aiohttp session, creating it on first use."""
+        if self.reqsession is None or self.reqsession.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize,
+                limit_per_host=self.pool_maxsize_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self.reqsession = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.reqsession
+
+    async def _request(
+        self,
+        route,
+        method,
+        url_args=None,
+        params=None,
+        is_json=False,
+        query_params=None,
+        is_complete_url=True,
+        headers=None,
+        body=None,
+    ):
+        """
+        Make an HTTP request, retrying transient failures if a `retry` engine is set.
+
+        `body`, if given, is sent as is instead of encoding `params`.
+        """
+        if self.retry:
+            self.retry.budget.deposit()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            error = None
+            try:
+                status, content_type, content = await self._send(
+                    route,
+                    method,
+                    url_args=url_args,
+                    params=params,
+                    is_json=is_json,
+                    query_params=query_params,
+                    is_complete_url=is_complete_url,
+                    headers=headers,
+                    body=body,
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if not self.retry:
+                    raise
+                error = e
+            else:
+                if not self.retry or status not in self.retry.policy(route).retry_statuses:
+                    return self._parse_response(status, content_type, content)
+
+            delay = self.retry.delay(route, attempt)
+            if delay is None:
+                if self.retry.should_reconcile(route):
+                    cause = error or "HTTP {}".format(status)
+                    try:
+                        orderbook = await self.get_orderbook(native=True)
+                    except Exception as e:
+                        orderbook = e
+                    self._reconcile_order(route, params if body is None else self.codec.loads(body), orderbook, cause)
+                if error is not None:
+                    raise error
+                return self._parse_response(status, content_type, content)
+
+            log.debug("Retrying {route} in {delay:.3f}s, attempt {attempt} failed: {error}".format(
+                route=route, delay=delay, attempt=attempt, error=error or status
+            ))
+            await asyncio.sleep(delay)
+
+    async def _fetch(self, route, headers=None):
+        """Send a GET request and return its `(status, headers, content)`, for callers that need the response headers."""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(self._route_group(route), route)
+
+        kwargs = {"ssl": False} if self.disable_ssl else {}
+        async with self._session().get(
+            self._request_url(route), headers=self._request_headers(headers), allow_redirects=True, **kwargs
+        ) as r:
+            return r.status, r.headers, await r.read()
+
+    async def _send(
+        self,
+        route,
+        method,
+        url_args=None,
+        params=None,
+        is_json=False,
+        query_params=None,
+        is_complete_url=True,
+        headers=None,
+        body=None,
+    ):
+        """Send an HTTP request and return its `(status, content_type, content)`."""
+        url = self._request_url(route, url_args=url_args, is_complete_url=is_complete_url)
+        is_json = is_json and method in ["POST", "PUT"]
+        request_headers = self._request_headers(headers, is_json=is_json)
+
+        if self.debug:
+            log.debug(
+                "Request: {method} {url} {params}".format(
+                    method=method, url=url, params=params if body is None else body
+                )
+            )
+
+        # prepare url query params
+        if method in ["GET", "DELETE"]:
+            query_params = params
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(self._route_group(route), route)
+
+        kwargs = {}
+        if self.disable_ssl:
+            kwargs["ssl"] = False
+
+        async with self._session().request(
+            method,
+            url,
+            data=self._request_body(params, body, method, is_json),
+            params=query_params,
+            headers=request_headers,
+            allow_redirects=True,
+            **kwargs
+        ) as r:
+            return r.status, r.headers.get("content-type", ""), await r.read()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+    asyncticker.py
+
+    Asyncio flavour of the EaseApi WebSocket client.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import asyncio
+import inspect
+import logging
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from easeapi.codec import DecodeError
+from easeapi.easeapiticker import EaseApiTicker
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the tick stream in the queue
+_EOF = object()
+
+
+class AsyncEaseApiTicker(EaseApiTicker):
+    """
+    EaseAPI WebSocket client running on the asyncio event loop.
+
+    Subscriptions behave as in `EaseApiTicker` and are restored after a
+    reconnect, but the socket is read by a task on the running loop and
+    ticks are consumed with `async for`. Ticks wait in a bounded queue: when
+    the consumer falls behind the reader stops reading the socket, so the
+    backlog stays in the kernel buffers instead of growing in memory.
+    Requires `aiohttp` (`pip install ventura-easeapi[async]`).
+
+        async with AsyncEaseApiTicker(app_key, client_id, auth_token) as ticker:
+            await ticker.subscribe(["2885", "15"], exchange="nse")
+            async for tick in ticker:
+                ...
+
+    If `on_ticks` is set, ticks are passed to it instead of the queue. Callbacks
+    are called on the event loop and may be coroutine functions.
+    """
+
+    def __init__(self, app_key, client_id, auth_token, codec=None, max_queue=1000, heartbeat=30):
+        """
+        Initialize the AsyncEaseApiTicker.
+
+        Parameters:
+        -----------
+        app_key : str
+            Your EaseAPI application key
+        client_id : str
+            Your client ID
+        auth_token : str
+            Your authentication token
+        codec : str or codec, optional
+            JSON codec used for messages, see `EaseApiTicker`.
+        max_queue : int, optional
+            Number of received messages buffered before the socket stops
+            being read (default: 1000)
+        heartbeat : float, optional
+            Seconds between websocket pings (default: 30)
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncEaseApiTicker requires aiohttp, install it with `pip install ventura-easeapi[async]`"
+            )
+
+        super(AsyncEaseApiTicker, self).__init__(app_key, client_id, auth_token, codec=codec)
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+
+        self.session = None
+        self._reader = None
+        self._queue = None
+        self._ready = None
+        self._closing = False
+        self._eof = False
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __aiter__(self):
+        if self._queue is None:
+            raise RuntimeError("Call connect() before iterating over ticks")
+        return self
+
+    async def __anext__(self):
+        if self._eof and self._queue.empty():
+            raise StopAsyncIteration
+        data = await self._queue.get()
+        if data is _EOF:
+            raise StopAsyncIteration
+        return data
+
+    async def connect(self, use_order_status=False):
+        """
+        Establish connection to the WebSocket server.
+
+        Parameters:
+        -----------
+        use_order_status : bool
+            If True, connect to order status endpoint.
+            If False (default), connect to market data endpoint.
+
+        Returns:
+        --------
+        bool
+            True once connected, False if every connection attempt failed
+        """
+        if self.connecting or self.connected:
+            logger.debug("Already connected or connecting to WebSocket")
+            return self.connected
+
+        self.ws_url = self.order_status_url if use_order_status else self.market_data_url
+        endpoint_type = "order status" if use_order_status else "market data"
+
+        self.connecting = True
+        self._closing = False
+        self._eof = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._ready = asyncio.Event()
+        self.reconnect_attempts = 0
+        logger.info(f"Connecting to EaseAPI WebSocket ({endpoint_type})...")
+
+        self._reader = asyncio.ensure_future(self._run())
+        await self._ready.wait()
+        return self.connected
+
+    async def _run(self):
+        """Read the socket until closed, reconnecting with a fixed interval."""
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        try:
+            while True:
+                try:
+                    self.ws = await self.session.ws_connect(self.ws_url, heartbeat=self.heartbeat)
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    await self._on_error(self.ws, e)
+                else:
+                    await self._on_open(self.ws)
+                    await self._read(self.ws)
+                    await self._on_close(self.ws, self.ws.close_code, None)
+
+                if self._closing:
+                    return
+
+                if self.reconnect_attempts >= self.max_reconnect_attempts:
+                    logger.error(f"Max reconnection attempts ({self.max_reconnect_attempts}) reached")
+                    await self._callback(self.on_noreconnect, self)
+                    return
+
+                self.reconnect_attempts += 1
+                logger.info(f"Attempting to reconnect ({self.reconnect_attempts}/{self.max_reconnect_attempts}) in {self.reconnect_interval}s...")
+                await self._callback(self.on_reconnect, self, self.reconnect_attempts)
+                await asyncio.sleep(self.reconnect_interval)
+        finally:
+            self.connecting = False
+            self.connected = False
+            self._ready.set()
+            self._finish()
+
+    async def _read(self, ws):
+        """Feed received messages to `on_ticks` or the queue until the socket closes."""
+        async for message in ws:
+            if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                await self._on_message(ws, message.data)
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                await self._on_error(ws, ws.exception())
+                break
+
+    async def _on_open(self, ws):
+        """WebSocket on_open event handler."""
+        logger.info("WebSocket connected successfully")
+        self.connecting = False
+        self.connected = True
+        self.reconnect_attempts = 0
+        self._ready.set()
+
+        await self._resubscribe()
+        await self._callback(self.on_connect, self, {})
+
+    async def _on_message(self, ws, message):
+        """WebSocket on_message event handler."""
+        try:
+            data = self.codec.loads(message)
+        except DecodeError:
+            logger.warning(f"Received non-JSON message: {message}")
+            return
+
+        if self.on_ticks:
+            await self._callback(self.on_ticks, self, data)
+        else:
+            # Blocks the reader, and so the socket, while the queue is full
+            await self._queue.put(data)
+
+    async def _on_error(self, ws, error):
+        """WebSocket on_error event handler."""
+        logger.error(f"WebSocket error: {error}")
+        await self._callback(self.on_error, self, None, error)
+
+    async def _on_close(self, ws, close_status_code, close_msg):
+        """WebSocket on_close event handler."""
+        logger.info(f"WebSocket connection closed: {close_status_code} - {close_msg}")
+        self.connected = False
+        await self._callback(self.on_close, self, close_status_code, close_msg)
+
+    async def _callback(self, callback, *args):
+        if callback:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                await result
+
+    def _finish(self):
+        """End the tick stream once the queued ticks are consumed."""
+        self._eof = True
+        if self._queue is not None and not self._queue.full():
+            self._queue.put_nowait(_EOF)
+
+    async def _resubscribe(self):
+        """Resubscribe to all previously subscribed instruments after reconnection."""
+        if not self.subscriptions:
+            return
+
+        logger.info(f"Resubscribing to {len(self.subscriptions)} exchanges")
+
+        for exchange, tokens in list(self.subscriptions.items()):
+            if tokens:
+                await self.subscribe(list(tokens), exchange, skip_add=True)
+
+    async def subscribe(self, tokens, exchange="nse", skip_add=False):
+        """Subscribe to LTP market data for specified tokens, see `EaseApiTicker.subscribe`."""
+        if not self.connected:
+            logger.warning("Cannot subscribe, WebSocket not connected")
+            return False
+
+        return await self.send(self._subscribe_message(tokens, exchange, skip_add))
+
+    async def unsubscribe(self, tokens, exchange="nse"):
+        """Unsubscribe from LTP market data for specified tokens, see `EaseApiTicker.unsubscribe`."""
+        if not self.connected:
+            logger.warning("Cannot unsubscribe, WebSocket not connected")
+            return False
+
+        return await self.send(self._unsubscribe_message(tokens, exchange))
+
+    async def send(self, data):
+        """Send data to the WebSocket server, see `EaseApiTicker.send`."""
+        if not self.connected:
+            logger.warning("Cannot send message, WebSocket not connected")
+            return False
+
+        try:
+            if isinstance(data, dict):
+                data = self.codec.dumps(data)
+            await self.ws.send_str(data)
+            return True
+        except Exception as e:
+            logger.error(f"Error sending data: {e}")
+            return False
+
+    async def close(self):
+        """Close the WebSocket connection and end the tick stream."""
+        self._closing = True
+
+        if self._reader is not None:
+            # The reader may be waiting on a full queue or a reconnect delay
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+        if self.ws is not None:
+            await self.ws.close()
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+        self.connected = False
+        logger.info("WebSocket connection closed")
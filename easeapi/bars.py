@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+    bars.py
+
+    Streaming OHLCV bars built from the ticker's LTP stream.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import collections
+import logging
+import math
+import threading
+import time
+from array import array
+
+from easeapi.dispatch import tick_key
+from easeapi.ticks import Tick
+
+log = logging.getLogger(__name__)
+
+Bar = collections.namedtuple(
+    "Bar", ["exchange", "token", "interval", "start", "open", "high", "low", "close", "volume", "ticks"]
+)
+
+
+class _TimerWheel:
+    """
+    Hashed timer wheel: deadlines are bucketed by `resolution`, and advancing
+    the clock only visits the buckets that elapsed.
+    """
+
+    def __init__(self, resolution, size):
+        self.resolution = resolution
+        self.size = size
+        self.buckets = [[] for _ in range(size)]
+        self.position = None
+
+    def schedule(self, deadline, item):
+        self.buckets[int(deadline // self.resolution) % self.size].append((deadline, item))
+
+    def advance(self, now):
+        """Return the `(deadline, item)` entries due at `now`."""
+        target = int(now // self.resolution)
+        if self.position is None:
+            self.position = target
+
+        due = []
+        # After a long gap every bucket is visited once
+        for tick in range(self.position, self.position + min(target - self.position + 1, self.size)):
+            bucket = self.buckets[tick % self.size]
+            if bucket:
+                due.extend(entry for entry in bucket if entry[0] <= now)
+                bucket[:] = [entry for entry in bucket if entry[0] > now]
+        self.position = target
+        return due
+
+
+class _IntervalState:
+    """OHLCV of the open bar of every token, for one interval, in typed arrays."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.start = None
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.volume = array("d")
+        self.ticks = array("q")
+        # Slots with a tick in the open bar
+        self.touched = []
+
+    def grow(self):
+        for column in (self.open, self.high, self.low, self.close, self.volume):
+            column.append(0.0)
+        self.ticks.append(0)
+
+
+class BarAggregator:
+    """
+    Incremental OHLCV bars for many tokens and intervals.
+
+    Per-token state lives in typed arrays indexed by a token slot. A tick
+    only updates the bar of the shortest interval (the base, the GCD of the
+    intervals), and longer bars are rolled up from closed base bars, so the
+    cost of a tick does not grow with the number of intervals.
+
+    Bar boundaries are driven by a timer wheel: a tick only compares its
+    time with the next deadline, and all bars of an interval are closed
+    together and emitted in one batch:
+
+        bars = BarAggregator(intervals=(1, 60, 300), on_bars=on_bars)
+        ticker.on_ticks = bars.on_ticks
+        bars.start()
+
+    Bars are aligned on multiples of their interval since the epoch, which
+    for intervals dividing 30 minutes is also aligned on IST clock time.
+    `volume` is the change of the tick's cumulative `volume` field over the
+    bar, 0 if the feed has none.
+    """
+
+    def __init__(self, intervals=(1, 60, 300), on_bars=None, time_field=None, clock=time.time):
+        """
+        - `intervals` are the bar lengths, in whole seconds.
+        - `on_bars` is called with `(interval, bars)`, a list of `Bar`, each time
+        the bars of an interval close.
+        - `time_field`, if set, is the tick field holding the tick time in seconds
+        since the epoch, e.g. when replaying. By default ticks are timed on arrival.
+        - `clock` returns the current time in seconds since the epoch.
+        """
+        self.intervals = tuple(sorted({int(interval) for interval in intervals}))
+        if not self.intervals or self.intervals[0] < 1:
+            raise ValueError("intervals must be positive whole seconds")
+
+        self.on_bars = on_bars
+        self.time_field = time_field
+        self.clock = clock
+
+        # (exchange, token) -> slot
+        self.slots = {}
+        self.keys = []
+
+        # The base bar is only emitted if it is one of the intervals
+        self.base = math.gcd(*self.intervals)
+        self._base = _IntervalState(self.base)
+        self._volume_open = array("d")
+        self._last_volume = array("d")
+        self._states = [_IntervalState(interval) for interval in self.intervals if interval != self.base]
+
+        self._wheel = _TimerWheel(self.base, self.intervals[-1] // self.base + 1)
+        self._deadlines = {}
+        self._next_deadline = None
+        self._lock = threading.Lock()
+        self._timer = None
+        self._stop = threading.Event()
+
+    def add(self, exchange, token, price, volume=None, timestamp=None):
+        """Add a trade at `price` to the open bars of a token."""
+        self.add_many(((exchange, token, price, volume, timestamp),))
+
+    def add_many(self, ticks):
+        """
+        Add a batch of trades, each an `(exchange, token, price, volume, timestamp)`
+        tuple. `volume` and `timestamp` may be None, see `add()`.
+
+        The lock is taken once for the whole batch, so feeding every websocket
+        message batch at once is much cheaper than calling `add()` per tick.
+        """
+        closed = []
+        with self._lock:
+            base = self._base
+            opens, highs, lows, closes, counts = base.open, base.high, base.low, base.close, base.ticks
+            touched = base.touched
+            slots = self.slots
+            last_volumes, volume_opens = self._last_volume, self._volume_open
+            next_deadline = self._next_deadline
+            clock = self.clock
+
+            for exchange, token, price, volume, timestamp in ticks:
+                if timestamp is None:
+                    timestamp = clock()
+                if next_deadline is None:
+                    self._schedule(timestamp)
+                    next_deadline = self._next_deadline
+                elif timestamp >= next_deadline:
+                    closed.extend(self._advance(timestamp))
+                    next_deadline = self._next_deadline
+                    # Closing the base swapped in a new list
+                    touched = base.touched
+
+                key = (exchange, token if token.__class__ is str else str(token))
+                slot = slots.get(key)
+                if slot is None:
+                    slot = self._add_slot(key)
+
+                if counts[slot]:
+                    if price > highs[slot]:
+                        highs[slot] = price
+                    elif price < lows[slot]:
+                        lows[slot] = price
+                    closes[slot] = price
+                    counts[slot] += 1
+                else:
+                    opens[slot] = highs[slot] = lows[slot] = closes[slot] = price
+                    counts[slot] = 1
+                    touched.append(slot)
+                    if volume is not None:
+                        last_volume = last_volumes[slot]
+                        volume_opens[slot] = last_volume if last_volume >= 0 else volume
+
+                if volume is not None:
+                    last_volumes[slot] = volume
+
+        if closed:
+            self._deliver(closed)
+
+    def _add_slot(self, key):
+        slot = self.slots[key] = len(self.keys)
+        self.keys.append(key)
+        self._volume_open.append(0.0)
+        self._last_volume.append(-1.0)
+        self._base.grow()
+        for state in self._states:
+            state.grow()
+        return slot
+
+    def on_ticks(self, ticker, data):
+        """
+        `on_ticks` callback feeding ticker messages, `Tick` objects or lists of
+        them to the bars. A list is added as one batch.
+        """
+        if not isinstance(data, list):
+            data = (data,)
+
+        key_of = getattr(ticker, "tick_key", tick_key)
+        time_field = self.time_field
+        batch = []
+        for item in data:
+            if isinstance(item, Tick):
+                batch.append((item.exchange, item.token, item.ltp, None, item.timestamp if time_field else None))
+            elif isinstance(item, dict) and "ltp" in item:
+                key = key_of(item)
+                if key is None:
+                    continue
+                volume = item.get("volume")
+                batch.append((
+                    key[0], key[1], float(item["ltp"]), None if volume is None else float(volume),
+                    float(item[time_field]) if time_field else None,
+                ))
+        if batch:
+            self.add_many(batch)
+
+    def _schedule(self, now):
+        self._wheel.position = int(now // self.base)
+        for state in [self._base] + self._states:
+            interval = state.interval
+            state.start = now // interval * interval
+            self._deadlines[interval] = state.start + interval
+            self._wheel.schedule(self._deadlines[interval], state)
+        self._next_deadline = min(self._deadlines.values())
+
+    def advance(self, now=None):
+        """Close the bars whose interval ended by `now`, defaults to the clock."""
+        with self._lock:
+            if self._next_deadline is None:
+                return
+            closed = self._advance(self.clock() if now is None else now)
+        self._deliver(closed)
+
+    def _advance(self, now):
+        """Close the due bars, returns them as `(interval, bars)` batches."""
+        closed = []
+        # The base closes first at a shared deadline, so its last bar is rolled up
+        for deadline, state in sorted(self._wheel.advance(now), key=lambda entry: (entry[0], entry[1].interval)):
+            bars = self._close_base() if state is self._base else self._close(state)
+            if bars:
+                closed.append((state.interval, bars))
+            interval = state.interval
+            # Skip the intervals without ticks after a gap
+            state.start = max(deadline, now // interval * interval)
+            self._deadlines[interval] = state.start + interval
+            self._wheel.schedule(self._deadlines[interval], state)
+        self._next_deadline = min(self._deadlines.values())
+        return closed
+
+    def _close_base(self):
+        """Roll the base bars up into the longer intervals, and return them if the base is emitted."""
+        base = self._base
+        emit = self.base in self.intervals
+        bars = []
+        keys, last_volume, volume_open = self.keys, self._last_volume, self._volume_open
+        opens, highs, lows, closes, counts = base.open, base.high, base.low, base.close, base.ticks
+        interval, start = base.interval, base.start
+        new_bar = tuple.__new__
+        # Folded inline, this runs for every token with ticks in the base bar
+        states = [
+            (state.open, state.high, state.low, state.close, state.volume, state.ticks, state.touched)
+            for state in self._states
+        ]
+        for slot in base.touched:
+            open_, high, low, close, ticks = opens[slot], highs[slot], lows[slot], closes[slot], counts[slot]
+            volume = last_volume[slot] - volume_open[slot] if last_volume[slot] >= 0 else 0.0
+            for s_open, s_high, s_low, s_close, s_volume, s_ticks, s_touched in states:
+                if s_ticks[slot]:
+                    if high > s_high[slot]:
+                        s_high[slot] = high
+                    if low < s_low[slot]:
+                        s_low[slot] = low
+                    s_close[slot] = close
+                    s_volume[slot] += volume
+                    s_ticks[slot] += ticks
+                else:
+                    s_open[slot] = open_
+                    s_high[slot] = high
+                    s_low[slot] = low
+                    s_close[slot] = close
+                    s_volume[slot] = volume
+                    s_ticks[slot] = ticks
+                    s_touched.append(slot)
+            if emit:
+                exchange, token = keys[slot]
+                bars.append(new_bar(Bar, (exchange, token, interval, start, open_, high, low, close, volume, ticks)))
+            counts[slot] = 0
+        base.touched = []
+        return bars
+
+    def _close(self, state):
+        """Return the bars of every token with ticks in the open bar, and reset them."""
+        bars = []
+        keys, ticks = self.keys, state.ticks
+        for slot in state.touched:
+            exchange, token = keys[slot]
+            bars.append(Bar(
+                exchange, token, state.interval, state.start,
+                state.open[slot], state.high[slot], state.low[slot], state.close[slot],
+                state.volume[slot], ticks[slot],
+            ))
+            ticks[slot] = 0
+        state.touched = []
+        return bars
+
+    def _deliver(self, closed):
+        """Call `on_bars` outside the lock, so a slow callback does not hold up ticks."""
+        if not self.on_bars:
+            return
+        for interval, bars in closed:
+            try:
+                self.on_bars(interval, bars)
+            except Exception:
+                log.exception("Error in on_bars callback")
+
+    def flush(self):
+        """Emit the open bars of every interval now, e.g. at the end of a session."""
+        with self._lock:
+            closed = [(self.base, self._close_base())]
+            closed.extend((state.interval, self._close(state)) for state in self._states)
+        self._deliver([(interval, bars) for interval, bars in closed if bars])
+
+    def start(self):
+        """Close bars on time from a background thread, even when no tick arrives."""
+        if self._timer is not None:
+            return
+        self._stop.clear()
+        self._timer = threading.Thread(target=self._run, name="easeapi-bars", daemon=True)
+        self._timer.start()
+
+    def _run(self):
+        while not self._stop.wait(self.base - self.clock() % self.base):
+            self.advance()
+
+    def stop(self, flush=False):
+        """Stop the background thread, and emit the open bars if `flush` is set."""
+        if self._timer is not None:
+            self._stop.set()
+            self._timer.join()
+            self._timer = None
+        if flush:
+            self.flush()
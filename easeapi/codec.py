@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+    codec.py
+
+    Pluggable JSON codecs. The fastest installed one is picked by default.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+# Every codec raises a subclass of ValueError on malformed input
+DecodeError = ValueError
+
+
+class JsonCodec:
+    """The standard library `json` module."""
+
+    name = "json"
+
+    def loads(self, data):
+        """Decode JSON from `bytes` or `str`."""
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encode `obj` to a compact JSON `str`."""
+        return json.dumps(obj, separators=(",", ":"))
+
+    def dumpb(self, obj):
+        """Encode `obj` to compact JSON `bytes`, ready to be sent."""
+        return self.dumps(obj).encode("utf-8")
+
+    def dumps_pretty(self, obj):
+        """
+        Encode `obj` to a JSON `str` indented by two spaces, the `native=False`
+        responses. Every codec keeps this exact `json` output, non-ASCII escaped.
+        """
+        return json.dumps(obj, indent=2)
+
+
+class OrjsonCodec(JsonCodec):
+    """`orjson`, a Rust JSON library several times faster than `json`."""
+
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers wider than 64 bits, which orjson does not encode
+            return super(OrjsonCodec, self).dumpb(obj)
+
+
+class UjsonCodec(JsonCodec):
+    """`ujson`, a C JSON library faster than `json`."""
+
+    name = "ujson"
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+
+CODECS = {"json": JsonCodec}
+if ujson is not None:
+    CODECS["ujson"] = UjsonCodec
+if orjson is not None:
+    CODECS["orjson"] = OrjsonCodec
+
+# Preference order when picking a codec automatically
+_PREFERENCE = ("orjson", "ujson", "json")
+
+
+def get_codec(codec=None):
+    """
+    Return a codec instance.
+
+    - `codec` is a codec name ("orjson", "ujson" or "json"), a codec instance,
+    or None to pick the fastest installed one.
+    """
+    if codec is None:
+        codec = next(name for name in _PREFERENCE if name in CODECS)
+
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError("JSON codec {} is not installed, available: {}".format(codec, ", ".join(CODECS)))
+        return CODECS[codec]()
+
+    return codec
+
+
+default_codec = get_codec()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+    conflation.py
+
+    Latest-value table for conflated tick delivery.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import threading
+
+
+class LatestTicks:
+    """
+    Latest tick per `(exchange, token)`, and the keys changed since the last drain.
+
+    `update()` is O(1) and a burst of ticks on one token only keeps the last
+    one. `drain()` swaps out the changed set, so the writer is never blocked
+    for longer than a dict assignment.
+    """
+
+    def __init__(self):
+        self._latest = {}
+        self._changed = {}
+        self._lock = threading.Lock()
+        self._counters = {"updates": 0, "drains": 0, "delivered": 0}
+
+    def __len__(self):
+        return len(self._latest)
+
+    def __contains__(self, key):
+        return key in self._latest
+
+    def update(self, key, data):
+        """Store `data` as the latest tick for `key`."""
+        with self._lock:
+            self._latest[key] = data
+            self._changed[key] = data
+            self._counters["updates"] += 1
+
+    def get(self, exchange, token, default=None):
+        """Return the latest tick of `token` on `exchange`."""
+        return self._latest.get((exchange, str(token)), default)
+
+    def snapshot(self):
+        """Return a copy of the latest tick of every token."""
+        with self._lock:
+            return dict(self._latest)
+
+    def drain(self):
+        """Return `{key: tick}` for the keys updated since the last drain, and reset it."""
+        with self._lock:
+            changed, self._changed = self._changed, {}
+            if changed:
+                self._counters["drains"] += 1
+                self._counters["delivered"] += len(changed)
+            return changed
+
+    def discard(self, exchange, tokens):
+        """Forget `tokens` on `exchange`, e.g. after unsubscribing."""
+        with self._lock:
+            for token in tokens:
+                key = (exchange, str(token))
+                self._latest.pop(key, None)
+                self._changed.pop(key, None)
+
+    def stats(self):
+        """
+        Return the conflation counters: ticks received as `updates`, and the
+        number of `drains` that delivered `delivered` ticks.
+        """
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+    dispatch.py
+
+    Bounded hand-off of ticks from the websocket reader to user callbacks.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import collections
+import logging
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies, applied when a tick arrives and the buffer is full
+BLOCK = "block"              # wait for room, stalling the websocket reader
+DROP_OLDEST = "drop_oldest"  # discard the oldest buffered tick
+CONFLATE = "conflate"        # replace a buffered tick of the same token, else drop the oldest
+POLICIES = (BLOCK, DROP_OLDEST, CONFLATE)
+
+
+def tick_key(data):
+    """Return the `(exchange, token)` of a tick, or None if it has none."""
+    if isinstance(data, dict):
+        token = data.get("token")
+        if token is not None:
+            return data.get("exchange"), str(token)
+    return None
+
+
+class TickDispatcher:
+    """
+    Ring buffer between the websocket reader and the tick callback.
+
+    The reader only decodes and `put()`s each message, worker threads take
+    them from the buffer and run the callback. A slow callback therefore no
+    longer stalls the socket, unless the `block` policy is chosen.
+
+    With the `conflate` policy, a tick for a token that is still waiting in
+    the buffer replaces it in place, so a burst on one token costs a single
+    callback with the latest value.
+
+        dispatcher = TickDispatcher(capacity=50000, workers=2, policy="conflate")
+        ticker = EaseApiTicker(app_key, client_id, auth_token, dispatcher=dispatcher)
+
+    Ticks are delivered in arrival order with one worker. With several
+    workers, ticks of different tokens may be handled concurrently.
+    """
+
+    def __init__(self, callback=None, capacity=10000, workers=1, policy=BLOCK, key=tick_key, executor="thread"):
+        """
+        - `callback` is called with each message. When the dispatcher is given
+        to a ticker it defaults to the ticker's `on_ticks`.
+        - `capacity` is the maximum number of buffered messages.
+        - `workers` is the number of worker threads, or of processes.
+        - `policy` is `block`, `drop_oldest` or `conflate`.
+        - `key` returns the conflation key of a message, or None to never conflate it.
+        - `executor` is `thread` to run the callback on the worker threads, or
+        `process` to run it in a pool of `workers` processes. The callback must
+        then be a picklable module level function.
+        """
+        if policy not in POLICIES:
+            raise ValueError("Unknown overflow policy {}, expected one of: {}".format(policy, ", ".join(POLICIES)))
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        if capacity < 1 or workers < 1:
+            raise ValueError("capacity and workers must be positive")
+
+        if executor == "process" and callback is not None:
+            self._check_picklable(callback)
+
+        self.callback = callback
+        self.capacity = capacity
+        self.workers = workers
+        self.policy = policy
+        self.key = key
+        self.executor = executor
+
+        # Entries are [key, message] lists, so a conflated tick is swapped in place
+        self._buffer = collections.deque()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._threads = []
+        self._pool = None
+        self._running = False
+
+        self._counters = dict.fromkeys(
+            ("received", "delivered", "dropped", "conflated", "errors", "max_queued"), 0
+        )
+
+    @staticmethod
+    def _check_picklable(callback):
+        """Raise `ValueError` unless `callback` can be sent to a worker process."""
+        try:
+            pickle.dumps(callback)
+        except Exception as e:
+            raise ValueError(
+                "executor='process' needs a picklable module level callback, {!r} is not: {}".format(callback, e)
+            ) from e
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self, callback=None):
+        """Start the workers. `callback` replaces the one given to the constructor."""
+        if callback is not None:
+            self.callback = callback
+        if self.callback is None:
+            raise ValueError("TickDispatcher needs a callback")
+        if self._running:
+            return
+        if self.executor == "process":
+            self._check_picklable(self.callback)
+
+        self._running = True
+        if self.executor == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        self._threads = [
+            threading.Thread(target=self._work, name="easeapi-dispatch-{}".format(i), daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, drain=True, timeout=None):
+        """
+        Stop the workers.
+
+        - `drain`, if True, delivers the buffered messages first, otherwise they are discarded.
+        - `timeout` bounds the wait for each worker, in seconds.
+        """
+        with self._lock:
+            if not drain:
+                self._counters["dropped"] += len(self._buffer)
+                self._buffer.clear()
+                self._pending.clear()
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+        current = threading.current_thread()
+        for thread in self._threads:
+            # The callback may stop the dispatcher, e.g. by closing the ticker
+            if thread is not current:
+                thread.join(timeout)
+        self._threads = []
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def put(self, data):
+        """
+        Buffer a message for the workers.
+
+        Returns False if the dispatcher is stopped and the message was discarded.
+        """
+        key = self.key(data) if self.policy == CONFLATE else None
+
+        with self._lock:
+            if not self._running:
+                return False
+            self._counters["received"] += 1
+
+            if key is not None:
+                entry = self._pending.get(key)
+                if entry is not None:
+                    entry[1] = data
+                    self._counters["conflated"] += 1
+                    return True
+
+            if len(self._buffer) >= self.capacity:
+                if self.policy == BLOCK:
+                    while len(self._buffer) >= self.capacity and self._running:
+                        self._not_full.wait()
+                    if not self._running:
+                        return False
+                else:
+                    old_key, _ = self._buffer.popleft()
+                    if old_key is not None:
+                        del self._pending[old_key]
+                    self._counters["dropped"] += 1
+
+            entry = [key, data]
+            self._buffer.append(entry)
+            if key is not None:
+                self._pending[key] = entry
+
+            queued = len(self._buffer)
+            if queued > self._counters["max_queued"]:
+                self._counters["max_queued"] = queued
+            self._not_empty.notify()
+            return True
+
+    def _take(self):
+        """Return the next message, or raise IndexError once stopped and drained."""
+        with self._lock:
+            while not self._buffer:
+                if not self._running:
+                    raise IndexError("dispatcher stopped")
+                self._not_empty.wait()
+
+            key, data = self._buffer.popleft()
+            if key is not None:
+                del self._pending[key]
+            self._not_full.notify()
+            return data
+
+    def _work(self):
+        while True:
+            try:
+                data = self._take()
+            except IndexError:
+                return
+
+            try:
+                if self._pool is not None:
+                    self._pool.submit(self.callback, data).result()
+                else:
+                    self.callback(data)
+            except Exception:
+                logger.exception("Error in tick callback")
+                with self._lock:
+                    self._counters["errors"] += 1
+            else:
+                with self._lock:
+                    self._counters["delivered"] += 1
+
+    def stats(self):
+        """
+        Return the dispatch counters.
+
+        `received` messages were `delivered`, `dropped` on overflow or
+        `conflated` into a newer tick. `errors` counts callback exceptions,
+        `queued` is the current buffer depth and `max_queued` its high-water mark.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["queued"] = len(self._buffer)
+            return stats
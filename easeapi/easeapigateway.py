@@ -1,18 +1,36 @@
-import csv
+import collections
 import logging
-from datetime import datetime
-from urllib.parse import urljoin
-import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
 import requests
 from six import StringIO, PY2
 import hashlib
 from getmac import get_mac_address
+import time
 import uuid
 
 import easeapi.exceptions as ex
+from easeapi.codec import get_codec
+from easeapi.instruments import InstrumentColumns, InstrumentMaster, iter_csv_instruments
+from easeapi.orders import OrderStateCache
+from easeapi.pool import PooledHTTPAdapter, socket_options
+from easeapi.snapshot import InstrumentSnapshot
+from easeapi.templates import OrderTemplate, instrument_sizes
 
 log = logging.getLogger(__name__)
 
+# Outcome of one leg of a bulk order request: the API `response`, or the
+# `error` raised, and the `latency` of the request in seconds.
+OrderResult = collections.namedtuple("OrderResult", ["route", "payload", "response", "error", "latency"])
+
+
+def _same_value(a, b):
+    """Compare order fields loosely, e.g. `100` and `"100.0"` are the same quantity."""
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return str(a).strip().upper() == str(b).strip().upper()
+
 
 class EaseApiGateway:
     """
@@ -24,6 +42,17 @@ class EaseApiGateway:
     _default_root_uri = "https://easeapi.venturasecurities.com"
     _default_login_uri = f"{_default_root_uri}/auth/v1/login"
     _default_timeout = 7  # In seconds
+    _default_pool_connections = 10
+    _default_pool_maxsize = 10
+
+    # Maximum number of tokens the server accepts in one L1 quote request
+    _l1_quotes_chunk_size = 50
+    # Fields compared to find a placed order in the orderbook
+    _order_match_fields = ("instrument_id", "exchange", "transaction_type", "order_type", "product", "quantity", "price")
+    # Routes accepted by `submit_orders`
+    _order_routes = ("place_delivery_order", "place_intraday_order", "modify_order", "cancel_order")
+    # Fields a quote may carry its instrument token under
+    _quote_token_fields = ("token", "exchange_token", "instrument_token", "instrument_id")
 
     _routes = {
         "get_sso_url": f"{_default_root_uri}/auth/v1/login",
@@ -51,6 +80,15 @@ class EaseApiGateway:
         debug=False,
         timeout=None,
         disable_ssl=False,
+        native=False,
+        rate_limiter=None,
+        retry=None,
+        pool_connections=None,
+        pool_maxsize=None,
+        pool_block=False,
+        keepalive_idle=None,
+        tcp_nodelay=True,
+        codec=None,
     ):
         """
         Initialise a new EaseApi Connect client instance.
@@ -65,10 +103,32 @@ class EaseApiGateway:
         a request to complete before it fails. Defaults to 7 seconds
         - `disable_ssl` disables the SSL verification while making a request.
         If set requests won't throw SSLError if its set to custom `root` url without SSL.
+        - `native`, if set to True, returns decoded responses as native Python
+        structures (dicts, lists) instead of indented JSON strings. Every method
+        also accepts a `native` argument to override this per call.
+        - `rate_limiter` is an optional `RateLimiter` consulted before every
+        request, to pace calls per route group within the broker limits.
+        - `retry` is an optional `RetryEngine`. Read routes are then retried on
+        transient errors with jittered backoff, and failed order requests are
+        reconciled against the orderbook instead of being sent again.
+        - `pool_connections` is the number of per-host connection pools to keep. Defaults to 10.
+        - `pool_maxsize` is the maximum number of connections kept open per host.
+        Size it to the number of threads calling the client concurrently. Defaults to 10.
+        - `pool_block`, if set to True, makes callers wait for a free connection
+        instead of opening (and discarding) extra ones when the pool is exhausted.
+        - `keepalive_idle` enables TCP keep-alive probes after that many idle
+        seconds, so dead connections are detected before they are reused.
+        - `tcp_nodelay` disables Nagle's algorithm on the pooled sockets. Defaults to True.
+        - `codec` is the JSON codec used to encode requests and decode responses:
+        "orjson", "ujson", "json" or a codec instance. Defaults to the fastest installed.
         """
         self.debug = debug
         self.app_key = app_key
         self.disable_ssl = disable_ssl
+        self.native = native
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.codec = get_codec(codec)
 
         self.root = root or self._default_root_uri
         self.timeout = timeout or self._default_timeout
@@ -77,20 +137,72 @@ class EaseApiGateway:
         self.auth_token = None
         self.refresh_token = None
 
+        # Routes resolved against `root`, and the headers sent with every
+        # request, are prepared once instead of on every call.
+        self._route_urls = self._resolve_routes(self.root)
+        # Groups come from the default paths, so a `root` with a path prefix keeps them
+        self._route_groups = {
+            route: urlparse(url).path.strip("/").split("/")[0] for route, url in self._routes.items()
+        }
+        self._prepare_headers()
+
+        # Cached by get_instrument_master
+        self.instrument_master = None
+
+        # Called with no arguments when the API reports an expired session
+        self.session_expiry_hook = None
+
         # Create requests session by default
         # Same session to be used by pool connections
         self.reqsession = requests.Session()
+        self.pool_maxsize = pool_maxsize or self._default_pool_maxsize
+        adapter = PooledHTTPAdapter(
+            socket_options=socket_options(tcp_nodelay=tcp_nodelay, keepalive_idle=keepalive_idle),
+            pool_connections=pool_connections or self._default_pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.reqsession.mount("https://", adapter)
+        self.reqsession.mount("http://", adapter)
 
         # disable requests SSL warning
         requests.packages.urllib3.disable_warnings()
 
+    def warm_up(self, connections=None):
+        """
+        Pre-open pooled connections to the API host.
+
+        Call it at startup so the first orders of the day do not pay for the
+        TCP and TLS handshakes. `connections` defaults to `pool_maxsize`.
+        Returns the number of warm-up requests that succeeded.
+        """
+        connections = connections or self.pool_maxsize
+        url = self._warm_up_url()
+
+        def touch(_):
+            try:
+                self.reqsession.head(url, verify=not self.disable_ssl, timeout=self.timeout)
+                return True
+            except requests.RequestException as e:
+                log.debug("Warm-up request to {url} failed: {error}".format(url=url, error=e))
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(touch, range(connections)))
+
+    def _warm_up_url(self):
+        """Return the root URL of the host the API routes point at."""
+        return urljoin(self._route_urls["get_orderbook"], "/")
+
     def set_client_id(self, client_id):
         """Set the `client_id`."""
         self.client_id = client_id
+        self._prepare_headers()
 
     def set_auth_token(self, auth_token):
         """Set the `auth_token` received after a successful authentication."""
         self.auth_token = auth_token
+        self._prepare_headers()
 
     def set_refresh_token(self, refresh_token):
         """Set the `refresh_token` received after a successful authentication."""
@@ -98,7 +210,7 @@ class EaseApiGateway:
 
     def get_sso_url(self, state_variable):
         sso_url = (
-            f"{self._default_login_uri}?app_key={self.app_key}&state={state_variable}"
+            f"{self._route_urls['get_sso_url']}?app_key={self.app_key}&state={state_variable}"
         )
         return sso_url
 
@@ -129,47 +241,307 @@ class EaseApiGateway:
         return self._post("generate_auth_token_totp", params=payload, is_json=True, headers=additional_headers)
 
 
-    def get_instruments(self):
+    def get_instruments(self, columnar=False):
+        """
+        Return the instrument master.
+
+        - `columnar`, if set to True, returns a compact array-backed
+        `InstrumentColumns` instead of a list of dicts.
+        """
+        if columnar:
+            return InstrumentColumns.from_csv(self._iter_instrument_lines())
         return self._parse_instruments(self._get("get_instruments"))
+
+    def iter_instruments(self, predicate=None, **filters):
+        """
+        Stream the instrument master, yielding rows as they are downloaded.
+
+        The whole CSV is never held in memory, so narrowed universes can be built cheaply.
+
+        - `filters` maps a column to the value, or collection of values, to keep,
+        e.g. `exchange="NFO"` or `name=("NIFTY", "BANKNIFTY")`. They are checked
+        on the raw text, before a row is converted.
+        - `predicate`, if given, is called with each converted row and only
+        rows it returns True for are yielded.
+        """
+        return iter_csv_instruments(self._iter_instrument_lines(), predicate=predicate, **filters)
+
+    def _iter_instrument_lines(self):
+        """Yield the lines of the instruments CSV as they arrive."""
+        with self._send("get_instruments", "GET", stream=True) as r:
+            content_type = r.headers.get("content-type", "")
+            if r.status_code != 200 or "csv" not in content_type:
+                # Raises the mapped exception for API errors, e.g. an expired session
+                data = self._parse_response(r.status_code, content_type, r.content)
+                raise ex.DataException(
+                    "Couldn't download the instrument master: HTTP {code} {message}".format(
+                        code=r.status_code, message=self._error_message(data)
+                    )
+                )
+
+            r.encoding = "utf-8"
+            for line in r.iter_lines(decode_unicode=True):
+                yield line
+
+    def get_instrument_snapshot(self, cache_dir, revalidate=True):
+        """
+        Return the instrument master as `InstrumentColumns` backed by an on-disk snapshot.
+
+        - `cache_dir` is the directory the snapshot for the trading date is kept in.
+        Processes pointing at the same directory memory-map and share the same file.
+        - `revalidate`, if set to False, uses an existing snapshot as is. Otherwise a
+        conditional request is sent and the master is only downloaded if it changed.
+        """
+        return InstrumentSnapshot(cache_dir).load(self, revalidate=revalidate)
+
+    def get_instrument_master(self, refresh=False):
+        """
+        Return the indexed `InstrumentMaster`.
+
+        The master is downloaded once and cached on the client,
+        pass `refresh=True` to download it again.
+        """
+        if refresh or self.instrument_master is None:
+            self.instrument_master = InstrumentMaster(self.get_instruments() or [])
+        return self.instrument_master
     
-    def get_l1_market_quotes(self, payload):
-        return json.dumps(self._post("get_l1_market_quotes", params=payload, is_json=True), indent=2)
+    def get_l1_market_quotes(self, payload, native=None):
+        return self._format(self._post("get_l1_market_quotes", params=payload, is_json=True), native)
+
+    def get_l1_market_quotes_bulk(self, instruments, chunk_size=None, max_workers=4):
+        """
+        Fetch L1 quotes for any number of instruments across exchanges.
+
+        - `instruments` is an iterable of `(exchange, token)` pairs, e.g.
+        `[("NSE", "2885"), ("BSE", "500325"), ("NFO", "35001")]`.
+        - `chunk_size` is the number of tokens sent per request,
+        defaults to the server limit.
+        - `max_workers` is the number of requests in flight at once.
+
+        The pairs are split into per-exchange chunks which are sent concurrently
+        over the client session. Returns a dict mapping `(exchange, token)` to
+        its quote, tokens are strings.
+        """
+        payloads = self._l1_quote_payloads(instruments, chunk_size)
+        if not payloads:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as executor:
+            responses = executor.map(
+                lambda payload: self._post("get_l1_market_quotes", params=payload, is_json=True),
+                payloads,
+            )
+            return self._merge_l1_quotes(payloads, responses)
 
-    def get_user_profile(self):
-        return json.dumps(self._get("get_user_profile"), indent=2)
+    def get_user_profile(self, native=None):
+        return self._format(self._get("get_user_profile"), native)
 
-    def get_fund_details(self):
-        return json.dumps(self._get("get_fund_details"), indent=2)
+    def get_fund_details(self, native=None):
+        return self._format(self._get("get_fund_details"), native)
 
-    def place_delivery_order(self, payload):
-        return json.dumps(self._post("place_delivery_order", params=payload, is_json=True), indent=2)
+    def place_delivery_order(self, payload, native=None):
+        return self._format(self._post("place_delivery_order", params=payload, is_json=True), native)
 
-    def place_intraday_order(self, payload):
-        return json.dumps(self._post("place_intraday_order", params=payload, is_json=True), indent=2)
+    def place_intraday_order(self, payload, native=None):
+        return self._format(self._post("place_intraday_order", params=payload, is_json=True), native)
 
-    def modify_order(self, payload):
-        return json.dumps(self._post("modify_order", params=payload, is_json=True), indent=2)
+    def modify_order(self, payload, native=None):
+        return self._format(self._post("modify_order", params=payload, is_json=True), native)
 
-    def cancel_order(self, payload):
-        return json.dumps(self._post("cancel_order", params=payload, is_json=True), indent=2)
+    def cancel_order(self, payload, native=None):
+        return self._format(self._post("cancel_order", params=payload, is_json=True), native)
 
-    def get_orderbook(self):
-        return json.dumps(self._get("get_orderbook", is_json=False), indent=2)
+    def get_orderbook(self, native=None):
+        return self._format(self._get("get_orderbook", is_json=False), native)
 
-    def get_tradebook(self):
-        return json.dumps(self._get("get_tradebook"), indent=2)
+    def get_tradebook(self, native=None):
+        return self._format(self._get("get_tradebook"), native)
 
-    def get_holdings(self):
-        return json.dumps(self._get("get_holdings"), indent=2)
+    def get_holdings(self, native=None):
+        return self._format(self._get("get_holdings"), native)
 
-    def get_positions(self):
-        return json.dumps(self._get("get_positions"), indent=2)
+    def get_positions(self, native=None):
+        return self._format(self._get("get_positions"), native)
 
-    def logout(self):
+    def logout(self, native=None):
         payload = {
             "refresh_token": self.refresh_token,
         }
-        return json.dumps(self._post("logout", params=payload, is_json=True), indent=2)
+        return self._format(self._post("logout", params=payload, is_json=True), native)
+
+    def submit_orders(self, legs, max_workers=None, native=None):
+        """
+        Send many order requests concurrently, e.g. the legs of a basket.
+
+        - `legs` is an iterable of `(route, payload)` pairs, `route` being the
+        name of an order method: "place_delivery_order", "place_intraday_order",
+        "modify_order" or "cancel_order".
+        - `max_workers` is the number of requests in flight at once,
+        defaults to `pool_maxsize`.
+
+        Requests go out over the pooled session and wait for the `rate_limiter`,
+        if any. A failed leg does not stop the others: returns one `OrderResult`
+        per leg, in order, with either its response or the exception it raised.
+        """
+        legs = self._order_legs(legs)
+        if not legs:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.pool_maxsize, len(legs))) as executor:
+            return list(executor.map(lambda leg: self._submit_order(leg[0], leg[1], native), legs))
+
+    def place_orders(self, payloads, intraday=False, max_workers=None, native=None):
+        """Place many delivery orders, or intraday orders if `intraday` is set, see `submit_orders`."""
+        route = "place_intraday_order" if intraday else "place_delivery_order"
+        return self.submit_orders([(route, payload) for payload in payloads], max_workers, native)
+
+    def modify_orders(self, payloads, max_workers=None, native=None):
+        """Modify many orders, see `submit_orders`."""
+        return self.submit_orders([("modify_order", payload) for payload in payloads], max_workers, native)
+
+    def cancel_orders(self, orders, max_workers=None, native=None):
+        """Cancel many orders, given as order numbers or cancel payloads, see `submit_orders`."""
+        return self.submit_orders(self._cancel_legs(orders), max_workers, native)
+
+    def cancel_all_orders(self, exchange=None, trading_symbol=None, instrument_id=None, orders=None,
+                          max_workers=None, native=None):
+        """
+        Cancel every open order, or those matching the given filters.
+
+        - `exchange`, `trading_symbol` and `instrument_id` restrict the orders
+        cancelled, e.g. `cancel_all_orders("NSE", "RELIANCE-EQ")`.
+        - `orders` are the orders to pick from, e.g. `OrderStateCache.open_orders()`.
+        Defaults to a fresh orderbook.
+
+        Returns one `OrderResult` per cancelled order, see `submit_orders`.
+        """
+        if orders is None:
+            orders = self._response_records(self.get_orderbook(native=True))
+        open_orders = self._open_orders(orders, exchange, trading_symbol, instrument_id)
+        return self.cancel_orders(open_orders, max_workers, native)
+
+    def order_template(self, payload, intraday=False, tick_size=None, lot_size=None):
+        """
+        Validate and encode an order ahead of time, see `OrderTemplate`.
+
+        - `payload` is the order payload, as for `place_delivery_order`.
+        - `intraday` sends it as an intraday order.
+        - `tick_size` and `lot_size` default to the instrument's, looked up by
+        token, exchange and segment in the instrument master (downloaded on
+        first use). Raises `ValueError` if the instrument is not listed.
+        """
+        if tick_size is None or lot_size is None:
+            sizes = instrument_sizes(
+                self.get_instrument_master(), payload.get("instrument_id"), payload.get("exchange"), payload.get("segment")
+            )
+            tick_size = tick_size if tick_size is not None else sizes[0]
+            lot_size = lot_size if lot_size is not None else sizes[1]
+        route = "place_intraday_order" if intraday else "place_delivery_order"
+        return OrderTemplate(self, route, payload, tick_size, lot_size)
+
+    def _submit_order(self, route, payload, native=None):
+        """Send one leg of `submit_orders`, returning its `OrderResult`."""
+        started = time.perf_counter()
+        try:
+            response = self._format(self._post(route, params=payload, is_json=True), native)
+        except Exception as e:
+            return OrderResult(route, payload, None, e, time.perf_counter() - started)
+        return OrderResult(route, payload, response, None, time.perf_counter() - started)
+
+    def _order_legs(self, legs):
+        """Validate `(route, payload)` legs before any of them is sent."""
+        legs = list(legs)
+        for route, _ in legs:
+            if route not in self._order_routes:
+                raise ValueError("Unknown order route {}, expected one of: {}".format(route, ", ".join(self._order_routes)))
+        return legs
+
+    @staticmethod
+    def _cancel_legs(orders):
+        """Return cancel legs for orders given as order numbers, cancel payloads or orderbook entries."""
+        legs = []
+        for order in orders:
+            order_no = order.get("order_no") if isinstance(order, dict) else order
+            legs.append(("cancel_order", {"order_no": str(order_no)}))
+        return legs
+
+    @staticmethod
+    def _open_orders(orders, exchange=None, trading_symbol=None, instrument_id=None):
+        """Return the `orders` not in a final status that match the filters."""
+        selected = []
+        for order in orders:
+            status = order.get("status")
+            if status is not None and str(status).upper() in OrderStateCache.final_statuses:
+                continue
+            if exchange is not None and str(order.get("exchange") or "").upper() != str(exchange).upper():
+                continue
+            if trading_symbol is not None and order.get("trading_symbol") != trading_symbol:
+                continue
+            if instrument_id is not None and str(order.get("instrument_id")) != str(instrument_id):
+                continue
+            selected.append(order)
+        return selected
+
+    def _l1_quote_payloads(self, instruments, chunk_size=None):
+        """Group `(exchange, token)` pairs into per-exchange quote payloads of at most `chunk_size` tokens."""
+        chunk_size = chunk_size or self._l1_quotes_chunk_size
+
+        by_exchange = {}
+        for exchange, token in instruments:
+            tokens = by_exchange.setdefault(exchange, {})
+            tokens[str(token)] = None  # de-duplicate, keep order
+
+        payloads = []
+        for exchange, tokens in by_exchange.items():
+            tokens = list(tokens)
+            for start in range(0, len(tokens), chunk_size):
+                payloads.append({"exchange": exchange, "tokens": tokens[start:start + chunk_size]})
+        return payloads
+
+    def _merge_l1_quotes(self, payloads, responses):
+        """Merge the responses to `payloads` into one `(exchange, token)` keyed dict."""
+        quotes = {}
+        for payload, response in zip(payloads, responses):
+            exchange = payload["exchange"]
+            data = response.get("data", response) if isinstance(response, dict) else response
+
+            if isinstance(data, dict):
+                for token in payload["tokens"]:
+                    if token in data:
+                        quotes[(exchange, token)] = data[token]
+                continue
+
+            if not isinstance(data, list):
+                continue
+
+            for position, quote in enumerate(data):
+                token = None
+                if isinstance(quote, dict):
+                    token = next(
+                        (quote[field] for field in self._quote_token_fields if quote.get(field) is not None),
+                        None,
+                    )
+                if token is None and len(data) == len(payload["tokens"]):
+                    # Quotes without a token field are returned in request order
+                    token = payload["tokens"][position]
+                if token is not None:
+                    quotes[(exchange, str(token))] = quote
+        return quotes
+
+    def _format(self, data, native=None):
+        """
+        Shape a decoded response for the caller.
+
+        Returns `data` as is in native mode, otherwise re-serializes it
+        to an indented JSON string for backward compatibility.
+        """
+        if native is None:
+            native = self.native
+
+        if native:
+            return data
+
+        return self.codec.dumps_pretty(data)
 
     def _get(self, route, url_args=None, params=None, is_json=False):
         """Alias for sending a GET request."""
@@ -200,37 +572,81 @@ class EaseApiGateway:
         is_json=False,
         query_params=None,
         is_complete_url=True,
-        headers=None
+        headers=None,
+        body=None,
     ):
-        """Make an HTTP request."""
-        if url_args:
-            uri = self._routes[route].format(**url_args)
-        else:
-            uri = self._routes[route]
-
-        if not is_complete_url:
-            url = urljoin(self.root, uri)
-        else:
-            url = uri
-
-        # Custom headers
-        default_headers = {"User-Agent": "EaseApi-python/1.0.0", "X-EaseApi-Version": "1"}
-        if self.app_key:
-            default_headers["x-app-key"] = self.app_key
-
-        if self.client_id:
-            default_headers["x-client-id"] = self.client_id
+        """
+        Make an HTTP request, retrying transient failures if a `retry` engine is set.
 
-        if self.auth_token:
-            default_headers["Authorization"] = "Bearer {}".format(self.auth_token)
+        `body`, if given, is sent as is instead of encoding `params`.
+        """
+        if self.retry:
+            self.retry.budget.deposit()
 
-        if headers:
-            default_headers.update(headers)
+        attempt = 0
+        while True:
+            attempt += 1
+            error = None
+            try:
+                r = self._send(
+                    route,
+                    method,
+                    url_args=url_args,
+                    params=params,
+                    is_json=is_json,
+                    query_params=query_params,
+                    is_complete_url=is_complete_url,
+                    headers=headers,
+                    body=body,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self.retry:
+                    raise
+                error, r = e, None
+            else:
+                if not self.retry or r.status_code not in self.retry.policy(route).retry_statuses:
+                    return self._parse_response(r.status_code, r.headers.get("content-type", ""), r.content)
+
+            delay = self.retry.delay(route, attempt)
+            if delay is None:
+                if self.retry.should_reconcile(route):
+                    cause = error or "HTTP {}".format(r.status_code)
+                    try:
+                        orderbook = self.get_orderbook(native=True)
+                    except Exception as e:
+                        orderbook = e
+                    self._reconcile_order(route, params if body is None else self.codec.loads(body), orderbook, cause)
+                if error is not None:
+                    raise error
+                return self._parse_response(r.status_code, r.headers.get("content-type", ""), r.content)
+
+            log.debug("Retrying {route} in {delay:.3f}s, attempt {attempt} failed: {error}".format(
+                route=route, delay=delay, attempt=attempt, error=error or r.status_code
+            ))
+            time.sleep(delay)
+
+    def _send(
+        self,
+        route,
+        method,
+        url_args=None,
+        params=None,
+        is_json=False,
+        query_params=None,
+        is_complete_url=True,
+        headers=None,
+        stream=False,
+        body=None,
+    ):
+        """Send an HTTP request and return the raw `requests.Response`."""
+        url = self._request_url(route, url_args=url_args, is_complete_url=is_complete_url)
+        is_json = is_json and method in ["POST", "PUT"]
+        request_headers = self._request_headers(headers, is_json=is_json)
 
         if self.debug:
             log.debug(
                 "Request: {method} {url} {params}".format(
-                    method=method, url=url, params=params
+                    method=method, url=url, params=params if body is None else body
                 )
             )
 
@@ -238,36 +654,137 @@ class EaseApiGateway:
         if method in ["GET", "DELETE"]:
             query_params = params
 
+        if self.rate_limiter:
+            self.rate_limiter.acquire(self._route_group(route), route)
+
         try:
-            r = self.reqsession.request(
+            return self.reqsession.request(
                 method,
                 url,
-                json=params if (method in ["POST", "PUT"] and is_json) else None,
-                data=params if (method in ["POST", "PUT"] and not is_json) else None,
+                data=self._request_body(params, body, method, is_json),
                 params=query_params,
-                headers=default_headers,
+                headers=request_headers,
                 verify=not self.disable_ssl,
                 allow_redirects=True,
                 timeout=self.timeout,
+                stream=stream,
             )
         except Exception as e:
             raise e
 
+    def _request_body(self, params, body, method, is_json):
+        """Return the request body: `body` if already encoded, else `params` encoded as JSON or form data."""
+        if body is not None:
+            return body
+        if params is None or method not in ["POST", "PUT"]:
+            return None
+        return self.codec.dumpb(params) if is_json else params
+
+    def _request_url(self, route, url_args=None, is_complete_url=True):
+        """Resolve the URL for `route`."""
+        if url_args:
+            uri = self._route_urls[route].format(**url_args)
+        else:
+            uri = self._route_urls[route]
+
+        if not is_complete_url:
+            return urljoin(self.root, uri)
+
+        return uri
+
+    def _reconcile_order(self, route, params, orderbook, cause):
+        """
+        Raise `OrderStateUnknownException` for an order request that failed in flight,
+        carrying the orders in `orderbook` that match it. `orderbook` is the
+        exception raised instead if it could not be fetched.
+        """
+        if isinstance(orderbook, Exception):
+            raise ex.OrderStateUnknownException(
+                "{route} failed in flight ({cause}) and the orderbook could not be fetched: {error}".format(
+                    route=route, cause=cause, error=orderbook
+                )
+            ) from orderbook
+
+        orders = self._match_orders(route, params or {}, self._response_records(orderbook))
+        raise ex.OrderStateUnknownException(
+            "{route} failed in flight ({cause}), {count} matching order(s) in the orderbook".format(
+                route=route, cause=cause, count=len(orders)
+            ),
+            orders=orders,
+        )
+
+    def _match_orders(self, route, params, orders):
+        """Return the orderbook entries that `params` of an order `route` could have produced."""
+        if route in ("modify_order", "cancel_order"):
+            order_no = str(params.get("order_no"))
+            return [order for order in orders if str(order.get("order_no")) == order_no]
+
+        fields = [field for field in self._order_match_fields if field in params]
+        return [
+            order
+            for order in orders
+            if all(field in order and _same_value(order[field], params[field]) for field in fields)
+        ]
+
+    @staticmethod
+    def _response_records(data):
+        """Return the list of records in an API response, e.g. the orders of an orderbook."""
+        if isinstance(data, dict):
+            data = data.get("data", [])
+        return data if isinstance(data, list) else []
+
+    def _route_group(self, route):
+        """Return the rate limit group of `route`, the first segment of its path."""
+        return self._route_groups[route]
+
+    def _resolve_routes(self, root):
+        """Return the `_routes` table rebased onto `root`."""
+        root = root.rstrip("/")
+        return {
+            route: root + url[len(self._default_root_uri):] if url.startswith(self._default_root_uri) else url
+            for route, url in self._routes.items()
+        }
+
+    def _prepare_headers(self):
+        """Build the headers sent with every request, called whenever the credentials change."""
+        # Custom headers
+        default_headers = {"User-Agent": "EaseApi-python/1.0.0", "X-EaseApi-Version": "1"}
+        if self.app_key:
+            default_headers["x-app-key"] = self.app_key
+
+        if self.client_id:
+            default_headers["x-client-id"] = self.client_id
+
+        if self.auth_token:
+            default_headers["Authorization"] = "Bearer {}".format(self.auth_token)
+
+        self._headers = default_headers
+        self._json_headers = {**default_headers, "Content-Type": "application/json"}
+
+    def _request_headers(self, headers=None, is_json=False):
+        """Return the headers for a request, `headers` are merged over the prepared ones."""
+        prepared = self._json_headers if is_json else self._headers
+        if not headers:
+            return prepared
+        return {**prepared, **headers}
+
+    def _parse_response(self, status_code, content_type, content):
+        """Decode a response body and map API errors to exceptions."""
         if self.debug:
             log.debug(
                 "Response: {code} {content_type} {response_content}".format(
-                    code=r.status_code, content_type=r.headers["content-type"], response_content=r.text
+                    code=status_code, content_type=content_type, response_content=content
                 )
             )
 
         # Validate the content type.
-        if "json" in r.headers["content-type"]:
+        if "json" in content_type:
             try:
-                data = r.json()
+                data = self.codec.loads(content)
             except ValueError:
                 raise ex.DataException(
                     "Couldn't parse the JSON response received from the server: {content}".format(
-                        content=r.content
+                        content=content
                     )
                 )
 
@@ -279,40 +796,31 @@ class EaseApiGateway:
                 # Call session hook if its registered as session is expired
                 if self.session_expiry_hook:
                     self.session_expiry_hook()
-                raise ex.AuthTokenException(data["message"], r.status_code)
+                raise ex.AuthTokenException(data["message"], status_code)
 
             return data
-        elif "csv" in r.headers["content-type"]:
-            return r.content
+        elif "csv" in content_type:
+            return content
         else:
             raise ex.DataException(
                 "Unknown Content-Type ({content_type}) with response: ({content})".format(
-                    content_type=r.headers["content-type"], content=r.content
+                    content_type=content_type, content=content
                 )
             )
 
+    @staticmethod
+    def _error_message(data):
+        """Return the message of a decoded API error, or the whole of it."""
+        if isinstance(data, dict) and data.get("message"):
+            return data["message"]
+        return data
+
     def _parse_instruments(self, data):
         d = data
         # Decode unicode data
         if not PY2 and type(d) == bytes:
             d = data.decode("utf-8").strip()
-            
-            records = []
-            reader = csv.DictReader(StringIO(d))
-
-            for row in reader:
-                row["exchange_token"] = int(row["exchange_token"])
-                row["last_price"] = float(row["last_price"])
-                row["tick_size"] = float(row["tick_size"])
-                row["lot_size"] = int(row["lot_size"])
-
-                # # Parse date
-                if len(row["expiry"]) == 10:
-                    row["expiry"] = datetime.strptime(row["expiry"], "%d/%m/%Y").date()
-
-                records.append(row)
-
-            return records
+            return list(iter_csv_instruments(StringIO(d)))
         else:
             return None    
         
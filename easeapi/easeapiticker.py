@@ -1,9 +1,12 @@
-import json
 import time
 import logging
 import threading
 import websocket
 
+from easeapi.codec import DecodeError, get_codec
+from easeapi.conflation import LatestTicks
+import easeapi.ticks as tick_models
+
 logger = logging.getLogger(__name__)
 
 class EaseApiTicker:
@@ -24,7 +27,7 @@ class EaseApiTicker:
     EXCHANGE_FNO = "fno"  # NSE Futures & Options
     EXCHANGE_BFO = "bfo"  # BSE Futures & Options
     
-    def __init__(self, app_key, client_id, auth_token):
+    def __init__(self, app_key, client_id, auth_token, codec=None, dispatcher=None, conflate=False, conflate_interval=None, quote_table=None, tick_model="dict", recorder=None, batch_size=1000):
         """
         Initialize the EaseApiTicker.
         
@@ -36,8 +39,63 @@ class EaseApiTicker:
             Your client ID
         auth_token : str
             Your authentication token
+        codec : str or codec, optional
+            JSON codec used for messages: "orjson", "ujson" or "json".
+            Defaults to the fastest one installed.
+        dispatcher : TickDispatcher, optional
+            Buffers ticks and calls `on_ticks` from worker threads, so a slow
+            callback does not stall the websocket. See `easeapi.dispatch`.
+            A dispatcher with `executor="process"` needs its own callback.
+        conflate : bool, optional
+            If True, only the latest tick per (exchange, token) is kept and
+            `on_ticks` receives a list of the ticks that changed since the
+            last delivery, every `conflate_interval` seconds or when
+            `flush_ticks()` is called.
+        conflate_interval : float, optional
+            Seconds between conflated or batched deliveries. If None (default),
+            ticks are only delivered by `flush_ticks()`, or when a batch is full.
+        quote_table : SharedQuoteTable, optional
+            Table created by this process in which the latest LTP of every
+            token is stored, for other processes to read. See `easeapi.quotetable`.
+        tick_model : str, optional
+            How LTP ticks are handed to `on_ticks`: "dict" (default) as decoded,
+            or "numpy" as structured array batches (requires numpy). With
+            `conflate`, each conflated delivery is one array. Without it, every
+            received tick is kept and delivered in arrays of `batch_size`
+            ticks. Other messages are always passed as decoded.
+        recorder : TickRecorder, optional
+            Appends every received message to a binary recording, which
+            `ReplayTicker` can play back. See `easeapi.recorder`.
+        batch_size : int, optional
+            Ticks per array with `tick_model="numpy"` and no conflation.
+            Partial batches are delivered every `conflate_interval` seconds
+            and by `flush_ticks()`.
         """
+        if tick_model not in tick_models.TICK_MODELS:
+            raise ValueError(f"Unknown tick model {tick_model}, expected one of: {', '.join(tick_models.TICK_MODELS)}")
+        if tick_model == tick_models.NUMPY and tick_models.numpy is None:
+            raise ImportError("tick_model='numpy' requires numpy, install it with `pip install numpy`")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        if dispatcher is not None and dispatcher.executor == "process" and dispatcher.callback is None:
+            # `on_ticks` would be called through the ticker, which cannot be sent to another process
+            raise ValueError("A dispatcher with executor='process' needs its own picklable module level callback")
+
         self.app_key = app_key
+        self.codec = get_codec(codec)
+        self.dispatcher = dispatcher
+        self.latest_ticks = LatestTicks() if conflate else None
+        self.conflate_interval = conflate_interval
+        self.quote_table = quote_table
+        self.tick_model = tick_model
+        self.recorder = recorder
+        self.batch_size = batch_size
+        # Every tick received since the last batch, for numpy batches without conflation
+        self._batch = [] if tick_model == tick_models.NUMPY and not conflate else None
+        self._batch_lock = threading.Lock()
+        self.flush_thread = None
+        self._flush_stop = threading.Event()
         self.client_id = client_id
         self.auth_token = auth_token
         self.ws = None
@@ -64,6 +122,8 @@ class EaseApiTicker:
         
         # Subscribed instruments - store as dict with exchange as key and set of tokens as value. e.g. {"nse": {"2885", "15"}, "bse": {"500570"}}
         self.subscriptions = {}
+        # Exchange of each subscribed token, for ticks that do not carry one
+        self._token_exchanges = {}
         
         self.on_ticks = None
         self.on_connect = None
@@ -93,6 +153,8 @@ class EaseApiTicker:
         self.connecting = True
         logger.info(f"Connecting to EaseAPI WebSocket ({endpoint_type})...")
         
+        self._start_delivery()
+        
         self.ws = websocket.WebSocketApp(
             self.ws_url,
             on_open=self._on_open,
@@ -105,6 +167,17 @@ class EaseApiTicker:
         self.ws_thread.daemon = True
         self.ws_thread.start()
     
+    def _start_delivery(self):
+        """Start the dispatcher workers and the conflation timer, if configured."""
+        if self.dispatcher and not self.dispatcher.running:
+            self.dispatcher.start(None if self.dispatcher.callback else self._dispatch_ticks)
+        
+        batched = self.latest_ticks is not None or self._batch is not None
+        if batched and self.conflate_interval and not self.flush_thread:
+            self._flush_stop.clear()
+            self.flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self.flush_thread.start()
+    
     def _on_open(self, ws):
         """WebSocket on_open event handler."""
         logger.info("WebSocket connected successfully")
@@ -121,14 +194,98 @@ class EaseApiTicker:
     
     def _on_message(self, ws, message):
         """WebSocket on_message event handler."""
+        if self.recorder is not None:
+            self.recorder.write(message)
+        
         try:
-            data = json.loads(message)
-            if self.on_ticks:
-                self.on_ticks(self, data)
-            else:
-                logger.debug(f"Received tick data: {data}")
-        except json.JSONDecodeError:
+            data = self.codec.loads(message)
+        except DecodeError:
             logger.warning(f"Received non-JSON message: {message}")
+            return
+        
+        key = None
+        if self.latest_ticks is not None or self.quote_table is not None or self.tick_model != tick_models.DICT:
+            key = self.tick_key(data)
+            if key is not None and self.quote_table is not None:
+                self.quote_table.write_tick(key, data)
+        
+        if key is not None and self.latest_ticks is not None:
+            self.latest_ticks.update(key, data)
+        elif key is not None and self._batch is not None and "ltp" in data:
+            with self._batch_lock:
+                self._batch.append((key, data))
+                if len(self._batch) < self.batch_size:
+                    return
+                items, self._batch = self._batch, []
+            self._emit(tick_models.tick_array(items))
+        else:
+            self._emit(data)
+    
+    def _emit(self, data):
+        """Hand ticks to the dispatcher, or straight to `on_ticks`."""
+        if self.dispatcher:
+            self.dispatcher.put(data)
+        elif self.on_ticks:
+            self.on_ticks(self, data)
+        else:
+            logger.debug(f"Received tick data: {data}")
+    
+    def tick_key(self, data):
+        """
+        Return the (exchange, token) of a decoded tick, taking the exchange from
+        the subscriptions if the tick has none. None if it is not a tick.
+        """
+        if not isinstance(data, dict) or data.get("token") is None:
+            return None
+        
+        token = str(data["token"])
+        exchange = data.get("exchange") or self._token_exchanges.get(token)
+        if exchange is None:
+            # Subscriptions assigned directly rather than through subscribe()
+            for subscribed_exchange, tokens in list(self.subscriptions.items()):
+                if token in tokens:
+                    exchange = subscribed_exchange
+                    break
+        return exchange, token
+    
+    def flush_ticks(self):
+        """
+        Deliver the conflated ticks that changed since the last delivery, or
+        the partial batch of numpy ticks.
+        
+        Returns:
+        --------
+        list or numpy.ndarray
+            The delivered ticks, one per (exchange, token) when conflated
+        """
+        if self._batch is not None:
+            with self._batch_lock:
+                items, self._batch = self._batch, []
+            ticks = tick_models.tick_array(items)
+        elif self.latest_ticks is None:
+            raise RuntimeError("flush_ticks() requires conflate=True or tick_model='numpy'")
+        else:
+            changed = self.latest_ticks.drain()
+            if self.tick_model == tick_models.DICT:
+                ticks = list(changed.values())
+            else:
+                ticks = tick_models.tick_array([item for item in changed.items() if tick_models.is_tick(item[1])])
+        if len(ticks):
+            self._emit(ticks)
+        return ticks
+    
+    def _flush_loop(self):
+        """Deliver conflated or batched ticks every `conflate_interval` seconds until closed."""
+        while not self._flush_stop.wait(self.conflate_interval):
+            try:
+                self.flush_ticks()
+            except Exception as e:
+                logger.error(f"Error delivering ticks: {e}")
+    
+    def _dispatch_ticks(self, data):
+        """Deliver a tick taken from the dispatcher to `on_ticks`."""
+        if self.on_ticks:
+            self.on_ticks(self, data)
     
     def _on_error(self, ws, error):
         """WebSocket on_error event handler."""
@@ -222,6 +379,10 @@ class EaseApiTicker:
             logger.warning("Cannot subscribe, WebSocket not connected")
             return False
         
+        return self.send(self._subscribe_message(tokens, exchange, skip_add))
+    
+    def _subscribe_message(self, tokens, exchange, skip_add=False):
+        """Record the subscription and build its message."""
         # Validate exchange
         if exchange not in [self.EXCHANGE_NSE, self.EXCHANGE_BSE, self.EXCHANGE_FNO, self.EXCHANGE_BFO]:
             logger.warning(f"Unsupported exchange: {exchange}. Using NSE as default.")
@@ -245,6 +406,8 @@ class EaseApiTicker:
             
             # Add tokens to the subscription set
             self.subscriptions[exchange].update(tokens)
+            for token in tokens:
+                self._token_exchanges.setdefault(token, exchange)
         
         # Create subscription message
         subscribe_msg = {
@@ -253,7 +416,7 @@ class EaseApiTicker:
             "mode": "sub"
         }
         
-        return self.send(subscribe_msg)
+        return subscribe_msg
     
     def unsubscribe(self, tokens, exchange="nse"):
         """
@@ -276,6 +439,10 @@ class EaseApiTicker:
             logger.warning("Cannot unsubscribe, WebSocket not connected")
             return False
         
+        return self.send(self._unsubscribe_message(tokens, exchange))
+    
+    def _unsubscribe_message(self, tokens, exchange):
+        """Remove the subscription and build its message."""
         # Validate exchange
         if exchange not in [self.EXCHANGE_NSE, self.EXCHANGE_BSE, self.EXCHANGE_FNO, self.EXCHANGE_BFO]:
             logger.warning(f"Unsupported exchange: {exchange}. Using NSE as default.")
@@ -300,6 +467,13 @@ class EaseApiTicker:
             # Remove the exchange key if no tokens left
             if not self.subscriptions[exchange]:
                 del self.subscriptions[exchange]
+            
+            for token in tokens:
+                if self._token_exchanges.get(token) == exchange:
+                    del self._token_exchanges[token]
+        
+        if self.latest_ticks is not None:
+            self.latest_ticks.discard(exchange, tokens)
         
         # Create unsubscription message
         unsubscribe_msg = {
@@ -308,7 +482,7 @@ class EaseApiTicker:
             "mode": "unsub"
         }
         
-        return self.send(unsubscribe_msg)
+        return unsubscribe_msg
     
     def send(self, data):
         """
@@ -330,7 +504,7 @@ class EaseApiTicker:
         
         try:
             if isinstance(data, dict):
-                data = json.dumps(data)
+                data = self.codec.dumps(data)
             self.ws.send(data)
             return True
         except Exception as e:
@@ -345,6 +519,16 @@ class EaseApiTicker:
         
         if self.ws:
             self.ws.close()
+        
+        if self.flush_thread:
+            self._flush_stop.set()
+            self.flush_thread = None
+        
+        if self.dispatcher:
+            self.dispatcher.stop()
+        
+        if self.recorder:
+            self.recorder.flush()
             
         self.connected = False
         logger.info("WebSocket connection closed")
@@ -53,3 +53,25 @@ class ParameterException(EaseApiException):
     def __init__(self, message, code=503):
         """Initialize the exception."""
         super(ParameterException, self).__init__(message, code)
+
+
+class NetworkException(EaseApiException):
+    """Represents a network issue between the client and the EaseApi server. Default code is 503."""
+
+    def __init__(self, message, code=503):
+        """Initialize the exception."""
+        super(NetworkException, self).__init__(message, code)
+
+
+class OrderStateUnknownException(NetworkException):
+    """
+    An order request failed in flight, so it may or may not have reached the exchange.
+
+    `.orders` holds the orderbook entries matching the request (empty if none
+    were found), or None if the orderbook itself could not be fetched.
+    """
+
+    def __init__(self, message, orders=None, code=503):
+        """Initialize the exception."""
+        super(OrderStateUnknownException, self).__init__(message, code)
+        self.orders = orders
@@ -0,0 +1,515 @@
+# -*- coding: utf-8 -*-
+"""
+    instruments.py
+
+    In-memory representations of the instrument master.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import csv
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+# Columns the strike price may be published under.
+STRIKE_FIELDS = ("strike", "strike_price")
+
+# Typecodes of the columns InstrumentColumns stores as typed arrays.
+INT_COLUMNS = {"exchange_token": "q", "lot_size": "q"}
+FLOAT_COLUMNS = {"last_price": "d", "tick_size": "d"}
+
+OPTION_TYPES = ("CE", "PE")
+
+
+# The master repeats a handful of distinct expiry strings across every
+# contract, so each one is only parsed once.
+_expiry_cache = {}
+
+
+def parse_expiry(text):
+    """Parse a `DD/MM/YYYY` expiry into a `date`, other values are returned as is."""
+    try:
+        return _expiry_cache[text]
+    except KeyError:
+        pass
+
+    if not isinstance(text, str):
+        return text
+
+    value = text
+    if len(text) == 10:
+        value = date(int(text[6:10]), int(text[3:5]), int(text[0:2]))
+    if len(_expiry_cache) < 4096:
+        _expiry_cache[text] = value
+    return value
+
+
+def _expiry_ordinal(value):
+    value = parse_expiry(value)
+    return value.toordinal() if isinstance(value, date) else 0
+
+
+def _converters(fields):
+    """Return `(index, cast)` pairs for the typed columns of a CSV header."""
+    casts = {"expiry": parse_expiry}
+    casts.update((field, int) for field in INT_COLUMNS)
+    casts.update((field, float) for field in FLOAT_COLUMNS)
+    return [(index, casts[field]) for index, field in enumerate(fields) if field in casts]
+
+
+def iter_csv_instruments(lines, predicate=None, **filters):
+    """
+    Parse instrument rows lazily from an iterable of CSV lines.
+
+    - `lines` yields the CSV text line by line, header first.
+    - `filters` maps a column to the value, or collection of values, to keep.
+    They are checked against the raw text before a row is converted, e.g.
+    `exchange="NFO"` or `name=("NIFTY", "BANKNIFTY")`.
+    - `predicate`, if given, is called with each converted row and only
+    rows it returns True for are yielded.
+    """
+    reader = csv.reader(lines)
+    fields = next(reader, None)
+    if fields is None:
+        return
+
+    parse = _row_parser(fields, predicate, filters)
+    for values in reader:
+        row = parse(values)
+        if row is not None:
+            yield row
+
+
+async def aiter_csv_instruments(batches, predicate=None, **filters):
+    """
+    Parse instrument rows lazily from an async iterable of CSV line batches,
+    e.g. the chunks of a streamed download. See `iter_csv_instruments`.
+
+    - `batches` yields lists of complete CSV lines, header first.
+    """
+    parse = None
+    async for lines in batches:
+        reader = csv.reader(lines)
+        if parse is None:
+            fields = next(reader, None)
+            if fields is None:
+                continue
+            parse = _row_parser(fields, predicate, filters)
+        for values in reader:
+            row = parse(values)
+            if row is not None:
+                yield row
+
+
+def _row_parser(fields, predicate, filters):
+    """Return a function converting the raw values of a row to an instrument dict, None if filtered out."""
+    converters = _converters(fields)
+    checks = []
+    for field, allowed in filters.items():
+        if isinstance(allowed, (str, int, float)):
+            allowed = (allowed,)
+        checks.append((fields.index(field), frozenset(str(value) for value in allowed)))
+
+    def parse(values):
+        if not values:
+            return None
+        if checks and not all(values[index].strip() in allowed for index, allowed in checks):
+            return None
+
+        for index, cast in converters:
+            values[index] = cast(values[index])
+        row = dict(zip(fields, values))
+        if predicate is None or predicate(row):
+            return row
+        return None
+
+    return parse
+
+
+def _int(value):
+    return int(value) if value else 0
+
+
+def _float(value):
+    return float(value) if value else 0.0
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _strike(row):
+    for field in STRIKE_FIELDS:
+        value = row.get(field)
+        if value not in (None, ""):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class InstrumentMaster:
+    """
+    Instrument master with constant time lookups and option chain queries.
+
+    Built once from the rows returned by `EaseApiGateway.get_instruments`, it
+    indexes instruments by `exchange_token`, by `(exchange, trading_symbol)`
+    and by underlying `name`. Derivatives are additionally kept sorted by
+    expiry and strike so range queries only touch the matching slice.
+    """
+
+    def __init__(self, instruments):
+        """
+        - `instruments` is a sequence of instrument rows (dicts), as returned
+        by `EaseApiGateway.get_instruments`, or an iterable of them such as
+        `EaseApiGateway.iter_instruments`.
+        """
+        if not isinstance(instruments, (list, tuple, InstrumentColumns)):
+            instruments = list(instruments)
+        self.instruments = instruments
+
+        self._by_token = {}
+        self._by_symbol = {}
+        self._by_name = {}
+        # name -> {expiry: ([strike, ...], [row, ...])}, sorted by strike
+        self._chains = {}
+        # name -> [expiry, ...], sorted
+        self._expiries = {}
+
+        self._build()
+
+    def __len__(self):
+        return len(self.instruments)
+
+    def __iter__(self):
+        return iter(self.instruments)
+
+    def _build(self):
+        pending = {}
+
+        for row in self.instruments:
+            exchange = _text(row.get("exchange"))
+            name = _text(row.get("name"))
+
+            self._by_token.setdefault(row.get("exchange_token"), []).append(row)
+            self._by_symbol[(exchange, _text(row.get("trading_symbol")))] = row
+            if name:
+                self._by_name.setdefault(name, []).append(row)
+
+            expiry = row.get("expiry")
+            if name and isinstance(expiry, date):
+                pending.setdefault(name, {}).setdefault(expiry, []).append(
+                    (_strike(row), row)
+                )
+
+        for name, by_expiry in pending.items():
+            chains = {}
+            for expiry, entries in by_expiry.items():
+                # Futures carry no strike, keep them ahead of the options
+                entries.sort(key=lambda entry: -1.0 if entry[0] is None else entry[0])
+                chains[expiry] = (
+                    [-1.0 if strike is None else strike for strike, _ in entries],
+                    [row for _, row in entries],
+                )
+            self._chains[name] = chains
+            self._expiries[name] = sorted(chains)
+
+    def by_token(self, exchange_token, exchange=None, segment=None):
+        """
+        Return the instrument for `exchange_token`, or None.
+
+        Tokens are only unique within an exchange, pass `exchange` to
+        disambiguate when the same token is listed on more than one, and
+        `segment` to also require the instrument's segment.
+        """
+        rows = self._by_token.get(int(exchange_token), ())
+        for row in rows:
+            if exchange is not None and _text(row.get("exchange")) != exchange:
+                continue
+            if segment is not None and _text(row.get("segment")) != segment:
+                continue
+            return row
+        return None
+
+    def by_symbol(self, exchange, trading_symbol):
+        """Return the instrument for `(exchange, trading_symbol)`, or None."""
+        return self._by_symbol.get((exchange, trading_symbol))
+
+    def by_name(self, name):
+        """Return all instruments (cash and derivatives) on the underlying `name`."""
+        return list(self._by_name.get(name, ()))
+
+    def expiries(self, name):
+        """Return the sorted expiry dates listed for the underlying `name`."""
+        return list(self._expiries.get(name, ()))
+
+    def futures(self, name, expiry_from=None, expiry_to=None):
+        """Return the futures on `name`, ordered by expiry."""
+        return [
+            row
+            for row in self.derivatives(name, expiry_from=expiry_from, expiry_to=expiry_to)
+            if _text(row.get("instrument")) not in OPTION_TYPES
+        ]
+
+    def option_chain(
+        self,
+        name,
+        expiry=None,
+        option_type=None,
+        strike_min=None,
+        strike_max=None,
+    ):
+        """
+        Return the options on `name`, ordered by expiry then strike.
+
+        - `expiry` limits the chain to a single expiry date, all expiries are returned otherwise
+        - `option_type` is "CE" or "PE", both are returned by default
+        - `strike_min` and `strike_max` bound the strike range (inclusive)
+        """
+        if expiry is not None:
+            expiry_from = expiry_to = expiry
+        else:
+            expiry_from = expiry_to = None
+
+        return [
+            row
+            for row in self.derivatives(
+                name,
+                expiry_from=expiry_from,
+                expiry_to=expiry_to,
+                strike_min=strike_min,
+                strike_max=strike_max,
+            )
+            if _text(row.get("instrument")) in ((option_type,) if option_type else OPTION_TYPES)
+        ]
+
+    def derivatives(
+        self,
+        name,
+        expiry_from=None,
+        expiry_to=None,
+        strike_min=None,
+        strike_max=None,
+    ):
+        """
+        Return the derivatives on `name` in an expiry and strike range.
+
+        All bounds are inclusive and optional. Rows are ordered by expiry, then strike.
+        """
+        expiries = self._expiries.get(name)
+        if not expiries:
+            return []
+
+        lo = 0 if expiry_from is None else bisect_left(expiries, expiry_from)
+        hi = len(expiries) if expiry_to is None else bisect_right(expiries, expiry_to)
+
+        chains = self._chains[name]
+        result = []
+        for expiry in expiries[lo:hi]:
+            strikes, rows = chains[expiry]
+            start = 0 if strike_min is None else bisect_left(strikes, strike_min)
+            end = len(strikes) if strike_max is None else bisect_right(strikes, strike_max)
+            result.extend(rows[start:end])
+        return result
+
+
+class _StringColumn:
+    """Dictionary-encoded string column: each distinct value is stored once."""
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self):
+        self.values = []
+        self.codes = array("I")
+        self._lookup = {}
+
+    def append(self, value):
+        if self._lookup is None:
+            self._lookup = {value: code for code, value in enumerate(self.values)}
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def compact(self):
+        """Drop the encoding lookup table, it is rebuilt if more values are appended."""
+        self._lookup = None
+
+
+class InstrumentColumns:
+    """
+    Columnar, array-backed instrument master.
+
+    `exchange_token`, `last_price`, `tick_size` and `lot_size` are kept in
+    typed arrays, `expiry` as integer day numbers (`date.toordinal()`, 0 when
+    there is none) and every other column dictionary-encoded, so the memory
+    cost per row is a few dozen bytes instead of a dict of boxed values.
+
+    Indexing returns a row as a dict shaped like the ones from
+    `EaseApiGateway.get_instruments`, so an `InstrumentMaster` can be built on top.
+    """
+
+    def __init__(self, fields):
+        """
+        - `fields` is the list of column names, in CSV order.
+        """
+        self.fields = list(fields)
+        self.columns = {}
+        # (append, cast) per field, in CSV order
+        self._appenders = []
+        for field in self.fields:
+            if field in INT_COLUMNS:
+                column, cast = array(INT_COLUMNS[field]), _int
+            elif field in FLOAT_COLUMNS:
+                column, cast = array(FLOAT_COLUMNS[field]), _float
+            elif field == "expiry":
+                column, cast = array("l"), _expiry_ordinal
+            else:
+                column, cast = _StringColumn(), None
+            self.columns[field] = column
+            self._appenders.append((column.append, cast))
+        self._length = 0
+
+    @classmethod
+    def from_columns(cls, fields, columns, length):
+        """Wrap prebuilt column buffers, e.g. the read-only views of a memory-mapped snapshot."""
+        instance = cls(())
+        instance.fields = list(fields)
+        instance.columns = columns
+        instance._length = length
+        return instance
+
+    @classmethod
+    def from_csv(cls, data):
+        """
+        Build the columns straight from the raw instruments CSV (bytes, str or an iterable of lines).
+
+        Unquoted CSV given as bytes or str is split into columns in bulk and
+        each column is cast in one pass, other input is parsed row by row.
+        """
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        if isinstance(data, str):
+            data = data.strip()
+            if '"' not in data:
+                columns = cls._from_unquoted_csv(data)
+                if columns is not None:
+                    return columns
+            data = data.splitlines()
+
+        reader = csv.reader(data)
+        columns = cls(next(reader, ()))
+        append_values = columns.append_values
+        for values in reader:
+            if values:
+                append_values(values)
+        columns.compact()
+        return columns
+
+    @classmethod
+    def _from_unquoted_csv(cls, text):
+        """
+        Split an unquoted CSV into columns with a single `str.split` and cast column by column.
+
+        Returns None if the rows are ragged, the caller then falls back to the csv module.
+        """
+        lines = [line for line in text.splitlines() if line]
+        if not lines:
+            return None
+        fields = lines[0].split(",")
+        width = len(fields)
+        length = len(lines) - 1
+
+        cells = ",".join(lines[1:]).split(",") if length else []
+        del lines
+        if len(cells) != width * length:
+            return None
+
+        columns = {}
+        for index, field in enumerate(fields):
+            values = cells[index::width]
+            if field in INT_COLUMNS or field in FLOAT_COLUMNS:
+                typecode = INT_COLUMNS.get(field) or FLOAT_COLUMNS[field]
+                columns[field] = array(typecode, map(_int if field in INT_COLUMNS else _float, values))
+            elif field == "expiry":
+                columns[field] = array("l", map(_expiry_ordinal, values))
+            else:
+                column = _StringColumn()
+                lookup = {}
+                column.codes = array("I", [lookup.setdefault(value, len(lookup)) for value in values])
+                column.values = list(lookup)
+                columns[field] = column
+
+        return cls.from_columns(fields, columns, length)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build the columns from a list of instrument dicts."""
+        records = iter(records)
+        first = next(records, None)
+        if first is None:
+            return cls(())
+        columns = cls(first.keys())
+        columns.append(first)
+        for record in records:
+            columns.append(record)
+        columns.compact()
+        return columns
+
+    def append(self, record):
+        """Append an instrument dict."""
+        self.append_values([record.get(field) for field in self.fields])
+
+    def append_values(self, values):
+        """Append a row given as a list of values in `fields` order."""
+        for (append, cast), value in zip(self._appenders, values):
+            append(cast(value) if cast else value)
+        self._length += 1
+
+    def compact(self):
+        """Release the memory only needed while appending rows."""
+        for column in self.columns.values():
+            if isinstance(column, _StringColumn):
+                column.compact()
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self.row(index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("instrument index out of range")
+        return self.row(index)
+
+    def column(self, field):
+        """Return the backing array of a numeric column, or the decoded values of a string column."""
+        column = self.columns[field]
+        if isinstance(column, _StringColumn):
+            return [column.values[code] for code in column.codes]
+        return column
+
+    def row(self, index):
+        """Materialize row `index` as an instrument dict."""
+        row = {}
+        for field in self.fields:
+            value = self.columns[field][index]
+            if field == "expiry":
+                value = date.fromordinal(value) if value else ""
+            row[field] = value
+        return row
+
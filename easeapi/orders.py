@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+    orders.py
+
+    In-process order state, kept current by the order-status websocket.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class OrderStateCache:
+    """
+    Latest state of every order of the day, by order number.
+
+    The cache is seeded from `get_orderbook` once, then kept current by the
+    messages of the order-status websocket, so order state is a dict lookup
+    instead of a REST round trip:
+
+        orders = OrderStateCache(gateway)
+        order_ticker = EaseApiTicker(app_key, client_id, auth_token)
+        orders.attach(order_ticker)
+        order_ticker.connect(use_order_status=True)
+
+        orders.get("250000001")["status"]
+        orders.by_symbol("NSE", "RELIANCE-EQ")
+        orders.open_orders()
+
+    Updates missed while the websocket was down are recovered by reloading
+    the orderbook on every (re)connect, retried until it succeeds. Messages
+    received during the reload are held back and applied on top of it. An
+    update older than the cached order is ignored: an order in a final
+    status never goes back to an earlier one, and its filled quantity never
+    goes down.
+
+    Order dicts are shared with the cache and updated in place, copy them
+    to keep a point-in-time view.
+    """
+
+    # Statuses after which an order no longer changes
+    final_statuses = frozenset(["COMPLETE", "COMPLETED", "EXECUTED", "TRADED", "CANCELLED", "CANCELED", "REJECTED", "EXPIRED"])
+    # Fields an order may carry its filled quantity under, which only goes up
+    filled_fields = ("filled_quantity", "filled_qty", "traded_quantity")
+    # Seconds before a failed background reload is retried, doubled up to `max_resync_delay`
+    resync_delay = 1.0
+    max_resync_delay = 60.0
+
+    def __init__(self, gateway, on_update=None, order_field="order_no", symbol_field="trading_symbol", status_field="status"):
+        """
+        - `gateway` is the `EaseApiGateway` the orderbook is loaded from.
+        - `on_update` is called with `(order, previous)` after every change,
+        `previous` is a copy of the order before it, or None for a new order.
+        Orders that changed while disconnected are reported after the reload.
+        - `order_field`, `symbol_field` and `status_field` are the order fields
+        holding the order number, trading symbol and status.
+        """
+        self.gateway = gateway
+        self.on_update = on_update
+        self.order_field = order_field
+        self.symbol_field = symbol_field
+        self.status_field = status_field
+
+        self.loaded = False
+        self._orders = {}
+        # (exchange, trading symbol) -> order numbers, and status -> order numbers
+        self._by_symbol = {}
+        self._by_status = {}
+
+        self._lock = threading.RLock()
+        # Messages received while the orderbook is reloaded, None when not reloading
+        self._pending = None
+        self._retry_timer = None
+        self._counters = {"updates": 0, "stale": 0, "resyncs": 0, "resync_errors": 0}
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_no):
+        return str(order_no) in self._orders
+
+    def attach(self, ticker):
+        """
+        Feed the cache from an order-status `ticker`, replacing its `on_ticks`.
+
+        Its `on_connect` callback, if any, is still called after the cache
+        starts reloading the orderbook.
+        """
+        on_connect = ticker.on_connect
+
+        def connected(ws, response):
+            self.on_connect(ws, response)
+            if on_connect:
+                on_connect(ws, response)
+
+        ticker.on_ticks = self.on_ticks
+        ticker.on_connect = connected
+
+    def on_ticks(self, ticker, data):
+        """`on_ticks` callback applying order-status messages."""
+        self.apply(data)
+
+    def on_connect(self, ticker, response):
+        """`on_connect` callback reloading the orderbook, to cover the updates missed while disconnected."""
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = []
+            if self._retry_timer is not None:
+                self._retry_timer.cancel()
+                self._retry_timer = None
+        threading.Thread(target=self._background_resync, name="easeapi-orders-resync", daemon=True).start()
+
+    def _background_resync(self, attempt=1):
+        """Reload the orderbook, scheduling a retry with backoff if it fails."""
+        try:
+            self.resync()
+        except Exception:
+            delay = min(self.resync_delay * 2 ** (attempt - 1), self.max_resync_delay)
+            log.warning("Retrying the orderbook reload in {:.1f}s".format(delay))
+            with self._lock:
+                self._counters["resync_errors"] += 1
+                self._retry_timer = threading.Timer(delay, self._background_resync, args=(attempt + 1,))
+                self._retry_timer.daemon = True
+                self._retry_timer.start()
+
+    def load(self):
+        """Load the orderbook, replacing the cached orders."""
+        self.resync()
+
+    def resync(self):
+        """
+        Reload the orderbook and re-apply the order-status messages received meanwhile.
+
+        Raises the gateway error if the orderbook cannot be fetched, the cache
+        then keeps its current state and the held back messages are applied.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+
+        orders = None
+        try:
+            orders = self.gateway._response_records(self.gateway.get_orderbook(native=True))
+        except Exception:
+            log.exception("Could not reload the orderbook, order state may be stale")
+            raise
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if orders is not None:
+                    self._replace(orders)
+                for message in pending:
+                    self._apply(message)
+
+    def _replace(self, orders):
+        previous = self._orders
+        changed = []
+        self._orders = {}
+        self._by_symbol = {}
+        self._by_status = {}
+        for order in orders:
+            order_no = order.get(self.order_field)
+            if order_no is None:
+                continue
+            order_no = str(order_no)
+            old = previous.get(order_no)
+            if old is not None and self._is_stale(old, order):
+                # Already moved on through the websocket
+                order = old
+            elif self.loaded and old != order:
+                # Changed while disconnected
+                changed.append((order, old))
+            self._orders[order_no] = order
+            self._index(order_no, order)
+        self.loaded = True
+        for order, old in changed:
+            self._notify(order, old)
+        self._counters["resyncs"] += 1
+        log.info("Loaded {} orders".format(len(self._orders)))
+
+    def apply(self, data):
+        """
+        Apply an order-status message: one order, a list of them, or an API
+        response carrying them under `data`. Messages without an order number
+        are ignored.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(data)
+                return
+            self._apply(data)
+
+    def _apply(self, data):
+        if isinstance(data, dict) and self.order_field not in data:
+            data = data.get("data")
+        if isinstance(data, list):
+            for item in data:
+                self._apply(item)
+            return
+        if not isinstance(data, dict) or data.get(self.order_field) is None:
+            return
+
+        order_no = str(data[self.order_field])
+        order = self._orders.get(order_no)
+        if order is None:
+            order = dict(data)
+            self._orders[order_no] = order
+            self._index(order_no, order)
+            previous = None
+        else:
+            if self._is_stale(order, data):
+                self._counters["stale"] += 1
+                return
+            previous = dict(order)
+            self._unindex(order_no, order)
+            order.update(data)
+            self._index(order_no, order)
+        self._counters["updates"] += 1
+        self._notify(order, previous)
+
+    def _notify(self, order, previous):
+        if self.on_update:
+            try:
+                self.on_update(order, previous)
+            except Exception:
+                log.exception("Error in on_update callback")
+
+    def _status(self, order):
+        status = order.get(self.status_field)
+        return str(status).upper() if status is not None else None
+
+    def _filled(self, order):
+        for field in self.filled_fields:
+            value = order.get(field)
+            if value not in (None, ""):
+                try:
+                    return float(value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    def _is_stale(self, order, update):
+        """True if `update` predates `order`: it leaves a final status or lowers the filled quantity."""
+        status = self._status(order)
+        if status in self.final_statuses and self._status(update) not in (status, None):
+            return True
+        filled, filled_update = self._filled(order), self._filled(update)
+        return filled is not None and filled_update is not None and filled_update < filled
+
+    @staticmethod
+    def _exchange(exchange):
+        """Exchanges are compared case-insensitively, as by `EaseApiGateway.cancel_all_orders`."""
+        return str(exchange).upper() if exchange is not None else None
+
+    def _symbol_key(self, order):
+        return self._exchange(order.get("exchange")), order.get(self.symbol_field)
+
+    def _index(self, order_no, order):
+        self._by_symbol.setdefault(self._symbol_key(order), set()).add(order_no)
+        self._by_status.setdefault(self._status(order), set()).add(order_no)
+
+    def _unindex(self, order_no, order):
+        for index, key in ((self._by_symbol, self._symbol_key(order)),
+                           (self._by_status, self._status(order))):
+            members = index.get(key)
+            if members is not None:
+                members.discard(order_no)
+                if not members:
+                    del index[key]
+
+    def get(self, order_no, default=None):
+        """Return the order with number `order_no`."""
+        return self._orders.get(str(order_no), default)
+
+    def by_symbol(self, exchange, trading_symbol):
+        """Return the orders for `(exchange, trading_symbol)`, the exchange in any case."""
+        with self._lock:
+            return [self._orders[order_no] for order_no in self._by_symbol.get((self._exchange(exchange), trading_symbol), ())]
+
+    def by_status(self, status):
+        """Return the orders in `status`, e.g. "OPEN"."""
+        with self._lock:
+            return [self._orders[order_no] for order_no in self._by_status.get(str(status).upper(), ())]
+
+    def open_orders(self, exchange=None, trading_symbol=None):
+        """Return the orders not in a final status, optionally only those of one exchange or symbol."""
+        exchange = self._exchange(exchange)
+        with self._lock:
+            if trading_symbol is not None:
+                orders = [self._orders[order_no] for order_no in self._by_symbol.get((exchange, trading_symbol), ())]
+            elif exchange is not None:
+                orders = [order for order in self._orders.values() if self._exchange(order.get("exchange")) == exchange]
+            else:
+                orders = self._orders.values()
+            return [order for order in orders if self._status(order) not in self.final_statuses]
+
+    def snapshot(self):
+        """Return a copy of every order, as `{order_no: order}`."""
+        with self._lock:
+            return {order_no: dict(order) for order_no, order in self._orders.items()}
+
+    def stats(self):
+        """
+        Return the number of `orders`, of order-status `updates` applied, of
+        `stale` updates ignored, of orderbook `resyncs` and of failed
+        background reloads, `resync_errors`.
+        """
+        with self._lock:
+            return dict(self._counters, orders=len(self._orders))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+    pool.py
+
+    HTTP connection pool tuning for the EaseApi clients.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import socket
+
+from requests.adapters import HTTPAdapter
+
+
+def socket_options(tcp_nodelay=True, keepalive_idle=None, keepalive_interval=None, keepalive_count=None):
+    """
+    Build the socket options applied to every pooled connection.
+
+    - `tcp_nodelay` disables Nagle's algorithm so small requests go out immediately.
+    - `keepalive_idle` enables TCP keep-alive probes after that many idle seconds,
+    so dead connections are detected before an order is sent on them.
+    `keepalive_interval` and `keepalive_count` tune the probes where the platform supports it.
+    """
+    options = []
+    if tcp_nodelay:
+        options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+
+    if keepalive_idle:
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # TCP_KEEPIDLE on Linux, TCP_KEEPALIVE on macOS
+        idle = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+        if idle is not None:
+            options.append((socket.IPPROTO_TCP, idle, int(keepalive_idle)))
+        if keepalive_interval and hasattr(socket, "TCP_KEEPINTVL"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, int(keepalive_interval)))
+        if keepalive_count and hasattr(socket, "TCP_KEEPCNT"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, int(keepalive_count)))
+
+    return options
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """`requests` transport adapter that applies custom socket options to its pool."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["socket_options"]
+
+    def __init__(self, socket_options=None, **kwargs):
+        """
+        - `socket_options` is a list of `(level, option, value)` tuples, see `socket_options()`.
+        Other arguments are passed to `HTTPAdapter`.
+        """
+        self.socket_options = socket_options
+        super(PooledHTTPAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs["socket_options"] = self.socket_options
+        super(PooledHTTPAdapter, self).init_poolmanager(*args, **kwargs)
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+    positions.py
+
+    In-memory positions and holdings, updated by fills.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+def _number(record, fields, default=0.0):
+    """Return the first of `fields` set in `record`, as a float."""
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                pass
+    return default
+
+
+class Position:
+    """Net position of one instrument, with its cost so MTM is a single multiply-add."""
+
+    __slots__ = ("exchange", "instrument_id", "net_quantity", "cost", "ltp")
+
+    def __init__(self, exchange, instrument_id, net_quantity=0.0, cost=0.0, ltp=None):
+        self.exchange = exchange
+        self.instrument_id = instrument_id
+        self.net_quantity = net_quantity
+        # Amount paid for the bought quantity minus amount received for the sold quantity
+        self.cost = cost
+        self.ltp = ltp
+
+    def __repr__(self):
+        return "Position(exchange={!r}, instrument_id={!r}, net_quantity={!r}, cost={!r}, ltp={!r})".format(
+            self.exchange, self.instrument_id, self.net_quantity, self.cost, self.ltp
+        )
+
+    def mtm(self, ltp=None):
+        """Mark-to-market P&L at `ltp`, defaults to the last known price."""
+        ltp = self.ltp if ltp is None else ltp
+        if ltp is None:
+            return None
+        return self.net_quantity * ltp - self.cost
+
+
+class PositionBook:
+    """
+    Net positions and holdings per `(exchange, instrument_id)`, kept in memory.
+
+    The book is loaded once from `get_positions` and `get_holdings`, then
+    updated by the fills reported on the order-status websocket, through an
+    `OrderStateCache`:
+
+        orders = OrderStateCache(easeapi)
+        book = PositionBook(easeapi)
+        book.load()
+        book.attach(orders)
+        book.start(reconcile_every=60)
+
+        book.net_quantity("NSE", 2885)
+        book.mtm("NSE", 2885, ltp=1250.5)
+
+    A fill is the increase of an order's filled quantity above the highest
+    one booked for it, valued at the change of the order's filled amount
+    (average price times filled quantity), so repeated or out-of-order
+    updates are not booked twice. `reconcile()` reloads the REST portfolio, periodically when
+    started, and logs the instruments it corrects. Holdings are only
+    refreshed by `load()` and `reconcile()`.
+    """
+
+    # Fields records may carry each value under, the first one set is used
+    _instrument_fields = ("instrument_id", "token", "exchange_token", "instrument_token")
+    _net_quantity_fields = ("net_quantity", "net_qty", "netqty", "quantity")
+    _buy_quantity_fields = ("buy_quantity", "buy_qty")
+    _sell_quantity_fields = ("sell_quantity", "sell_qty")
+    _buy_value_fields = ("buy_value", "buy_amount")
+    _sell_value_fields = ("sell_value", "sell_amount")
+    _average_price_fields = ("average_price", "avg_price", "net_price")
+    _ltp_fields = ("ltp", "last_price")
+    _holding_quantity_fields = ("quantity", "holding_quantity", "total_quantity")
+    _filled_fields = ("filled_quantity", "filled_qty", "traded_quantity")
+    _fill_price_fields = ("average_price", "avg_price", "traded_price", "price")
+
+    def __init__(self, gateway, tolerance=1e-6):
+        """
+        - `gateway` is the `EaseApiGateway` positions and holdings are loaded from.
+        - `tolerance` is the net quantity difference `reconcile()` ignores.
+        """
+        self.gateway = gateway
+        self.tolerance = tolerance
+
+        self.positions = {}
+        self.holdings = {}
+        self.loaded = False
+
+        self._lock = threading.RLock()
+        # Instruments filled while `reconcile()` waits for the REST portfolio, None otherwise
+        self._filled_meanwhile = None
+        # order_no -> (filled quantity, filled amount) booked, the highest seen
+        self._booked = {}
+        self._timer = None
+        self._stop = threading.Event()
+        self._counters = {"fills": 0, "reconciles": 0, "corrections": 0}
+
+    def _key(self, record):
+        for field in self._instrument_fields:
+            value = record.get(field)
+            if value not in (None, ""):
+                return (str(record.get("exchange") or "").upper(), str(value))
+        return None
+
+    def _position(self, record):
+        """Build a `Position` from a `get_positions` record."""
+        key = self._key(record)
+        if key is None:
+            return None
+
+        buy_quantity = _number(record, self._buy_quantity_fields, None)
+        sell_quantity = _number(record, self._sell_quantity_fields, None)
+        buy_value = _number(record, self._buy_value_fields, None)
+        sell_value = _number(record, self._sell_value_fields, None)
+        if None not in (buy_quantity, sell_quantity, buy_value, sell_value):
+            net_quantity, cost = buy_quantity - sell_quantity, buy_value - sell_value
+        else:
+            net_quantity = _number(record, self._net_quantity_fields)
+            cost = net_quantity * _number(record, self._average_price_fields)
+        return Position(key[0], key[1], net_quantity, cost, _number(record, self._ltp_fields, None))
+
+    def _load_portfolio(self):
+        """Fetch and decode the REST positions and holdings."""
+        positions = {}
+        for record in self.gateway._response_records(self.gateway.get_positions(native=True)):
+            position = self._position(record)
+            if position is not None:
+                positions[(position.exchange, position.instrument_id)] = position
+
+        holdings = {}
+        for record in self.gateway._response_records(self.gateway.get_holdings(native=True)):
+            key = self._key(record)
+            if key is not None:
+                holdings[key] = _number(record, self._holding_quantity_fields)
+        return positions, holdings
+
+    def load(self):
+        """Load positions and holdings from the REST API, replacing the book."""
+        positions, holdings = self._load_portfolio()
+        with self._lock:
+            self.positions = positions
+            self.holdings = holdings
+            self.loaded = True
+        log.info("Loaded {} positions and {} holdings".format(len(positions), len(holdings)))
+
+    def attach(self, orders):
+        """Apply the fills seen by an `OrderStateCache`, chaining its `on_update` callback."""
+        on_update = orders.on_update
+
+        def updated(order, previous):
+            self.on_order_update(order, previous)
+            if on_update:
+                on_update(order, previous)
+
+        orders.on_update = updated
+
+    def on_order_update(self, order, previous):
+        """`OrderStateCache.on_update` callback applying the fill between two states of an order."""
+        order_no = order.get("order_no")
+        filled = _number(order, self._filled_fields)
+        amount = filled * _number(order, self._fill_price_fields)
+
+        with self._lock:
+            booked = self._booked.get(order_no) if order_no is not None else None
+            if booked is None:
+                # First update seen for the order, the previous state was already filled
+                filled_before = _number(previous, self._filled_fields) if previous else 0.0
+                booked = (filled_before, filled_before * _number(previous, self._fill_price_fields) if previous else 0.0)
+            filled_before, amount_before = booked
+            if filled <= filled_before:
+                return
+            if order_no is not None:
+                self._booked[order_no] = (filled, amount)
+
+        quantity = filled - filled_before
+        price = (amount - amount_before) / quantity
+        side = str(order.get("transaction_type") or "").upper()
+        if not side:
+            log.warning("Fill on order {} without a transaction type, ignored".format(order_no))
+            return
+
+        key = self._key(order)
+        if key is None:
+            return
+        self.add_fill(key[0], key[1], quantity if side.startswith("B") else -quantity, price)
+
+    def add_fill(self, exchange, instrument_id, quantity, price):
+        """Apply a fill of `quantity` at `price`, negative quantities sell."""
+        key = (str(exchange).upper(), str(instrument_id))
+        with self._lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self.positions[key] = Position(key[0], key[1])
+            position.net_quantity += quantity
+            position.cost += quantity * price
+            self._counters["fills"] += 1
+            if self._filled_meanwhile is not None:
+                self._filled_meanwhile.add(key)
+
+    def position(self, exchange, instrument_id):
+        """Return the `Position` of an instrument, or None."""
+        return self.positions.get((str(exchange).upper(), str(instrument_id)))
+
+    def net_quantity(self, exchange, instrument_id):
+        """Return the net position quantity of an instrument, 0 if it has none."""
+        position = self.positions.get((str(exchange).upper(), str(instrument_id)))
+        return position.net_quantity if position is not None else 0.0
+
+    def holding_quantity(self, exchange, instrument_id):
+        """Return the quantity held of an instrument, 0 if none."""
+        return self.holdings.get((str(exchange).upper(), str(instrument_id)), 0.0)
+
+    def set_price(self, exchange, instrument_id, ltp):
+        """Record the last price of an instrument, used by `mtm()` when no price is given."""
+        position = self.positions.get((str(exchange).upper(), str(instrument_id)))
+        if position is not None:
+            position.ltp = ltp
+
+    def mtm(self, exchange, instrument_id, ltp=None):
+        """
+        Return the mark-to-market P&L of an instrument at `ltp`, defaults to the
+        last known price. None if the instrument has a position but no price.
+        """
+        position = self.positions.get((str(exchange).upper(), str(instrument_id)))
+        if position is None:
+            return 0.0
+        return position.mtm(ltp)
+
+    def reconcile(self):
+        """
+        Reload the REST portfolio and correct the book.
+
+        Instruments filled while the portfolio was being fetched keep their
+        local position, as the REST response may predate the fill. Returns
+        `{(exchange, instrument_id): (book quantity, REST quantity)}` of the
+        corrected positions.
+        """
+        with self._lock:
+            self._filled_meanwhile = set()
+        try:
+            positions, holdings = self._load_portfolio()
+        except Exception:
+            with self._lock:
+                self._filled_meanwhile = None
+            raise
+
+        corrections = {}
+        with self._lock:
+            filled, self._filled_meanwhile = self._filled_meanwhile, None
+            for key in set(self.positions) | set(positions):
+                if key in filled:
+                    if key in self.positions:
+                        positions[key] = self.positions[key]
+                    continue
+                book = self.positions.get(key)
+                rest = positions.get(key)
+                book_quantity = book.net_quantity if book is not None else 0.0
+                rest_quantity = rest.net_quantity if rest is not None else 0.0
+                if abs(book_quantity - rest_quantity) > self.tolerance:
+                    corrections[key] = (book_quantity, rest_quantity)
+                if rest is not None and rest.ltp is None and book is not None:
+                    rest.ltp = book.ltp
+            self.positions = positions
+            self.holdings = holdings
+            self.loaded = True
+            self._counters["reconciles"] += 1
+            self._counters["corrections"] += len(corrections)
+
+        for (exchange, instrument_id), (book_quantity, rest_quantity) in corrections.items():
+            log.warning("Position of {} {} was {}, corrected to {}".format(
+                exchange, instrument_id, book_quantity, rest_quantity
+            ))
+        return corrections
+
+    def start(self, reconcile_every=60):
+        """Reconcile against the REST portfolio every `reconcile_every` seconds, from a background thread."""
+        if self._timer is not None:
+            return
+        self._stop.clear()
+        self._timer = threading.Thread(target=self._run, args=(reconcile_every,), name="easeapi-positions", daemon=True)
+        self._timer.start()
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.reconcile()
+            except Exception:
+                log.exception("Could not reconcile positions")
+
+    def stop(self):
+        """Stop the background reconciliation."""
+        if self._timer is not None:
+            self._stop.set()
+            self._timer.join()
+            self._timer = None
+
+    def stats(self):
+        """Return the number of `positions`, `fills` applied, `reconciles` and positions corrected by them."""
+        with self._lock:
+            return dict(self._counters, positions=len(self.positions))
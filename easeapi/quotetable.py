@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+    quotetable.py
+
+    Latest quotes in shared memory, written by one ticker process and read by many.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import collections
+import logging
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"EAQTBL01"
+_HEADER = struct.Struct("<8sII")  # magic, capacity, slots in use
+_USED = struct.Struct("<I")
+_USED_OFFSET = 12
+_KEY = struct.Struct("<32s")      # "exchange:token", NUL padded
+_SLOT = struct.Struct("<Qddq")    # sequence, ltp, timestamp, volume
+_SEQ = struct.Struct("<Q")
+
+Quote = collections.namedtuple("Quote", ["ltp", "timestamp", "volume", "version"])
+
+# Blocks created by this process, which its resource tracker must keep tracking
+_created = set()
+
+
+class SharedQuoteTable:
+    """
+    Fixed-layout table of the latest LTP per `(exchange, token)` in shared memory.
+
+    One process owns the table and writes to it, typically from its ticker:
+
+        table = SharedQuoteTable.create("easeapi-quotes", capacity=20000)
+        ticker = EaseApiTicker(app_key, client_id, auth_token, quote_table=table)
+
+    Strategy processes attach by name and read without locks or sockets:
+
+        table = SharedQuoteTable.attach("easeapi-quotes")
+        quote = table.read("nse", "2885")
+
+    Each token gets a slot the first time it is written, and slots are never
+    reused. Slots are guarded by a sequence lock: the writer makes the
+    sequence odd while it updates a slot and even when done, and readers retry
+    until they see the same even sequence before and after copying the slot.
+    There must be a single writer. A slot left mid-update for `stuck_timeout`
+    seconds, by a writer that died, makes reads raise `RuntimeError`.
+    """
+
+    # Seconds a slot may stay mid-update before readers give up on it
+    stuck_timeout = 1.0
+
+    def __init__(self, shm, owner=False):
+        """Use `create()` or `attach()` instead."""
+        magic, capacity, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError("{} is not an EaseApi quote table".format(shm.name))
+
+        self.shm = shm
+        self.name = shm.name
+        self.capacity = capacity
+        self.owner = owner
+        self._buf = shm.buf
+        self._keys_offset = _HEADER.size
+        self._slots_offset = _HEADER.size + capacity * _KEY.size
+        self._slots = {}
+        self._known = 0
+        self._full_warned = False
+
+    @classmethod
+    def create(cls, name=None, capacity=10000):
+        """
+        Create a table and own it: only the owner writes, and `unlink()` removes it.
+
+        - `name` is the shared memory block name, a random one is used if omitted.
+        - `capacity` is the maximum number of tokens.
+        """
+        size = _HEADER.size + capacity * (_KEY.size + _SLOT.size)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, capacity, 0)
+        _created.add(shm.name)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open an existing table for reading."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 every process registers the block with its resource
+            # tracker, which would unlink it when this reader exits.
+            shm = shared_memory.SharedMemory(name=name)
+            if shm.name not in _created:
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm)
+
+    def __len__(self):
+        return _USED.unpack_from(self._buf, _USED_OFFSET)[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def _key(exchange, token):
+        return "{}:{}".format(exchange or "", token)
+
+    def slot(self, exchange, token, create=False):
+        """
+        Return the slot index of a token, or None if it has none.
+
+        - `create`, for the owner, allocates a slot if the token has none,
+        so readers can find it before its first tick.
+        """
+        key = self._key(exchange, token)
+        index = self._slots.get(key)
+        if index is None:
+            if create:
+                return self._allocate(key)
+            self._refresh()
+            index = self._slots.get(key)
+        return index
+
+    def _refresh(self):
+        """Learn the slots allocated by the writer since the last call."""
+        used = len(self)
+        for index in range(self._known, used):
+            raw = _KEY.unpack_from(self._buf, self._keys_offset + index * _KEY.size)[0]
+            self._slots[raw.rstrip(b"\0").decode("utf-8")] = index
+        self._known = used
+
+    def _allocate(self, key):
+        if not self.owner:
+            raise RuntimeError("Only the process that created the quote table can write to it")
+
+        index = len(self)
+        if index >= self.capacity:
+            return None
+
+        encoded = key.encode("utf-8")
+        if len(encoded) > _KEY.size:
+            raise ValueError("Quote table key too long: {}".format(key))
+
+        _KEY.pack_into(self._buf, self._keys_offset + index * _KEY.size, encoded)
+        _SLOT.pack_into(self._buf, self._slots_offset + index * _SLOT.size, 0, 0.0, 0.0, 0)
+        # Publish the slot only once its key is written
+        _USED.pack_into(self._buf, _USED_OFFSET, index + 1)
+        self._slots[key] = index
+        self._known = index + 1
+        return index
+
+    def write(self, exchange, token, ltp, timestamp=0.0, volume=0):
+        """
+        Store the latest quote of a token. Only the owner may write.
+
+        Returns False if the table is full and the token has no slot.
+        """
+        key = self._key(exchange, token)
+        index = self._slots.get(key)
+        if index is None:
+            index = self._allocate(key)
+            if index is None:
+                if not self._full_warned:
+                    log.warning("Quote table {} is full, {} and later tokens are not stored".format(self.name, key))
+                    self._full_warned = True
+                return False
+
+        offset = self._slots_offset + index * _SLOT.size
+        seq = _SEQ.unpack_from(self._buf, offset)[0]
+        _SEQ.pack_into(self._buf, offset, seq + 1)
+        _SLOT.pack_into(self._buf, offset, seq + 1, ltp, timestamp, volume)
+        _SEQ.pack_into(self._buf, offset, seq + 2)
+        return True
+
+    def write_tick(self, key, data):
+        """Store a decoded tick under `key`, an `(exchange, token)` tuple."""
+        ltp = data.get("ltp")
+        if ltp is None:
+            return False
+        try:
+            ltp, timestamp, volume = float(ltp), float(data.get("timestamp") or 0), int(data.get("volume") or 0)
+        except (TypeError, ValueError):
+            log.debug("Skipping tick with a non numeric field: {}".format(data))
+            return False
+        return self.write(key[0], key[1], ltp, timestamp, volume)
+
+    def read(self, exchange, token):
+        """
+        Return the latest `Quote` of a token, or None if it was never written.
+        Raises `RuntimeError` if the writer died mid-update of the slot.
+        """
+        index = self.slot(exchange, token)
+        if index is None:
+            return None
+        quote = self._read_slot(index)
+        return quote if quote.version else None
+
+    def _read_slot(self, index):
+        offset = self._slots_offset + index * _SLOT.size
+        spins = 0
+        deadline = None
+        while True:
+            seq, ltp, timestamp, volume = _SLOT.unpack_from(self._buf, offset)
+            if not seq & 1 and _SEQ.unpack_from(self._buf, offset)[0] == seq:
+                return Quote(ltp, timestamp, volume, seq >> 1)
+            spins += 1
+            if spins % 64 == 0:
+                # The writer was preempted mid-update, let it run
+                time.sleep(0)
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + self.stuck_timeout
+                elif now > deadline:
+                    raise RuntimeError(
+                        "Quote table {} slot {} stayed mid-update for {}s, "
+                        "its writer likely died while updating it".format(self.name, index, self.stuck_timeout)
+                    )
+
+    def snapshot(self):
+        """Return `{(exchange, token): Quote}` for every written token."""
+        self._refresh()
+        quotes = {}
+        for key, index in self._slots.items():
+            quote = self._read_slot(index)
+            if quote.version:
+                exchange, _, token = key.partition(":")
+                quotes[(exchange or None, token)] = quote
+        return quotes
+
+    def close(self):
+        """Detach from the shared memory. The table lives on until the owner unlinks it."""
+        self._buf = None
+        self.shm.close()
+
+    def unlink(self):
+        """Remove the shared memory block, once every process has closed it."""
+        self.shm.unlink()
+        _created.discard(self.name)
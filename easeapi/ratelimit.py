@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+    ratelimit.py
+
+    Client-side request pacing for the EaseApi REST routes.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe and asyncio-safe token bucket.
+
+    Callers reserve a token up front and are told how long to wait for it.
+    Because the bucket may go into debt, every reservation lands after the
+    previous one, so waiters are served in arrival order whether they are
+    threads or coroutines.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """
+        - `rate` is the number of requests allowed per second.
+        - `capacity` is the burst size, defaults to `rate` (one second of burst).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take `tokens` from the bucket and return the seconds to wait before using them."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available. Returns the time waited in seconds."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens=1):
+        """Wait without blocking the event loop until `tokens` are available. Returns the time waited."""
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class RateLimiter:
+    """
+    Token buckets per route group, with wait time metrics per route.
+
+    Routes are grouped by the first segment of their path, i.e. `trade`,
+    `instrument`, `portfolio`, `user`, `login` and `auth`. Groups without a
+    configured limit are not paced.
+
+        limiter = RateLimiter({"trade": 10, "instrument": (5, 10)})
+        easeapi = EaseApiGateway(app_key, rate_limiter=limiter)
+    """
+
+    def __init__(self, limits):
+        """
+        - `limits` maps a route group to its rate (requests per second),
+        or to a `(rate, burst)` tuple.
+        """
+        self.buckets = {}
+        for group, limit in limits.items():
+            if isinstance(limit, (tuple, list)):
+                self.buckets[group] = TokenBucket(*limit)
+            else:
+                self.buckets[group] = TokenBucket(limit)
+
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def acquire(self, group, route=None):
+        """Block until a request in `group` may be sent. Returns the time waited."""
+        bucket = self.buckets.get(group)
+        if bucket is None:
+            return 0.0
+        waited = bucket.acquire()
+        self._record(route or group, waited)
+        return waited
+
+    async def acquire_async(self, group, route=None):
+        """Coroutine version of `acquire`."""
+        bucket = self.buckets.get(group)
+        if bucket is None:
+            return 0.0
+        waited = await bucket.acquire_async()
+        self._record(route or group, waited)
+        return waited
+
+    def _record(self, route, waited):
+        with self._metrics_lock:
+            metrics = self._metrics.get(route)
+            if metrics is None:
+                metrics = self._metrics[route] = {
+                    "requests": 0,
+                    "throttled": 0,
+                    "total_wait": 0.0,
+                    "max_wait": 0.0,
+                }
+            metrics["requests"] += 1
+            if waited:
+                metrics["throttled"] += 1
+                metrics["total_wait"] += waited
+                metrics["max_wait"] = max(metrics["max_wait"], waited)
+
+    def metrics(self):
+        """
+        Return the wait time metrics per route.
+
+        Each entry has the number of `requests`, how many were `throttled`,
+        and the `total_wait` and `max_wait` in seconds.
+        """
+        with self._metrics_lock:
+            return {route: dict(metrics) for route, metrics in self._metrics.items()}
+
+    def reset_metrics(self):
+        """Clear the collected metrics."""
+        with self._metrics_lock:
+            self._metrics.clear()
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+    recorder.py
+
+    Append-only binary recordings of the ticker feed, and their replay.
+
+    A recording is one file per trading session:
+
+    - a header: magic and the session start time,
+    - length-prefixed records: receive time (ns), payload length, and the
+      message exactly as received from the websocket,
+    - every `index_every` records, an index record with the time range and
+      offset of that chunk, chained to the previous index record,
+    - on close, a trailer pointing at the last index record.
+
+    A file cut short by a crash has no trailer. It is still readable, its
+    index is rebuilt by scanning the records.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+
+from easeapi.easeapiticker import EaseApiTicker
+from easeapi.snapshot import IST
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"EATREC01"
+TRAILER_MAGIC = b"EATRIDX1"
+EXTENSION = ".eatr"
+_HEADER = struct.Struct("<8sq")   # magic, session start (ns)
+_RECORD = struct.Struct("<qI")    # receive time (ns), payload length or INDEX_FLAG
+_INDEX = struct.Struct("<qqqq")   # first time, last time, first record offset, previous index offset
+_TRAILER = struct.Struct("<8sq")  # magic, last index offset
+INDEX_FLAG = 1 << 31
+
+
+def _next_session_ns(now_ns):
+    """Return the next midnight IST, in ns since the epoch."""
+    today = datetime.fromtimestamp(now_ns / 1e9, IST).date()
+    midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), IST)
+    return int(midnight.timestamp()) * 10 ** 9
+
+
+class TickRecorder:
+    """
+    Appends raw websocket messages to a binary recording, one file per session.
+
+    Messages are stored as received, so recording costs no encoding and a
+    replay goes through exactly the same decoding as the live feed.
+
+        recorder = TickRecorder("/var/lib/easeapi/ticks")
+        ticker = EaseApiTicker(app_key, client_id, auth_token, recorder=recorder)
+
+    Files roll over at midnight IST, or when `rotate()` is called.
+    The recorder is safe to share between threads, e.g. the shards of a `ShardedTicker`.
+    """
+
+    def __init__(self, directory, prefix="ticks", index_every=1000, buffer_size=1 << 20):
+        """
+        - `directory` is where recordings are written, it is created if missing.
+        - `prefix` starts every file name, followed by the session start time.
+        - `index_every` is the number of records between index records.
+        - `buffer_size` is the write buffer, in bytes.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.index_every = index_every
+        self.buffer_size = buffer_size
+        self.path = None
+
+        self._file = None
+        self._lock = threading.Lock()
+        self._rotate_at = 0
+        self._offset = 0
+        self._last_index = -1
+        self._count = 0
+        self._chunk_offset = 0
+        self._chunk_first = 0
+        self._chunk_last = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, message, received=None):
+        """
+        Append a message.
+
+        - `message` is the `str` or `bytes` received from the websocket.
+        - `received` is the receive time in ns since the epoch, defaults to now.
+        """
+        payload = message.encode("utf-8") if isinstance(message, str) else message
+
+        with self._lock:
+            # Stamped under the lock, so concurrent writers append in receive time order
+            if received is None:
+                received = time.time_ns()
+            if self._file is None or received >= self._rotate_at:
+                self._open(received)
+
+            if not self._count:
+                self._chunk_offset = self._offset
+                self._chunk_first = received
+            self._chunk_last = received
+
+            self._file.write(_RECORD.pack(received, len(payload)))
+            self._file.write(payload)
+            self._offset += _RECORD.size + len(payload)
+            self._count += 1
+            if self._count >= self.index_every:
+                self._write_index()
+
+    def _open(self, now_ns):
+        self._close_file()
+
+        started = datetime.fromtimestamp(now_ns / 1e9, IST)
+        name = "{}-{:%Y%m%d-%H%M%S}".format(self.prefix, started)
+        path = os.path.join(self.directory, name + EXTENSION)
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, "{}-{}{}".format(name, suffix, EXTENSION))
+            suffix += 1
+
+        self._file = open(path, "xb", buffering=self.buffer_size)
+        self._file.write(_HEADER.pack(MAGIC, now_ns))
+        self.path = path
+        self._rotate_at = _next_session_ns(now_ns)
+        self._offset = _HEADER.size
+        self._last_index = -1
+        self._count = 0
+        log.info("Recording ticks to {}".format(path))
+
+    def _write_index(self):
+        index_offset = self._offset
+        self._file.write(_RECORD.pack(self._chunk_last, INDEX_FLAG))
+        self._file.write(_INDEX.pack(self._chunk_first, self._chunk_last, self._chunk_offset, self._last_index))
+        self._offset += _RECORD.size + _INDEX.size
+        self._last_index = index_offset
+        self._count = 0
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        if self._count:
+            self._write_index()
+        self._file.write(_TRAILER.pack(TRAILER_MAGIC, self._last_index))
+        self._file.close()
+        self._file = None
+
+    def flush(self):
+        """Flush buffered records to the file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def rotate(self):
+        """Close the current file, the next message starts a new one."""
+        with self._lock:
+            self._close_file()
+
+    def close(self):
+        """Write the index trailer and close the current file."""
+        self.rotate()
+
+
+class TickRecording:
+    """
+    Read-only, memory-mapped view of one recording file.
+
+    A recording still being written can be opened: an empty or header-only
+    file is an empty recording, and a file without its trailer is scanned.
+
+        with TickRecording(path) as recording:
+            for received, payload in recording.records(start=start_ns):
+                ...
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mmap = self._view = None
+        with open(path, "rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                # A live recording before its first flush, zero length cannot be mapped
+                if not MAGIC.startswith(head[:len(MAGIC)]):
+                    raise ValueError("{} is not an EaseApi tick recording".format(path))
+                self.started = None
+                self.chunks = []
+                self._chunk_times = []
+                self._end = 0
+                return
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, self.started = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("{} is not an EaseApi tick recording".format(path))
+
+        # Chunks as (first time, first record offset), in file order
+        self.chunks = self._read_index()
+        self._chunk_times = [first for first, _ in self.chunks]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _read_index(self):
+        end = len(self._view) - _TRAILER.size
+        if end >= _HEADER.size:
+            magic, last_index = _TRAILER.unpack_from(self._view, end)
+            if magic == TRAILER_MAGIC:
+                self._end = end
+                chunks = []
+                while last_index >= 0:
+                    first, _, offset, last_index = _INDEX.unpack_from(self._view, last_index + _RECORD.size)
+                    chunks.append((first, offset))
+                return chunks[::-1]
+
+        log.warning("{} has no index trailer, scanning it".format(self.path))
+        self._end = len(self._view)
+        chunks = []
+        expect_chunk = True
+        for offset, received, length in self._scan(_HEADER.size):
+            if length == INDEX_FLAG:
+                expect_chunk = True
+            elif expect_chunk:
+                chunks.append((received, offset))
+                expect_chunk = False
+        return chunks
+
+    def _scan(self, offset):
+        """Yield `(offset, received, length)` of every complete record from `offset`."""
+        view, end = self._view, self._end
+        while offset + _RECORD.size <= end:
+            received, length = _RECORD.unpack_from(view, offset)
+            size = _INDEX.size if length == INDEX_FLAG else length
+            if offset + _RECORD.size + size > end:
+                break  # Truncated by a crash
+            yield offset, received, length
+            offset += _RECORD.size + size
+
+    def records(self, start=None, end=None):
+        """
+        Yield `(received, payload)` of the recorded messages, in order.
+
+        - `start` and `end` bound the receive times, in ns since the epoch. The
+        index is used to jump to the first chunk that can contain `start`.
+        - `payload` is the message `bytes`, copied out of the mapped file so it
+        can outlive the recording.
+        """
+        offset = _HEADER.size
+        if start is not None and self.chunks:
+            chunk = bisect.bisect_right(self._chunk_times, start) - 1
+            if chunk > 0:
+                offset = self.chunks[chunk][1]
+
+        if self._view is None:
+            return
+        for record_offset, received, length in self._scan(offset):
+            if length == INDEX_FLAG:
+                continue
+            if start is not None and received < start:
+                continue
+            if end is not None and received > end:
+                return
+            payload_offset = record_offset + _RECORD.size
+            yield received, self._mmap[payload_offset:payload_offset + length]
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+
+
+class ReplayTicker(EaseApiTicker):
+    """
+    Plays recordings back through the `EaseApiTicker` callback interface.
+
+    `connect()` calls `on_connect`, feeds every recorded message to the same
+    decoding, conflation, tick model and dispatch as a live ticker, then calls
+    `on_close`. Nothing is sent anywhere and it does not reconnect.
+
+        replay = ReplayTicker(sorted(glob.glob("/var/lib/easeapi/ticks/*.eatr")), speed=10)
+        replay.on_ticks = on_ticks
+        replay.run()
+    """
+
+    def __init__(self, paths, speed=None, start=None, end=None, **kwargs):
+        """
+        Initialize the ReplayTicker.
+
+        Parameters:
+        -----------
+        paths : str or list
+            Recording file, or files played one after the other
+        speed : float, optional
+            1 replays in real time, 10 ten times faster. None (default)
+            replays as fast as possible.
+        start, end : int, optional
+            Receive time bounds, in ns since the epoch
+        **kwargs
+            Other `EaseApiTicker` arguments, e.g. `conflate` or `tick_model`
+        """
+        super(ReplayTicker, self).__init__("replay", "replay", "replay", **kwargs)
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.speed = speed
+        self.start = start
+        self.end = end
+        self.replayed = 0
+        self._stop = threading.Event()
+
+    def connect(self, use_order_status=False):
+        """Start replaying on a background thread, see `run()` to replay on this one."""
+        if self.connecting or self.connected:
+            log.debug("Replay already running")
+            return
+
+        self.connecting = True
+        self.ws_thread = threading.Thread(target=self.run, daemon=True)
+        self.ws_thread.start()
+
+    def run(self):
+        """Replay the recordings on the calling thread, returns the number of messages."""
+        self._stop.clear()
+        self._start_delivery()
+        self._on_open(None)
+
+        first = None
+        began = time.monotonic()
+        try:
+            for path in self.paths:
+                with TickRecording(path) as recording:
+                    for received, payload in recording.records(self.start, self.end):
+                        if self._stop.is_set():
+                            return self.replayed
+                        if self.speed:
+                            if first is None:
+                                first = received
+                            delay = (received - first) / 1e9 / self.speed - (time.monotonic() - began)
+                            if delay > 0:
+                                time.sleep(delay)
+                        self._on_message(None, payload)
+                        self.replayed += 1
+
+            if self.latest_ticks is not None or self._batch is not None:
+                self.flush_ticks()
+        finally:
+            self.connected = False
+            self.connecting = False
+            if self.on_close:
+                self.on_close(self, None, "replay finished")
+        return self.replayed
+
+    def send(self, data):
+        """Subscriptions are not sent anywhere during a replay."""
+        return True
+
+    def close(self):
+        """Stop the replay."""
+        self._stop.set()
+        super(ReplayTicker, self).close()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+    retry.py
+
+    Retry policies for transient failures of EaseApi REST calls.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import random
+import threading
+
+# Routes that only read state and are safe to send again.
+READ_ROUTES = frozenset([
+    "get_instruments",
+    "get_l1_market_quotes",
+    "get_fund_details",
+    "get_user_profile",
+    "get_orderbook",
+    "get_tradebook",
+    "get_holdings",
+    "get_positions",
+])
+
+# Routes that change order state. They are never retried: a request that
+# failed in flight may still have reached the exchange.
+ORDER_ROUTES = frozenset([
+    "place_delivery_order",
+    "place_intraday_order",
+    "modify_order",
+    "cancel_order",
+])
+
+
+class RetryPolicy:
+    """How often and how fast a route is retried."""
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff_base=0.1,
+        backoff_cap=2.0,
+        retry_statuses=(502, 503, 504),
+    ):
+        """
+        - `max_attempts` is the total number of attempts, including the first one.
+        - `backoff_base` and `backoff_cap` (seconds) bound the exponential backoff,
+        the actual delay is drawn uniformly below it ("full jitter").
+        - `retry_statuses` are the HTTP status codes treated as transient.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def backoff(self, attempt):
+        """Return the delay in seconds before retry number `attempt` (starting at 1)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of the request volume.
+
+    Every request deposits `ratio` into the budget and every retry withdraws
+    one, so a widespread outage cannot multiply the load on the server.
+    """
+
+    def __init__(self, ratio=0.2, reserve=10):
+        """
+        - `ratio` is the number of retries earned per request.
+        - `reserve` is the balance the budget starts with and is capped at,
+        so a quiet client can still retry a burst of failures.
+        """
+        self.ratio = ratio
+        self.reserve = float(reserve)
+        self._balance = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def withdraw(self):
+        """Take one retry from the budget, returns False if it is exhausted."""
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class RetryEngine:
+    """
+    Decides whether a failed request is retried, and after how long.
+
+    Read routes are retried on connection errors, timeouts and the transient
+    HTTP statuses of their policy. Order routes are never retried, instead the
+    gateway reconciles against the orderbook and raises
+    `OrderStateUnknownException` with the orders that match the request.
+
+        easeapi = EaseApiGateway(app_key, retry=RetryEngine())
+    """
+
+    def __init__(self, default_policy=None, policies=None, budget=None, reconcile_orders=True):
+        """
+        - `default_policy` is the `RetryPolicy` for read routes.
+        - `policies` maps a route name to its own `RetryPolicy`, e.g. to retry
+        `logout` too. Order routes cannot be given a policy.
+        - `budget` is a `RetryBudget`, a default one is used if omitted.
+        - `reconcile_orders`, if set to False, skips the orderbook lookup
+        after a failed order request and re-raises the original error.
+        """
+        self.default_policy = default_policy or RetryPolicy()
+        self.policies = dict(policies or {})
+        self.budget = budget or RetryBudget()
+        self.reconcile_orders = reconcile_orders
+
+    def policy(self, route):
+        """Return the `RetryPolicy` for `route`."""
+        if route in ORDER_ROUTES:
+            return NO_RETRY
+        if route in self.policies:
+            return self.policies[route]
+        if route in READ_ROUTES:
+            return self.default_policy
+        return NO_RETRY
+
+    def should_reconcile(self, route):
+        return self.reconcile_orders and route in ORDER_ROUTES
+
+    def delay(self, route, attempt):
+        """
+        Return the seconds to wait before retry number `attempt` of `route`,
+        or None if it should not be retried.
+        """
+        policy = self.policy(route)
+        if attempt >= policy.max_attempts or not self.budget.withdraw():
+            return None
+        return policy.backoff(attempt)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+    shardedticker.py
+
+    Spreads a large subscription universe over several websocket connections.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import logging
+import threading
+
+from easeapi.dispatch import TickDispatcher
+from easeapi.easeapiticker import EaseApiTicker
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedTicker:
+    """
+    Market data over N `EaseApiTicker` connections, merged into one tick stream.
+
+    Each subscribed `(exchange, token)` is assigned to the least loaded shard,
+    and shards are rebalanced when unsubscribing leaves them uneven. Every
+    shard reads and decodes on its own socket and thread, and reconnects and
+    resubscribes its own tokens independently of the others.
+
+    All shards feed one `TickDispatcher`, which calls `on_ticks` with the
+    ticks of every shard in arrival order (with its default single worker).
+
+        ticker = ShardedTicker(app_key, client_id, auth_token, shards=4)
+        ticker.on_ticks = on_ticks
+        ticker.connect()
+        ticker.subscribe(fno_tokens, exchange="fno")
+    """
+
+    EXCHANGES = (EaseApiTicker.EXCHANGE_NSE, EaseApiTicker.EXCHANGE_BSE,
+                 EaseApiTicker.EXCHANGE_FNO, EaseApiTicker.EXCHANGE_BFO)
+
+    def __init__(self, app_key, client_id, auth_token, shards=4, codec=None, dispatcher=None):
+        """
+        Initialize the ShardedTicker.
+
+        Parameters:
+        -----------
+        app_key : str
+            Your EaseAPI application key
+        client_id : str
+            Your client ID
+        auth_token : str
+            Your authentication token
+        shards : int, optional
+            Number of websocket connections (default: 4)
+        codec : str or codec, optional
+            JSON codec used for messages, see `EaseApiTicker`.
+        dispatcher : TickDispatcher, optional
+            Merges the shards' ticks, defaults to a blocking single worker dispatcher.
+        """
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        if dispatcher is not None and dispatcher.executor == "process" and dispatcher.callback is None:
+            # `on_ticks` would be called through the ticker, which cannot be sent to another process
+            raise ValueError("A dispatcher with executor='process' needs its own picklable module level callback")
+
+        self.shards = [EaseApiTicker(app_key, client_id, auth_token, codec=codec) for _ in range(shards)]
+        for shard in self.shards:
+            shard.on_ticks = self._on_shard_ticks
+            shard.on_connect = self._on_shard_connect
+            shard.on_close = self._on_shard_close
+            shard.on_error = self._on_shard_error
+            shard.on_reconnect = self._on_shard_reconnect
+            shard.on_noreconnect = self._on_shard_noreconnect
+
+        self.dispatcher = dispatcher or TickDispatcher()
+
+        # (exchange, token) -> shard index, and the keys of each shard
+        self.assignments = {}
+        self._members = [set() for _ in range(shards)]
+        self._lock = threading.Lock()
+
+        # Called with the shard ticker that raised the event, except `on_ticks`
+        self.on_ticks = None
+        self.on_connect = None
+        self.on_close = None
+        self.on_error = None
+        self.on_reconnect = None
+        self.on_noreconnect = None
+
+    @property
+    def subscriptions(self):
+        """Subscribed tokens of every shard, as `{exchange: set of tokens}`."""
+        subscriptions = {}
+        for shard in self.shards:
+            for exchange, tokens in list(shard.subscriptions.items()):
+                subscriptions.setdefault(exchange, set()).update(tokens)
+        return subscriptions
+
+    def connect(self):
+        """Connect every shard to the market data endpoint."""
+        if not self.dispatcher.running:
+            self.dispatcher.start(None if self.dispatcher.callback else self._dispatch_ticks)
+
+        for shard in self.shards:
+            shard.connect()
+
+    def is_connected(self):
+        """
+        Returns:
+        --------
+        bool
+            True if every shard is connected
+        """
+        return all(shard.is_connected() for shard in self.shards)
+
+    def shard_of(self, token, exchange="nse"):
+        """Return the shard ticker `token` is assigned to, or None."""
+        index = self.assignments.get((exchange, str(token)))
+        return None if index is None else self.shards[index]
+
+    def subscribe(self, tokens, exchange="nse"):
+        """
+        Subscribe to LTP market data, spreading new tokens over the least loaded shards.
+
+        Parameters:
+        -----------
+        tokens : str, int, or list
+            Single token or list of tokens to subscribe
+        exchange : str, optional
+            Exchange to subscribe to (default: "nse")
+
+        Returns:
+        --------
+        bool
+            True if every shard sent its subscription request. Tokens of a shard
+            that is not connected yet are subscribed when it connects.
+        """
+        exchange = self._exchange(exchange)
+        moves = {}
+        with self._lock:
+            for token in self._tokens(tokens):
+                key = (exchange, token)
+                if key in self.assignments:
+                    continue
+                index = min(range(len(self.shards)), key=lambda i: len(self._members[i]))
+                self.assignments[key] = index
+                self._members[index].add(key)
+                moves.setdefault(index, []).append(token)
+
+        sent = all([self._send(self.shards[index]._subscribe_message, index, tokens, exchange)
+                    for index, tokens in moves.items()])
+        return self._rebalance() and sent
+
+    def unsubscribe(self, tokens, exchange="nse"):
+        """
+        Unsubscribe from LTP market data and rebalance the shards.
+
+        Parameters:
+        -----------
+        tokens : str, int, or list
+            Single token or list of tokens to unsubscribe
+        exchange : str, optional
+            Exchange to unsubscribe from (default: "nse")
+
+        Returns:
+        --------
+        bool
+            True if every affected shard sent its unsubscription request
+        """
+        exchange = self._exchange(exchange)
+        moves = {}
+        with self._lock:
+            for token in self._tokens(tokens):
+                index = self.assignments.pop((exchange, token), None)
+                if index is not None:
+                    self._members[index].discard((exchange, token))
+                    moves.setdefault(index, []).append(token)
+
+        sent = all([self._send(self.shards[index]._unsubscribe_message, index, tokens, exchange)
+                    for index, tokens in moves.items()])
+        return self._rebalance() and sent
+
+    def _rebalance(self):
+        """Move tokens from the most to the least loaded shards until they differ by at most one."""
+        moves = {}
+        with self._lock:
+            while True:
+                source = max(range(len(self.shards)), key=lambda i: len(self._members[i]))
+                target = min(range(len(self.shards)), key=lambda i: len(self._members[i]))
+                if len(self._members[source]) - len(self._members[target]) <= 1:
+                    break
+                key = self._members[source].pop()
+                self._members[target].add(key)
+                self.assignments[key] = target
+                moves.setdefault((source, target, key[0]), []).append(key[1])
+
+        sent = True
+        for (source, target, exchange), tokens in moves.items():
+            logger.info(f"Moving {len(tokens)} {exchange} tokens from shard {source} to shard {target}")
+            # Subscribe on the new shard first, so the tokens are never unsubscribed on both
+            sent &= self._send(self.shards[target]._subscribe_message, target, tokens, exchange)
+            sent &= self._send(self.shards[source]._unsubscribe_message, source, tokens, exchange)
+        return sent
+
+    def _send(self, build_message, index, tokens, exchange):
+        """Record a (un)subscription on a shard, and send it if the shard is connected."""
+        message = build_message(tokens, exchange)
+        if not self.shards[index].connected:
+            return False
+        return self.shards[index].send(message)
+
+    def _exchange(self, exchange):
+        if exchange not in self.EXCHANGES:
+            logger.warning(f"Unsupported exchange: {exchange}. Using NSE as default.")
+            return EaseApiTicker.EXCHANGE_NSE
+        return exchange
+
+    @staticmethod
+    def _tokens(tokens):
+        if not isinstance(tokens, list):
+            return [str(tokens)]
+        return [str(token) for token in tokens]
+
+    def tick_key(self, data):
+        """
+        Return the (exchange, token) of a decoded tick, taking the exchange from
+        the shards' subscriptions if the tick has none. None if it is not a tick.
+        """
+        if not isinstance(data, dict) or data.get("token") is None:
+            return None
+
+        token = str(data["token"])
+        exchange = data.get("exchange")
+        if exchange is None:
+            for shard in self.shards:
+                exchange = shard._token_exchanges.get(token)
+                if exchange is not None:
+                    break
+        return exchange, token
+
+    def _on_shard_ticks(self, shard, data):
+        self.dispatcher.put(data)
+
+    def _dispatch_ticks(self, data):
+        """Deliver a tick taken from the dispatcher to `on_ticks`."""
+        if self.on_ticks:
+            self.on_ticks(self, data)
+
+    def _on_shard_connect(self, shard, response):
+        if self.on_connect:
+            self.on_connect(shard, response)
+
+    def _on_shard_close(self, shard, close_status_code, close_msg):
+        if self.on_close:
+            self.on_close(shard, close_status_code, close_msg)
+
+    def _on_shard_error(self, shard, code, error):
+        if self.on_error:
+            self.on_error(shard, code, error)
+
+    def _on_shard_reconnect(self, shard, attempts):
+        if self.on_reconnect:
+            self.on_reconnect(shard, attempts)
+
+    def _on_shard_noreconnect(self, shard):
+        if self.on_noreconnect:
+            self.on_noreconnect(shard)
+
+    def stats(self):
+        """Return the token count and connection state of every shard, and the dispatcher counters."""
+        with self._lock:
+            loads = [len(members) for members in self._members]
+        return {
+            "shards": [
+                {"tokens": load, "connected": shard.connected}
+                for load, shard in zip(loads, self.shards)
+            ],
+            "dispatcher": self.dispatcher.stats(),
+        }
+
+    def close(self):
+        """Close every shard connection and stop the dispatcher once drained."""
+        for shard in self.shards:
+            shard.close()
+        self.dispatcher.stop()
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+    snapshot.py
+
+    On-disk, memory-mappable snapshots of the instrument master.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import easeapi.exceptions as ex
+from easeapi.instruments import InstrumentColumns, _StringColumn
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"EAIMSNP1"
+_PREFIX = struct.Struct("<8sQ")  # magic, header length
+_ALIGN = 8
+
+# Trading dates roll over on Indian Standard Time
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def trading_date(now=None):
+    """Return the current trading date (IST)."""
+    return (now or datetime.now(IST)).astimezone(IST).date()
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class _MappedStrings:
+    """Read-only sequence of strings stored as an offsets array over a UTF-8 blob."""
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+
+def write_snapshot(path, columns, etag=None, last_modified=None):
+    """
+    Write `columns` (an `InstrumentColumns`) to `path`.
+
+    The file is a small JSON header followed by the raw, 8-byte aligned column
+    buffers. It is written to a temporary file and renamed into place, so readers
+    in other processes never see a partial snapshot.
+    """
+    chunks = []
+    layout = {}
+    offset = 0
+
+    def add(buffer):
+        nonlocal offset
+        data = bytes(buffer)
+        start = offset
+        chunks.append((start, data))
+        offset = _aligned(start + len(data))
+        return [start, len(data)]
+
+    for field in columns.fields:
+        column = columns.columns[field]
+        if isinstance(column, _StringColumn):
+            blob = bytearray()
+            offsets = array("Q", [0])
+            for index in range(len(column.values)):
+                blob += column.values[index].encode("utf-8")
+                offsets.append(len(blob))
+            layout[field] = {
+                "kind": "string",
+                "codes": add(column.codes),
+                "offsets": add(offsets),
+                "blob": add(blob),
+                "codes_typecode": "I",
+            }
+        else:
+            typecode = column.typecode if isinstance(column, array) else column.format
+            layout[field] = {"kind": "array", "typecode": typecode, "data": add(column)}
+
+    header = json.dumps(
+        {
+            "rows": len(columns),
+            "fields": columns.fields,
+            "columns": layout,
+            "byteorder": sys.byteorder,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+    ).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(header)))
+        f.write(header)
+        for start, data in chunks:
+            f.seek(data_start + start)
+            f.write(data)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """
+    Memory-map the snapshot at `path`.
+
+    Returns `(columns, header)`. The columns are read-only views over the
+    mapping, so processes loading the same file share its pages.
+    Raises `ValueError` if the file is not a usable snapshot.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, header_length = _PREFIX.unpack_from(mapped, 0)
+    if magic != MAGIC:
+        raise ValueError("Not an instrument snapshot: {}".format(path))
+
+    header = json.loads(mapped[_PREFIX.size:_PREFIX.size + header_length])
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError("Snapshot was written on a {} endian host".format(header["byteorder"]))
+
+    view = memoryview(mapped)[_aligned(_PREFIX.size + header_length):]
+
+    def section(bounds, typecode=None):
+        start, length = bounds
+        data = view[start:start + length]
+        return data.cast(typecode) if typecode else data
+
+    mapped_columns = {}
+    for field in header["fields"]:
+        spec = header["columns"][field]
+        if spec["kind"] == "string":
+            column = _StringColumn()
+            column.values = _MappedStrings(section(spec["blob"]), section(spec["offsets"], "Q"))
+            column.codes = section(spec["codes"], spec["codes_typecode"])
+            column.compact()
+        else:
+            column = section(spec["data"], spec["typecode"])
+        mapped_columns[field] = column
+
+    return InstrumentColumns.from_columns(header["fields"], mapped_columns, header["rows"]), header
+
+
+class InstrumentSnapshot:
+    """
+    Instrument master cached on disk, one snapshot per trading date.
+
+    `load(gateway)` maps today's snapshot if there is one and revalidates it
+    with a conditional request (`If-None-Match` / `If-Modified-Since`), so the
+    CSV is only downloaded and parsed when the master actually changed. Every
+    worker on the host maps the same file and shares its pages.
+
+    Workers sharing `cache_dir` elect one writer with a lock file next to the
+    snapshots; the others wait for it and map the snapshot it wrote. Snapshots
+    of earlier trading dates are removed once a new one is written.
+    """
+
+    # Seconds between attempts to take the writer lock while another worker holds it
+    lock_poll = 0.1
+
+    def __init__(self, cache_dir, date=None):
+        """
+        - `cache_dir` is the directory snapshots are kept in. It is created if missing.
+        - `date` is the trading date to key the snapshot by, defaults to today (IST).
+        """
+        self.cache_dir = cache_dir
+        self.date = date
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def path(self):
+        """Path of the snapshot for the trading date."""
+        return os.path.join(
+            self.cache_dir,
+            "instruments-{:%Y%m%d}.snap".format(self.date or trading_date()),
+        )
+
+    @property
+    def lock_path(self):
+        """Path of the lock file held by the worker writing a snapshot."""
+        return os.path.join(self.cache_dir, "instruments.lock")
+
+    def read(self):
+        """Return `(columns, header)` of the cached snapshot, or `(None, None)`."""
+        try:
+            return read_snapshot(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                log.warning("Ignoring unreadable instrument snapshot {}: {}".format(self.path, e))
+            return None, None
+
+    def load(self, gateway, revalidate=True):
+        """
+        Return the `InstrumentColumns` for the trading date.
+
+        - `gateway` is the `EaseApiGateway` used to download the master.
+        - `revalidate`, if set to False, trusts an existing snapshot
+        without asking the server whether it is still current.
+        """
+        columns, header = self.read()
+        if columns is not None and not revalidate:
+            return columns
+
+        lock, waited = self._lock(), False
+        while lock is None:
+            waited = True
+            time.sleep(self.lock_poll)
+            lock = self._lock()
+        try:
+            if waited:
+                # Another worker just revalidated or wrote the snapshot
+                columns, header = self.read()
+                if columns is not None:
+                    return columns
+            r = gateway._send("get_instruments", "GET", headers=self._validators(header))
+            return self._update(gateway, columns, r.status_code, r.headers, r.content)
+        finally:
+            self._unlock(lock)
+
+    async def load_async(self, gateway, revalidate=True):
+        """Return the `InstrumentColumns` for the trading date, downloaded with an `AsyncEaseApiGateway`."""
+        columns, header = self.read()
+        if columns is not None and not revalidate:
+            return columns
+
+        lock, waited = self._lock(), False
+        while lock is None:
+            waited = True
+            await asyncio.sleep(self.lock_poll)
+            lock = self._lock()
+        try:
+            if waited:
+                columns, header = self.read()
+                if columns is not None:
+                    return columns
+            status, headers, content = await gateway._fetch("get_instruments", headers=self._validators(header))
+            return self._update(gateway, columns, status, headers, content)
+        finally:
+            self._unlock(lock)
+
+    def _lock(self):
+        """Return the open lock file if this worker was elected writer, or None if another worker holds it."""
+        f = open(self.lock_path, "a+b")
+        try:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return None
+        return f
+
+    @staticmethod
+    def _unlock(f):
+        """Release the lock taken by `_lock`."""
+        try:
+            if not fcntl:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+    def _prune(self):
+        """Remove snapshots of earlier trading dates, and temporary files left by interrupted writes."""
+        current = os.path.basename(self.path)
+        for name in os.listdir(self.cache_dir):
+            stale = name.startswith("instruments-") and (
+                (name.endswith(".snap") and name < current) or name.endswith(".tmp")
+            )
+            if not stale:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                # e.g. still mapped by a worker on Windows, retried after the next write
+                log.warning("Couldn't remove old instrument snapshot {}: {}".format(name, e))
+
+    @staticmethod
+    def _validators(header):
+        """Return the conditional request headers for a cached snapshot `header`."""
+        validators = {}
+        if header:
+            if header.get("etag"):
+                validators["If-None-Match"] = header["etag"]
+            if header.get("last_modified"):
+                validators["If-Modified-Since"] = header["last_modified"]
+        return validators
+
+    def _update(self, gateway, columns, status, headers, content):
+        """Return `columns` if the server reports them current, else store and return the downloaded master."""
+        if status == 304 and columns is not None:
+            log.debug("Instrument snapshot {} is current".format(self.path))
+            return columns
+
+        # Only a complete CSV master may replace the snapshot on disk
+        content_type = headers.get("content-type", "")
+        if status != 200 or "csv" not in content_type:
+            # Raises the mapped exception for API errors, e.g. an expired session
+            gateway._parse_response(status, content_type, content)
+            raise ex.DataException(
+                "Couldn't download the instrument master: HTTP {code} {content_type}".format(
+                    code=status, content_type=content_type
+                )
+            )
+
+        columns = InstrumentColumns.from_csv(gateway._parse_response(status, content_type, content))
+        if "exchange_token" not in columns.fields:
+            raise ex.DataException("The instrument master has no exchange_token column: {}".format(columns.fields))
+        write_snapshot(
+            self.path,
+            columns,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        self._prune()
+        return read_snapshot(self.path)[0]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+    templates.py
+
+    Order payloads validated and encoded ahead of time, patched when fired.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+from decimal import Decimal
+
+from easeapi.codec import JsonCodec
+
+# Fields every order payload must carry
+REQUIRED_FIELDS = ("instrument_id", "exchange", "transaction_type", "order_type", "product", "quantity")
+TRANSACTION_TYPES = ("B", "S")
+
+# Fields that can be changed when the template is fired
+_PATCHABLE = ("price", "trigger_price", "quantity")
+_PRICE_FIELDS = ("price", "trigger_price")
+# Stand-ins for the patchable values in the encoded template
+_MARKER = "@@easeapi:{}@@"
+
+
+def _dump_float(value):
+    return float.__repr__(value).encode("ascii")
+
+
+def instrument_sizes(master, instrument_id, exchange, segment=None):
+    """
+    Return `(tick_size, lot_size)` of an instrument in an `InstrumentMaster`.
+
+    The instrument must be listed under `instrument_id` on `exchange`, and in
+    `segment` if given, as tokens are only unique within an exchange. Raises
+    `ValueError` if there is no such instrument.
+    """
+    row = None
+    if instrument_id not in (None, "") and exchange:
+        row = master.by_token(instrument_id, exchange, segment or None)
+    if row is None:
+        raise ValueError("Instrument {} on {}{} is not in the instrument master".format(
+            instrument_id, exchange, " segment {}".format(segment) if segment else ""
+        ))
+    return float(row["tick_size"]), int(row["lot_size"])
+
+
+class OrderTemplate:
+    """
+    An order payload validated and JSON-encoded once, ahead of the trade.
+
+    The payload is checked against the instrument's tick and lot size when the
+    template is built, and kept as encoded byte segments around its price,
+    trigger price and quantity. Firing only formats those numbers and joins
+    the segments, then sends the bytes with the prepared JSON headers:
+
+        template = easeapi.order_template({
+            "instrument_id": 2885, "exchange": "NSE", "segment": "E",
+            "transaction_type": "B", "order_type": "LMT", "product": "I",
+            "quantity": 1, "price": 0.0, "trigger_price": 0.0, "validity": "DAY",
+        }, intraday=True)
+
+        template.fire(price=1224.07)  # sent as 1224.05 with a 0.05 tick
+
+    Prices are rounded to the nearest tick. Quantities must be a positive
+    multiple of the lot size. A template can be fired any number of times,
+    from any thread.
+    """
+
+    def __init__(self, gateway, route, payload, tick_size=None, lot_size=None):
+        """
+        Use `EaseApiGateway.order_template()`, which looks up the instrument sizes.
+
+        - `route` is the order route, e.g. "place_intraday_order".
+        - `payload` is the order payload, as for the order methods.
+        - `tick_size` and `lot_size` of the instrument, prices are not rounded
+        without a tick size and any quantity is accepted without a lot size.
+        """
+        missing = [field for field in REQUIRED_FIELDS if payload.get(field) in (None, "")]
+        if missing:
+            raise ValueError("Order payload is missing {}".format(", ".join(missing)))
+        if payload["transaction_type"] not in TRANSACTION_TYPES:
+            raise ValueError("transaction_type must be one of {}, got {!r}".format(
+                ", ".join(TRANSACTION_TYPES), payload["transaction_type"]
+            ))
+        if tick_size is not None and tick_size <= 0:
+            raise ValueError("tick_size must be positive")
+
+        self.gateway = gateway
+        self.route = route
+        self.tick_size = tick_size
+        self.lot_size = lot_size or 1
+        self._decimals = max(0, -Decimal(str(tick_size)).as_tuple().exponent) if tick_size else None
+        # `json` writes floats as their repr, skip its per-call encoder setup
+        self._dumpb = _dump_float if type(gateway.codec) is JsonCodec else gateway.codec.dumpb
+
+        self.payload = dict(payload)
+        for field in _PRICE_FIELDS:
+            if field in self.payload:
+                self.payload[field] = self.round_price(self.payload[field])
+        self.payload["quantity"] = self.check_quantity(self.payload["quantity"])
+
+        # The encoded payload split at the patchable fields, with their template
+        # values in between: firing copies it and only replaces the values given.
+        encoded = gateway.codec.dumpb(
+            {field: _MARKER.format(field) if field in _PATCHABLE else value for field, value in self.payload.items()}
+        )
+        self.fields = [field for field in self.payload if field in _PATCHABLE]
+        self._parts = [encoded]
+        self._slots = dict.fromkeys(_PATCHABLE)
+        for field in self.fields:
+            marker = gateway.codec.dumpb(_MARKER.format(field))
+            head, _, tail = self._parts.pop().partition(marker)
+            self._slots[field] = len(self._parts) + 1
+            value = self._encode_quantity(self.payload[field]) if field == "quantity" else self._encode_price(self.payload[field])
+            self._parts.extend((head, value, tail))
+
+    def round_price(self, price):
+        """Round `price` to the nearest tick."""
+        price = float(price)
+        if not self.tick_size:
+            return price
+        return round(round(price / self.tick_size) * self.tick_size, self._decimals)
+
+    def check_quantity(self, quantity):
+        """Return `quantity` as an int, raises `ValueError` unless it is a positive multiple of the lot size."""
+        quantity = int(quantity)
+        if quantity <= 0 or quantity % self.lot_size:
+            raise ValueError("quantity must be a positive multiple of the lot size {}, got {}".format(self.lot_size, quantity))
+        return quantity
+
+    def _encode_price(self, price):
+        # Encoded by the codec, so the bytes match encoding the payload as a dict
+        return self._dumpb(self.round_price(price))
+
+    def _encode_quantity(self, quantity):
+        if quantity <= 0 or quantity % self.lot_size or quantity != int(quantity):
+            self.check_quantity(quantity)
+            raise ValueError("quantity must be a whole number, got {}".format(quantity))
+        return b"%d" % quantity
+
+    def encode(self, price=None, quantity=None, trigger_price=None):
+        """Return the payload bytes with the given fields patched, the others keep their template value."""
+        parts = self._parts.copy()
+        slots = self._slots
+        try:
+            if price is not None:
+                parts[slots["price"]] = self._encode_price(price)
+            if quantity is not None:
+                parts[slots["quantity"]] = self._encode_quantity(quantity)
+            if trigger_price is not None:
+                parts[slots["trigger_price"]] = self._encode_price(trigger_price)
+        except TypeError:
+            if (price is not None and slots["price"] is None) or (trigger_price is not None and slots["trigger_price"] is None):
+                raise ValueError("The order template has no such field to patch")
+            raise
+        return b"".join(parts)
+
+    def fire(self, price=None, quantity=None, trigger_price=None, native=None):
+        """Send the order, with the given fields patched. Returns the API response."""
+        body = self.encode(price, quantity, trigger_price)
+        return self.gateway._format(self.gateway._request(self.route, "POST", is_json=True, body=body), native)
+
+    async def fire_async(self, price=None, quantity=None, trigger_price=None, native=None):
+        """Send the order through an `AsyncEaseApiGateway`, see `fire()`."""
+        body = self.encode(price, quantity, trigger_price)
+        return self.gateway._format(await self.gateway._request(self.route, "POST", is_json=True, body=body), native)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+    ticks.py
+
+    Tick types: the `Tick` value and the NumPy tick batches of `EaseApiTicker`.
+
+    :copyright: (c) 2025 by Ventura Securities Ltd.
+    :license: see LICENSE for details.
+"""
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+# Values of the ticker's `tick_model` argument
+DICT = "dict"
+NUMPY = "numpy"
+TICK_MODELS = (DICT, NUMPY)
+
+# Record layout of a tick batch
+TICK_DTYPE = [("exchange", "U3"), ("token", "i8"), ("ltp", "f8"), ("timestamp", "f8")]
+
+
+class Tick:
+    """
+    A single LTP tick, without the per-instance `__dict__` of a decoded message.
+
+    Ticks are immutable values: they compare and hash by their fields, so the
+    same tick received twice is one set member.
+    """
+
+    __slots__ = ("exchange", "token", "ltp", "timestamp")
+
+    def __init__(self, exchange, token, ltp, timestamp=0.0):
+        set_field = object.__setattr__
+        set_field(self, "exchange", exchange)
+        set_field(self, "token", token)
+        set_field(self, "ltp", ltp)
+        set_field(self, "timestamp", timestamp)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Tick is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Tick is immutable")
+
+    def __reduce__(self):
+        return Tick, (self.exchange, self.token, self.ltp, self.timestamp)
+
+    def __repr__(self):
+        return "Tick(exchange={!r}, token={!r}, ltp={!r}, timestamp={!r})".format(
+            self.exchange, self.token, self.ltp, self.timestamp
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Tick):
+            return NotImplemented
+        return (self.exchange, self.token, self.ltp, self.timestamp) == (
+            other.exchange, other.token, other.ltp, other.timestamp
+        )
+
+    def __hash__(self):
+        return hash((self.exchange, self.token, self.ltp, self.timestamp))
+
+    def as_dict(self):
+        return {"exchange": self.exchange, "token": self.token, "ltp": self.ltp, "timestamp": self.timestamp}
+
+
+def is_tick(data):
+    """True if a decoded message is an LTP tick, rather than e.g. a status message."""
+    return isinstance(data, dict) and "ltp" in data and data.get("token") is not None
+
+
+def tick_array(items):
+    """
+    Build a NumPy structured array of ticks, see `TICK_DTYPE`.
+
+    - `items` is a sequence of `((exchange, token), message)` pairs.
+    """
+    if numpy is None:
+        raise ImportError("tick batches require numpy, install it with `pip install numpy`")
+
+    return numpy.array(
+        [(exchange or "", int(token), float(data["ltp"]), float(data.get("timestamp") or 0))
+         for (exchange, token), data in items],
+        dtype=TICK_DTYPE,
+    )
@@ -24,7 +24,7 @@ with io.open("README.md", "rt", encoding="utf8") as f:
 setup(
     name=about["__title__"],
     version=about["__version__"],
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     description=about["__description__"],
     long_description=readme,
     long_description_content_type="text/markdown",
@@ -60,5 +60,5 @@ setup(
     tests_require=["pytest", "responses", "pytest-cov", "mock", "flake8"],
     test_suite="tests",
     setup_requires=["pytest-runner"],
-    extras_require={"doc": ["pdoc"], ':sys_platform=="win32"': ["pywin32"]},
+    extras_require={"doc": ["pdoc"], "async": ["aiohttp>=3.8.0"], "numpy": ["numpy>=1.20"], "fast": ["orjson>=3.6"], ':sys_platform=="win32"': ["pywin32"]},
 )
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Bulk order requests and the `cancel_all_orders` filters."""
+
+import json
+
+import pytest
+import requests
+import responses
+
+from easeapi import EaseApiGateway
+
+ORDERBOOK = {"data": [
+    {"order_no": "1", "exchange": "NSE", "trading_symbol": "RELIANCE-EQ", "instrument_id": "2885", "status": "OPEN"},
+    {"order_no": "2", "exchange": "nse", "trading_symbol": "RELIANCE-EQ", "instrument_id": "2885", "status": "PENDING"},
+    {"order_no": "3", "exchange": "NSE", "trading_symbol": "TCS-EQ", "instrument_id": "11536", "status": "OPEN"},
+    {"order_no": "4", "exchange": "BSE", "trading_symbol": "RELIANCE", "instrument_id": "500325", "status": "OPEN"},
+    {"order_no": "5", "exchange": "NSE", "trading_symbol": "RELIANCE-EQ", "instrument_id": "2885", "status": "COMPLETE"},
+    {"order_no": "6", "exchange": "NSE", "trading_symbol": "TCS-EQ", "instrument_id": "11536", "status": "cancelled"},
+    {"order_no": "7", "exchange": "NSE", "trading_symbol": "INFY-EQ", "instrument_id": "1594", "status": "REJECTED"},
+]}
+
+
+@pytest.fixture
+def easeapi():
+    return EaseApiGateway("app_key", native=True)
+
+
+def mock_orders(easeapi):
+    responses.add(responses.GET, easeapi._route_urls["get_orderbook"], json=ORDERBOOK)
+    responses.add(responses.POST, easeapi._route_urls["cancel_order"], json={"status": "success"})
+
+
+def cancelled(easeapi):
+    """Order numbers sent to the cancel route, sorted as legs run concurrently."""
+    return sorted(
+        json.loads(call.request.body)["order_no"]
+        for call in responses.calls
+        if call.request.url == easeapi._route_urls["cancel_order"]
+    )
+
+
+@responses.activate
+def test_cancel_all_open_orders(easeapi):
+    mock_orders(easeapi)
+    results = easeapi.cancel_all_orders()
+
+    assert cancelled(easeapi) == ["1", "2", "3", "4"]
+    assert [result.payload["order_no"] for result in results] == ["1", "2", "3", "4"]
+    assert all(result.error is None and result.response == {"status": "success"} for result in results)
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"exchange": "NSE"}, ["1", "2", "3"]),
+    ({"exchange": "bse"}, ["4"]),
+    ({"exchange": "NSE", "trading_symbol": "RELIANCE-EQ"}, ["1", "2"]),
+    ({"trading_symbol": "reliance-eq"}, []),
+    ({"instrument_id": 11536}, ["3"]),
+    ({"exchange": "BSE", "instrument_id": "2885"}, []),
+])
+@responses.activate
+def test_cancel_all_orders_filters(easeapi, filters, expected):
+    mock_orders(easeapi)
+    easeapi.cancel_all_orders(**filters)
+
+    assert cancelled(easeapi) == expected
+
+
+@responses.activate
+def test_cancel_all_orders_from_given_orders(easeapi):
+    mock_orders(easeapi)
+    orders = ORDERBOOK["data"][2:]
+    easeapi.cancel_all_orders(exchange="NSE", orders=orders)
+
+    assert cancelled(easeapi) == ["3"]
+    # The orderbook is not fetched
+    assert all(call.request.method == "POST" for call in responses.calls)
+
+
+@responses.activate
+def test_failed_leg_does_not_stop_the_others(easeapi):
+    responses.add(responses.GET, easeapi._route_urls["get_orderbook"], json=ORDERBOOK)
+    responses.add(
+        responses.POST, easeapi._route_urls["cancel_order"],
+        match=[responses.matchers.json_params_matcher({"order_no": "3"})],
+        body=requests.ConnectionError("reset"),
+    )
+    responses.add(responses.POST, easeapi._route_urls["cancel_order"], json={"status": "success"})
+
+    results = easeapi.cancel_all_orders(exchange="NSE")
+
+    assert [result.payload["order_no"] for result in results] == ["1", "2", "3"]
+    assert [result.response for result in results] == [{"status": "success"}, {"status": "success"}, None]
+    assert isinstance(results[2].error, requests.ConnectionError)
+
+
+def test_cancel_legs(easeapi):
+    assert easeapi._cancel_legs(["1", 2, {"order_no": 3, "status": "OPEN"}]) == [
+        ("cancel_order", {"order_no": "1"}),
+        ("cancel_order", {"order_no": "2"}),
+        ("cancel_order", {"order_no": "3"}),
+    ]
+
+
+def test_submit_orders_rejects_unknown_routes(easeapi):
+    with pytest.raises(ValueError):
+        easeapi.submit_orders([("get_orderbook", {})])
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Overflow policies of the tick dispatcher's ring buffer."""
+
+import threading
+
+import pytest
+
+from easeapi import TickDispatcher
+
+
+class GatedCallback:
+    """Records messages, holding the worker on the first one until released."""
+
+    def __init__(self):
+        self.delivered = []
+        self.holding = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, data):
+        if not self.delivered:
+            self.holding.set()
+            assert self.release.wait(5)
+        self.delivered.append(data)
+
+
+def tick(token, ltp, exchange="nse"):
+    return {"exchange": exchange, "token": token, "ltp": ltp}
+
+
+def started(policy, capacity):
+    """Return a dispatcher whose only worker is busy with a first message."""
+    callback = GatedCallback()
+    dispatcher = TickDispatcher(callback, capacity=capacity, policy=policy)
+    dispatcher.start()
+    dispatcher.put(tick("0", 0.0))
+    assert callback.holding.wait(5)
+    return dispatcher, callback
+
+
+def drain(dispatcher, callback):
+    callback.release.set()
+    dispatcher.stop()
+    return callback.delivered[1:]
+
+
+def test_block_waits_for_room():
+    dispatcher, callback = started("block", capacity=2)
+    assert dispatcher.put(tick("1", 1.0)) and dispatcher.put(tick("2", 2.0))
+
+    blocked = threading.Thread(target=dispatcher.put, args=(tick("3", 3.0),))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    assert dispatcher.stats()["queued"] == 2
+
+    callback.release.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    assert [data["ltp"] for data in drain(dispatcher, callback)] == [1.0, 2.0, 3.0]
+    stats = dispatcher.stats()
+    assert (stats["received"], stats["delivered"], stats["dropped"], stats["max_queued"]) == (4, 4, 0, 2)
+
+
+def test_block_gives_up_when_stopped():
+    dispatcher, callback = started("block", capacity=1)
+    dispatcher.put(tick("1", 1.0))
+
+    result = []
+    blocked = threading.Thread(target=lambda: result.append(dispatcher.put(tick("2", 2.0))))
+    blocked.start()
+    blocked.join(0.1)
+    dispatcher.stop(drain=False, timeout=0.1)
+    blocked.join(5)
+
+    assert result == [False]
+    assert dispatcher.stats()["dropped"] == 1
+    callback.release.set()
+
+
+def test_drop_oldest():
+    dispatcher, callback = started("drop_oldest", capacity=2)
+    for i in range(1, 5):
+        assert dispatcher.put(tick(str(i), float(i)))
+
+    assert [data["ltp"] for data in drain(dispatcher, callback)] == [3.0, 4.0]
+    stats = dispatcher.stats()
+    assert (stats["received"], stats["delivered"], stats["dropped"]) == (5, 3, 2)
+
+
+def test_conflate_replaces_pending_ticks_in_place():
+    dispatcher, callback = started("conflate", capacity=3)
+    for data in (tick("1", 1.0), tick("2", 2.0), tick("1", 1.5), tick("1", 1.0, exchange="bse"), tick("2", 2.5)):
+        dispatcher.put(data)
+    # Full of other tokens: the oldest is dropped
+    dispatcher.put(tick("3", 3.0))
+    # Its token is no longer pending, so it queues again
+    dispatcher.put(tick("1", 1.75))
+
+    assert [(data["exchange"], data["token"], data["ltp"]) for data in drain(dispatcher, callback)] == [
+        ("bse", "1", 1.0), ("nse", "3", 3.0), ("nse", "1", 1.75),
+    ]
+    stats = dispatcher.stats()
+    assert (stats["received"], stats["conflated"], stats["dropped"], stats["delivered"]) == (8, 2, 2, 4)
+
+
+def test_conflate_keeps_messages_without_a_token():
+    dispatcher, callback = started("conflate", capacity=10)
+    for data in ({"status": "ok"}, {"status": "ok"}, tick("1", 1.0), tick("1", 2.0)):
+        dispatcher.put(data)
+
+    assert drain(dispatcher, callback) == [{"status": "ok"}, {"status": "ok"}, tick("1", 2.0)]
+
+
+def test_callback_can_stop_the_dispatcher():
+    delivered = []
+
+    def callback(data):
+        delivered.append(data)
+        dispatcher.stop()
+
+    dispatcher = TickDispatcher(callback)
+    dispatcher.start()
+    worker, = dispatcher._threads
+    dispatcher.put(tick("1", 1.0))
+    worker.join(5)
+
+    assert not worker.is_alive()
+    assert delivered == [tick("1", 1.0)]
+    assert dispatcher.stats()["errors"] == 0
+    assert not dispatcher.put(tick("1", 2.0))
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        TickDispatcher(policy="latest")
+    with pytest.raises(ValueError):
+        TickDispatcher(capacity=0)
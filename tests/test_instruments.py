@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Streaming the instrument master, from the blocking and the asyncio clients."""
+
+import asyncio
+
+import pytest
+import responses
+
+from easeapi import EaseApiGateway
+from easeapi import exceptions as ex
+from easeapi.instruments import iter_csv_instruments
+
+CSV = (
+    "exchange_token,trading_symbol,name,last_price,expiry,strike,tick_size,lot_size,instrument,segment,exchange\n"
+    "2885,RELIANCE-EQ,RELIANCE,1250.5,,0,0.05,1,EQ,E,NSE\n"
+    "500325,RELIANCE,RELIANCE,1250.1,,0,0.05,1,EQ,E,BSE\n"
+    "35001,NIFTY25JANFUT,NIFTY,23500,30/01/2025,0,0.05,75,FUT,D,NFO\n"
+    "35002,NIFTY25JAN23500CE,NIFTY,120.5,30/01/2025,23500,0.05,75,CE,D,NFO\n"
+    "35003,BANKNIFTY25JANFUT,BANKNIFTY,49000,30/01/2025,0,0.05,30,FUT,D,NFO\n"
+).encode("utf-8")
+
+
+def test_iter_csv_instruments_filters():
+    rows = list(iter_csv_instruments(CSV.decode("utf-8").splitlines(), exchange="NFO", name="NIFTY"))
+
+    assert [row["exchange_token"] for row in rows] == [35001, 35002]
+    assert rows[1]["lot_size"] == 75 and rows[1]["tick_size"] == 0.05
+
+
+@responses.activate
+def test_iter_instruments():
+    easeapi = EaseApiGateway("app_key")
+    responses.add(responses.GET, easeapi._route_urls["get_instruments"], body=CSV, content_type="text/csv")
+
+    rows = list(easeapi.iter_instruments(predicate=lambda row: row["instrument"] == "FUT"))
+    assert [row["trading_symbol"] for row in rows] == ["NIFTY25JANFUT", "BANKNIFTY25JANFUT"]
+
+
+@responses.activate
+def test_iter_instruments_error_response():
+    easeapi = EaseApiGateway("app_key")
+    responses.add(responses.GET, easeapi._route_urls["get_instruments"], json={"message": "Too many requests"}, status=429)
+
+    with pytest.raises(ex.DataException, match="Too many requests"):
+        list(easeapi.iter_instruments())
+
+
+async def serve(body, content_type, status=200):
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    async def instruments(request):
+        return web.Response(body=body, content_type=content_type, status=status)
+
+    app = web.Application()
+    app.router.add_get("/instrument/v1/instruments", instruments)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def async_gateway(server):
+    from easeapi import AsyncEaseApiGateway
+
+    easeapi = AsyncEaseApiGateway("app_key")
+    url = str(server.make_url("/instrument/v1/instruments"))
+    easeapi._route_urls = dict(easeapi._route_urls, get_instruments=url)
+    return easeapi
+
+
+def test_async_iter_instruments():
+    pytest.importorskip("aiohttp")
+
+    async def main():
+        server = await serve(CSV, "text/csv")
+        easeapi = async_gateway(server)
+        try:
+            streamed = easeapi._iter_instrument_batches(chunk_size=7)
+            rows = [row async for row in easeapi.iter_instruments(exchange="NFO")]
+            # Lines cut across tiny chunks are joined back
+            lines = [line async for batch in streamed for line in batch]
+        finally:
+            await easeapi.close()
+            await server.close()
+        return rows, lines
+
+    rows, lines = asyncio.run(main())
+    assert rows == list(iter_csv_instruments(CSV.decode("utf-8").splitlines(), exchange="NFO"))
+    assert lines == CSV.decode("utf-8").splitlines()
+
+
+def test_async_iter_instruments_error_response():
+    pytest.importorskip("aiohttp")
+
+    async def main():
+        server = await serve(b'{"message": "Too many requests"}', "application/json", status=429)
+        easeapi = async_gateway(server)
+        try:
+            with pytest.raises(ex.DataException, match="Too many requests"):
+                [row async for row in easeapi.iter_instruments()]
+        finally:
+            await easeapi.close()
+            await server.close()
+
+    asyncio.run(main())
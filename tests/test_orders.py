@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""The order state cache against out-of-order updates and failed reloads."""
+
+import threading
+import time
+
+import pytest
+
+from easeapi import OrderStateCache
+
+
+class FakeGateway:
+    """Serves `orderbook`, after failing the first `failures` fetches."""
+
+    def __init__(self, orderbook, failures=0):
+        self.orderbook = orderbook
+        self.failures = failures
+        self.fetched = threading.Event()
+        self.release = None
+
+    def get_orderbook(self, native=None):
+        self.fetched.set()
+        if self.release is not None:
+            self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("down")
+        return {"data": self.orderbook}
+
+    @staticmethod
+    def _response_records(data):
+        return data["data"]
+
+
+ORDERS = [
+    {"order_no": "1", "exchange": "NSE", "trading_symbol": "RELIANCE-EQ", "status": "OPEN"},
+    {"order_no": "2", "exchange": "BSE", "trading_symbol": "RELIANCE", "status": "OPEN"},
+    {"order_no": "3", "exchange": "nse", "trading_symbol": "TCS-EQ", "status": "OPEN"},
+    {"order_no": "4", "exchange": "BSE", "trading_symbol": "TCS", "status": "COMPLETE"},
+]
+
+
+@pytest.fixture
+def orders():
+    cache = OrderStateCache(FakeGateway([dict(order) for order in ORDERS]))
+    cache.load()
+    return cache
+
+
+def numbers(orders):
+    return sorted(order["order_no"] for order in orders)
+
+
+def test_open_orders_by_exchange(orders):
+    assert numbers(orders.open_orders()) == ["1", "2", "3"]
+    assert numbers(orders.open_orders(exchange="BSE")) == ["2"]
+    assert numbers(orders.open_orders(exchange="nse")) == ["1", "3"]
+    assert numbers(orders.open_orders("NSE", "TCS-EQ")) == ["3"]
+    assert numbers(orders.by_symbol("bse", "RELIANCE")) == ["2"]
+
+
+def test_filled_quantity_never_goes_down(orders):
+    orders.apply({"order_no": "1", "filled_quantity": 10, "status": "OPEN"})
+    orders.apply({"order_no": "1", "filled_quantity": 7, "status": "OPEN"})
+
+    assert orders.get("1")["filled_quantity"] == 10
+    assert orders.stats()["stale"] == 1
+
+
+def test_held_back_message_older_than_the_orderbook():
+    gateway = FakeGateway([{"order_no": "1", "exchange": "NSE", "status": "OPEN", "filled_quantity": 10}])
+    gateway.release = threading.Event()
+    orders = OrderStateCache(gateway)
+
+    thread = threading.Thread(target=orders.resync)
+    thread.start()
+    gateway.fetched.wait(5)
+    # Received while the orderbook is fetched, but older than it
+    orders.apply({"order_no": "1", "status": "OPEN", "filled_quantity": 7})
+    gateway.release.set()
+    thread.join(5)
+
+    assert orders.get("1")["filled_quantity"] == 10
+
+
+def test_failed_background_reload_is_retried():
+    gateway = FakeGateway([{"order_no": "1", "status": "OPEN"}], failures=2)
+    orders = OrderStateCache(gateway)
+    orders.resync_delay = 0.01
+
+    orders.on_connect(None, None)
+
+    deadline = time.monotonic() + 5
+    while not orders.loaded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "1" in orders
+    assert orders.stats()["resync_errors"] == 2
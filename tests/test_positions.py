@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Fills booked by the position book from order updates."""
+
+import pytest
+
+from easeapi import PositionBook
+
+
+@pytest.fixture
+def book():
+    return PositionBook(gateway=None)
+
+
+def update(book, previous, **order):
+    order = dict({"order_no": "1", "exchange": "NSE", "instrument_id": "2885", "transaction_type": "B"}, **order)
+    book.on_order_update(order, previous)
+    return order
+
+
+def test_partial_fills(book):
+    first = update(book, None, filled_quantity=4, average_price=100.0)
+    update(book, first, filled_quantity=10, average_price=101.2)
+
+    position = book.position("NSE", 2885)
+    assert position.net_quantity == 10
+    assert position.cost == pytest.approx(1012.0)
+
+
+def test_regressed_update_is_not_booked_again(book):
+    filled = update(book, None, filled_quantity=10, average_price=100.0)
+    stale = update(book, filled, filled_quantity=7, average_price=100.0)
+    update(book, stale, filled_quantity=10, average_price=100.0)
+
+    assert book.net_quantity("NSE", 2885) == 10
+    assert book.stats()["fills"] == 1
+
+
+def test_repeated_update_is_not_booked_again(book):
+    filled = update(book, None, filled_quantity=5, average_price=100.0)
+    update(book, None, filled_quantity=5, average_price=100.0)
+    update(book, filled, filled_quantity=5, average_price=100.0)
+
+    assert book.net_quantity("NSE", 2885) == 5
+
+
+def test_out_of_order_updates(book):
+    update(book, None, filled_quantity=8, average_price=100.0)
+    update(book, None, filled_quantity=3, average_price=100.0)
+    update(book, None, filled_quantity=10, average_price=100.2)
+
+    position = book.position("NSE", 2885)
+    assert position.net_quantity == 10
+    assert position.cost == pytest.approx(1002.0)
+
+
+def test_sell_fills_per_order(book):
+    update(book, None, filled_quantity=10, average_price=100.0)
+    update(book, None, order_no="2", transaction_type="S", filled_quantity=4, average_price=110.0)
+
+    assert book.net_quantity("NSE", 2885) == 6
+    assert book.mtm("NSE", 2885, ltp=110.0) == pytest.approx(6 * 110.0 - (1000.0 - 440.0))
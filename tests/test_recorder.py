@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Recording ticks and replaying them, across index chunks and sessions."""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from easeapi.recorder import ReplayTicker, TickRecorder, TickRecording
+from easeapi.snapshot import IST
+
+# 15:29:00 IST, a minute before the close
+SESSION = int(datetime(2025, 1, 2, 15, 29, tzinfo=IST).timestamp()) * 10 ** 9
+# 00:00:01 IST the next day
+NEXT_SESSION = int(datetime(2025, 1, 3, 0, 0, 1, tzinfo=IST).timestamp()) * 10 ** 9
+
+
+def message(token, ltp):
+    return json.dumps({"token": token, "ltp": ltp, "timestamp": 1})
+
+
+def recordings(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory))
+
+
+def read(path, start=None, end=None):
+    with TickRecording(path) as recording:
+        return [(received, bytes(payload)) for received, payload in recording.records(start, end)]
+
+
+def test_round_trip_across_index_chunks(tmp_path):
+    written = [(SESSION + i * 1000, message("1", 100.0 + i).encode()) for i in range(10)]
+    with TickRecorder(str(tmp_path), index_every=3) as recorder:
+        for received, payload in written:
+            recorder.write(payload, received)
+
+    path, = recordings(str(tmp_path))
+    with TickRecording(path) as recording:
+        assert recording.started == SESSION
+        # Three full chunks and the partial one closed with the file
+        assert [first for first, _ in recording.chunks] == [SESSION, SESSION + 3000, SESSION + 6000, SESSION + 9000]
+
+    assert read(path) == written
+    # Starting inside a chunk jumps to it through the index
+    assert read(path, start=SESSION + 4000) == written[4:]
+    assert read(path, start=SESSION + 3000, end=SESSION + 6000) == written[3:7]
+
+
+def test_unclosed_recording_is_scanned(tmp_path):
+    recorder = TickRecorder(str(tmp_path), index_every=2)
+    for i in range(5):
+        recorder.write(message("1", i), SESSION + i)
+    recorder.flush()
+
+    path, = recordings(str(tmp_path))
+    with TickRecording(path) as recording:
+        assert [first for first, _ in recording.chunks] == [SESSION, SESSION + 2, SESSION + 4]
+    assert [received for received, _ in read(path, start=SESSION + 3)] == [SESSION + 3, SESSION + 4]
+    recorder.close()
+
+
+def test_session_rotation_and_replay(tmp_path):
+    with TickRecorder(str(tmp_path), index_every=2) as recorder:
+        recorder.write(message("1", 10.0), SESSION)
+        recorder.write(message("2", 20.0), SESSION + 1)
+        recorder.write(message("1", 10.5), SESSION + 2)
+        # Past midnight IST: a new session file
+        recorder.write(message("1", 11.0), NEXT_SESSION)
+        recorder.rotate()
+        recorder.write(message("2", 21.0), NEXT_SESSION + 1)
+
+    names = ["ticks-20250102-152900.eatr", "ticks-20250103-000001.eatr", "ticks-20250103-000001-1.eatr"]
+    assert sorted(os.listdir(str(tmp_path))) == sorted(names)
+    paths = [os.path.join(str(tmp_path), name) for name in names]
+    assert [[received for received, _ in read(path)] for path in paths] == [
+        [SESSION, SESSION + 1, SESSION + 2], [NEXT_SESSION], [NEXT_SESSION + 1],
+    ]
+
+    replay = ReplayTicker(paths)
+    replay.subscriptions = {"nse": {"1", "2"}}
+    delivered = []
+    replay.on_ticks = lambda ticker, ticks: delivered.append(ticks)
+    assert replay.run() == 5
+    assert [(tick["token"], tick["ltp"]) for tick in delivered] == [
+        ("1", 10.0), ("2", 20.0), ("1", 10.5), ("1", 11.0), ("2", 21.0),
+    ]
+
+    # Bounded replay, starting in the second index chunk of the first session
+    replay = ReplayTicker(paths, start=SESSION + 2, end=NEXT_SESSION)
+    replay.on_ticks = lambda ticker, ticks: delivered.append(ticks)
+    del delivered[:]
+    assert replay.run() == 2
+    assert [tick["ltp"] for tick in delivered] == [10.5, 11.0]
+
+
+def test_concurrent_writers_record_in_time_order(tmp_path):
+    recorder = TickRecorder(str(tmp_path), index_every=50)
+
+    def write():
+        for i in range(500):
+            recorder.write(b"{}")
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.close()
+
+    received = [received for path in recordings(str(tmp_path)) for received, _ in read(path)]
+    assert len(received) == 2000
+    assert received == sorted(received)
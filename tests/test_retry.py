@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Order requests failing in flight are reconciled against the orderbook."""
+
+import json
+
+import pytest
+import requests
+import responses
+
+from easeapi import EaseApiGateway, RetryEngine
+from easeapi import exceptions as ex
+
+PAYLOAD = {
+    "instrument_id": 2885, "exchange": "NSE", "transaction_type": "B", "order_type": "LMT",
+    "product": "C", "quantity": 1, "price": 100.0,
+}
+ORDERBOOK = {"data": [
+    {"order_no": "1", "instrument_id": "2885", "exchange": "NSE", "transaction_type": "B", "order_type": "LMT",
+     "product": "C", "quantity": "1", "price": "100.0", "status": "OPEN"},
+    {"order_no": "2", "instrument_id": "11536", "exchange": "NSE", "transaction_type": "S", "order_type": "MKT",
+     "product": "C", "quantity": "5", "price": "0", "status": "OPEN"},
+]}
+
+
+@pytest.fixture
+def easeapi():
+    return EaseApiGateway("app_key", retry=RetryEngine(), native=True)
+
+
+def url(easeapi, route):
+    return easeapi._route_urls[route]
+
+
+def calls(route_url):
+    return [call for call in responses.calls if call.request.url.startswith(route_url)]
+
+
+@responses.activate
+def test_in_flight_failure_with_matching_order(easeapi):
+    responses.add(responses.POST, url(easeapi, "place_delivery_order"), json={"message": "timeout"}, status=504)
+    responses.add(responses.GET, url(easeapi, "get_orderbook"), json=ORDERBOOK)
+
+    with pytest.raises(ex.OrderStateUnknownException) as raised:
+        easeapi.place_delivery_order(PAYLOAD)
+
+    assert [order["order_no"] for order in raised.value.orders] == ["1"]
+    assert "1 matching order(s)" in str(raised.value)
+    # Order routes are never retried
+    assert len(calls(url(easeapi, "place_delivery_order"))) == 1
+
+
+@responses.activate
+def test_in_flight_failure_without_matching_order(easeapi):
+    responses.add(responses.POST, url(easeapi, "place_delivery_order"), json={"message": "timeout"}, status=504)
+    responses.add(responses.GET, url(easeapi, "get_orderbook"), json=ORDERBOOK)
+
+    with pytest.raises(ex.OrderStateUnknownException) as raised:
+        easeapi.place_delivery_order(dict(PAYLOAD, price=101.0))
+
+    assert raised.value.orders == []
+
+
+@responses.activate
+def test_in_flight_connection_error_on_cancel(easeapi):
+    responses.add(responses.POST, url(easeapi, "cancel_order"), body=requests.ConnectionError("reset"))
+    responses.add(responses.GET, url(easeapi, "get_orderbook"), json=ORDERBOOK)
+
+    with pytest.raises(ex.OrderStateUnknownException) as raised:
+        easeapi.cancel_order({"order_no": "2"})
+
+    assert [order["order_no"] for order in raised.value.orders] == ["2"]
+    assert "reset" in str(raised.value)
+
+
+@responses.activate
+def test_in_flight_failure_without_orderbook(easeapi):
+    responses.add(responses.POST, url(easeapi, "place_delivery_order"), json={"message": "timeout"}, status=504)
+    responses.add(responses.GET, url(easeapi, "get_orderbook"), body=requests.ConnectionError("down"))
+
+    with pytest.raises(ex.OrderStateUnknownException) as raised:
+        easeapi.place_delivery_order(PAYLOAD)
+
+    assert raised.value.orders is None
+    assert isinstance(raised.value.__cause__, requests.ConnectionError)
+
+
+@responses.activate
+def test_in_flight_failure_of_encoded_body(easeapi):
+    responses.add(responses.POST, url(easeapi, "place_delivery_order"), json={"message": "timeout"}, status=504)
+    responses.add(responses.GET, url(easeapi, "get_orderbook"), json=ORDERBOOK)
+
+    with pytest.raises(ex.OrderStateUnknownException) as raised:
+        easeapi._request("place_delivery_order", "POST", is_json=True, body=json.dumps(PAYLOAD).encode("utf-8"))
+
+    assert [order["order_no"] for order in raised.value.orders] == ["1"]
+
+
+@responses.activate
+def test_reconciliation_disabled():
+    easeapi = EaseApiGateway("app_key", retry=RetryEngine(reconcile_orders=False), native=True)
+    responses.add(responses.POST, url(easeapi, "place_delivery_order"), json={"message": "timeout"}, status=504)
+
+    # The error response is returned as is, and the orderbook is not fetched
+    assert easeapi.place_delivery_order(PAYLOAD) == {"message": "timeout"}
+    assert not calls(url(easeapi, "get_orderbook"))
+
+
+@responses.activate
+def test_read_routes_are_retried(easeapi):
+    orderbook_url = url(easeapi, "get_orderbook")
+    responses.add(responses.GET, orderbook_url, json={"message": "busy"}, status=503)
+    responses.add(responses.GET, orderbook_url, json=ORDERBOOK)
+
+    assert easeapi.get_orderbook() == ORDERBOOK
+    assert len(calls(orderbook_url)) == 2
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Writer election and pruning of on-disk instrument snapshots."""
+
+import os
+import threading
+from datetime import date
+
+import responses
+
+from easeapi import EaseApiGateway
+from easeapi.instruments import InstrumentColumns
+from easeapi.snapshot import InstrumentSnapshot, write_snapshot
+
+CSV = (
+    "exchange_token,trading_symbol,name,tick_size,lot_size,segment,exchange\n"
+    "2885,RELIANCE-EQ,RELIANCE,0.05,1,E,NSE\n"
+    "35001,NIFTY25JANFUT,NIFTY,0.05,75,D,NFO\n"
+)
+
+
+def add_master(easeapi):
+    responses.add(
+        responses.GET,
+        easeapi._route_urls["get_instruments"],
+        body=CSV,
+        content_type="text/csv",
+        headers={"ETag": '"v1"'},
+    )
+
+
+@responses.activate
+def test_load_writes_and_prunes(tmp_path):
+    easeapi = EaseApiGateway("app_key")
+    add_master(easeapi)
+    for name in ("instruments-20250102.snap", "instruments-20250103.snap.123.tmp", "instruments-20250104.snap"):
+        (tmp_path / name).write_bytes(b"old")
+
+    columns = InstrumentSnapshot(str(tmp_path), date=date(2025, 1, 3)).load(easeapi)
+
+    assert list(columns.columns["exchange_token"]) == [2885, 35001]
+    # Earlier dates and interrupted writes are removed, a later date is kept
+    assert sorted(os.listdir(tmp_path)) == [
+        "instruments-20250103.snap",
+        "instruments-20250104.snap",
+        "instruments.lock",
+    ]
+
+
+@responses.activate
+def test_waiting_worker_maps_the_elected_writers_snapshot(tmp_path):
+    easeapi = EaseApiGateway("app_key")
+    add_master(easeapi)
+    writer = InstrumentSnapshot(str(tmp_path), date=date(2025, 1, 3))
+    waiter = InstrumentSnapshot(str(tmp_path), date=date(2025, 1, 3))
+    waiter.lock_poll = 0.01
+
+    lock = writer._lock()
+    assert lock is not None
+    assert waiter._lock() is None
+
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(columns=waiter.load(easeapi)))
+    thread.start()
+    thread.join(0.2)
+    assert thread.is_alive()
+
+    write_snapshot(writer.path, InstrumentColumns.from_csv(CSV), etag='"v1"')
+    writer._unlock(lock)
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert list(result["columns"].columns["exchange_token"]) == [2885, 35001]
+    # The waiting worker mapped the snapshot instead of downloading it again
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_waiting_worker_downloads_if_the_writer_failed(tmp_path):
+    easeapi = EaseApiGateway("app_key")
+    add_master(easeapi)
+    writer = InstrumentSnapshot(str(tmp_path), date=date(2025, 1, 3))
+    waiter = InstrumentSnapshot(str(tmp_path), date=date(2025, 1, 3))
+    waiter.lock_poll = 0.01
+
+    lock = writer._lock()
+    timer = threading.Timer(0.05, writer._unlock, (lock,))
+    timer.start()
+    columns = waiter.load(easeapi)
+    timer.join()
+
+    assert len(columns) == 2
+    assert len(responses.calls) == 1
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Order templates encode the same bytes as the codec would for the patched payload."""
+
+import pytest
+
+from easeapi import EaseApiGateway
+from easeapi.codec import CODECS
+from easeapi.instruments import InstrumentMaster
+from easeapi.templates import OrderTemplate, instrument_sizes
+
+PAYLOAD = {
+    "instrument_id": 2885,
+    "exchange": "NSE",
+    "segment": "E",
+    "transaction_type": "B",
+    "order_type": "LMT",
+    "product": "I",
+    "quantity": 1,
+    "price": 1224.05,
+    "trigger_price": 0.0,
+    "validity": "DAY",
+}
+
+
+@pytest.fixture(params=sorted(CODECS))
+def easeapi(request):
+    return EaseApiGateway("app_key", native=True, codec=request.param)
+
+
+def expected(easeapi, payload, **fields):
+    return easeapi.codec.dumpb(dict(payload, **fields))
+
+
+@pytest.mark.parametrize(
+    "price, sent",
+    [
+        (1224.07, 1224.05),
+        (1224.08, 1224.1),
+        (1225, 1225.0),
+        (0.1 + 0.2, 0.3),
+        (99999.96, 99999.95),
+    ],
+)
+def test_price_rounded_to_tick(easeapi, price, sent):
+    template = OrderTemplate(easeapi, "place_intraday_order", PAYLOAD, tick_size=0.05, lot_size=1)
+
+    assert template.encode(price=price) == expected(easeapi, PAYLOAD, price=sent)
+    assert template.encode(trigger_price=price) == expected(easeapi, PAYLOAD, trigger_price=sent)
+
+
+def test_price_without_tick_size(easeapi):
+    template = OrderTemplate(easeapi, "place_intraday_order", PAYLOAD)
+
+    assert template.encode(price=1224.0712) == expected(easeapi, PAYLOAD, price=1224.0712)
+    assert template.encode(price=5) == expected(easeapi, PAYLOAD, price=5.0)
+
+
+def test_fine_tick_size(easeapi):
+    payload = dict(PAYLOAD, price=83.1234, quantity=1000)
+    template = OrderTemplate(easeapi, "place_intraday_order", payload, tick_size=0.0025, lot_size=1000)
+
+    assert template.encode() == expected(easeapi, payload, price=83.1225, quantity=1000)
+    assert template.encode(price=83.12376, quantity=5000) == expected(easeapi, payload, price=83.125, quantity=5000)
+
+
+def test_quantity(easeapi):
+    template = OrderTemplate(easeapi, "place_intraday_order", dict(PAYLOAD, quantity=75), tick_size=0.05, lot_size=75)
+
+    assert template.encode(quantity=150) == expected(easeapi, PAYLOAD, quantity=150)
+    assert template.encode(quantity=150.0) == expected(easeapi, PAYLOAD, quantity=150)
+    for quantity in (0, -75, 100, 150.5):
+        with pytest.raises(ValueError):
+            template.encode(quantity=quantity)
+
+
+def test_symbols_that_need_escaping(easeapi):
+    payload = dict(PAYLOAD, trading_symbol='M&M "A"/B\\C', remarks="ÅÉ → ₹ \t\n", tag="@@easeapi:x@@")
+    template = OrderTemplate(easeapi, "place_intraday_order", payload, tick_size=0.05, lot_size=1)
+
+    assert template.encode(price=1224.07, quantity=3) == expected(easeapi, payload, price=1224.05, quantity=3)
+    assert easeapi.codec.loads(template.encode())["trading_symbol"] == 'M&M "A"/B\\C'
+
+
+def test_unpatchable_field(easeapi):
+    payload = {field: value for field, value in PAYLOAD.items() if field != "trigger_price"}
+    template = OrderTemplate(easeapi, "place_intraday_order", payload, tick_size=0.05, lot_size=1)
+
+    assert template.encode(price=10) == expected(easeapi, payload, price=10.0)
+    with pytest.raises(ValueError):
+        template.encode(trigger_price=10)
+
+
+def test_instrument_sizes_exact_exchange_and_segment():
+    master = InstrumentMaster([
+        {"exchange_token": 2885, "exchange": "NSE", "segment": "E", "trading_symbol": "RELIANCE-EQ", "tick_size": 0.05, "lot_size": 1},
+        {"exchange_token": 2885, "exchange": "NFO", "segment": "D", "trading_symbol": "NIFTY25JAN24000CE", "tick_size": 0.05, "lot_size": 75},
+        {"exchange_token": 2885, "exchange": "CDS", "segment": "C", "trading_symbol": "USDINR25JANFUT", "tick_size": 0.0025, "lot_size": 1000},
+    ])
+
+    assert instrument_sizes(master, 2885, "NSE") == (0.05, 1)
+    assert instrument_sizes(master, 2885, "NFO", "D") == (0.05, 75)
+    assert instrument_sizes(master, 2885, "CDS", "C") == (0.0025, 1000)
+    for exchange, segment in (("BSE", None), ("NFO", "E"), ("MCX", "D")):
+        with pytest.raises(ValueError):
+            instrument_sizes(master, 2885, exchange, segment)
+    with pytest.raises(ValueError):
+        instrument_sizes(master, 9999, "NSE")
+    with pytest.raises(ValueError):
+        instrument_sizes(master, None, "NSE")
+
+
+def test_order_template_looks_up_sizes(monkeypatch):
+    easeapi = EaseApiGateway("app_key", native=True)
+    master = InstrumentMaster([
+        {"exchange_token": 35001, "exchange": "NFO", "segment": "D", "tick_size": 0.05, "lot_size": 75},
+        {"exchange_token": 35001, "exchange": "NSE", "segment": "E", "tick_size": 0.01, "lot_size": 1},
+    ])
+    monkeypatch.setattr(easeapi, "get_instrument_master", lambda: master)
+
+    template = easeapi.order_template(dict(PAYLOAD, instrument_id=35001, exchange="NFO", segment="D", quantity=75))
+    assert (template.tick_size, template.lot_size, template.route) == (0.05, 75, "place_delivery_order")
+    with pytest.raises(ValueError):
+        easeapi.order_template(dict(PAYLOAD, instrument_id=35001, exchange="NFO", segment="E", quantity=75))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Tick values and the NumPy tick batches of the ticker."""
+
+import json
+import pickle
+
+import pytest
+
+from easeapi import EaseApiTicker, Tick
+from easeapi.ticks import numpy
+
+
+def test_tick_is_an_immutable_value():
+    tick = Tick("nse", "2885", 1250.5, 1.0)
+
+    assert tick == Tick("nse", "2885", 1250.5, 1.0)
+    assert len({tick, Tick("nse", "2885", 1250.5, 1.0)}) == 1
+    assert pickle.loads(pickle.dumps(tick)) == tick
+    with pytest.raises(AttributeError):
+        tick.ltp = 1.0
+
+
+def ticker(**kwargs):
+    ticker = EaseApiTicker("app_key", "client_id", "auth_token", **kwargs)
+    ticker.subscriptions = {"nse": {"1", "2"}}
+    delivered = []
+    ticker.on_ticks = lambda ticker, data: delivered.append(data)
+    return ticker, delivered
+
+
+def feed(ticker, ltps):
+    for token, ltp in ltps:
+        ticker._on_message(None, json.dumps({"token": token, "ltp": ltp, "timestamp": 1}))
+
+
+@pytest.mark.skipif(numpy is None, reason="requires numpy")
+def test_numpy_batches_keep_every_tick():
+    easeapi_ticker, delivered = ticker(tick_model="numpy", batch_size=3)
+    feed(easeapi_ticker, [("1", 10.0), ("1", 10.5), ("2", 20.0), ("1", 11.0)])
+
+    assert len(delivered) == 1
+    assert list(delivered[0]["ltp"]) == [10.0, 10.5, 20.0]
+    assert list(delivered[0]["exchange"]) == ["nse"] * 3
+
+    easeapi_ticker.flush_ticks()
+    assert list(delivered[1]["ltp"]) == [11.0]
+    # Nothing left to deliver
+    assert len(easeapi_ticker.flush_ticks()) == 0 and len(delivered) == 2
+
+
+@pytest.mark.skipif(numpy is None, reason="requires numpy")
+def test_numpy_conflated_batches():
+    easeapi_ticker, delivered = ticker(tick_model="numpy", conflate=True)
+    feed(easeapi_ticker, [("1", 10.0), ("1", 10.5), ("2", 20.0)])
+    easeapi_ticker.flush_ticks()
+
+    assert sorted(delivered[0]["ltp"]) == [10.5, 20.0]
+
+
+def test_status_messages_are_not_batched():
+    easeapi_ticker, delivered = ticker(tick_model="numpy" if numpy is not None else "dict")
+    easeapi_ticker._on_message(None, json.dumps({"status": "subscribed"}))
+
+    assert delivered == [{"status": "subscribed"}]
+
+
+def test_unknown_tick_model():
+    with pytest.raises(ValueError):
+        EaseApiTicker("app_key", "client_id", "auth_token", tick_model="slots")